@@ -1,17 +1,36 @@
 from pathlib import Path
 
 import pytest
-from bodhiext.resources import GlobProcessor
-from bodhilib import IsResource, ResourceProcessor, glob_pattern
+from bodhiext.resources import GlobProcessor, LocalDirProcessor
+from bodhilib import IsResource, ResourceProcessor, glob_pattern, local_dir
 
-from bodhilibrs import GlobProcessorRs
+from bodhilibrs import GlobProcessorRs, LocalDirProcessorRs
 
 pytestmark = pytest.mark.filterwarnings("ignore")
 
+BENCH_DIRS = 16
+BENCH_SUBDIRS = 16
+BENCH_FILES = 8
+# every other file in the tree is a json file
+BENCH_JSON_FILES = BENCH_DIRS * BENCH_SUBDIRS * BENCH_FILES // 2
+
+
+@pytest.fixture(scope="module")
+def bench_dir(tmp_path_factory) -> str:
+  root = tmp_path_factory.mktemp("bench_glob")
+  for i in range(BENCH_DIRS):
+    for j in range(BENCH_SUBDIRS):
+      subdir = root / f"dir{i:02d}" / f"subdir{j:02d}"
+      subdir.mkdir(parents=True)
+      for k in range(BENCH_FILES):
+        ext = "json" if k % 2 == 0 else "txt"
+        (subdir / f"file{k:02d}.{ext}").write_text(f'{{"file": {k}}}')
+  return str(root)
+
 
 @pytest.fixture
-def glob_pattern_json():
-  return glob_pattern("~/Dropbox", "*.json", recursive=True, exclude_hidden=True)
+def glob_pattern_json(bench_dir):
+  return glob_pattern(bench_dir, "*.json", recursive=True, exclude_hidden=True)
 
 
 @pytest.fixture
@@ -24,11 +43,18 @@ def glob_processor():
   return GlobProcessor()
 
 
+@pytest.fixture
+def local_dir_all(bench_dir):
+  return local_dir(bench_dir, recursive=True, exclude_hidden=True)
+
+
 @pytest.fixture
 def all_processors():
   return {
     "glob_processor": GlobProcessor(),
     "glob_processor_rs": GlobProcessorRs(),
+    "local_dir_processor": LocalDirProcessor(),
+    "local_dir_processor_rs": LocalDirProcessorRs(),
   }
 
 
@@ -37,24 +63,26 @@ def run_bench(processor: ResourceProcessor, pattern: IsResource, stream: bool):
   return len(files)
 
 
+def run_bench_first(processor: ResourceProcessor, pattern: IsResource):
+  return next(processor.process(pattern, True))
+
+
 async def run_bench_async(processor: ResourceProcessor, pattern: IsResource, stream: bool):
   files = await processor.process(pattern, stream)
   return len(files)
 
 
-def run_bench_langchain():
+def run_bench_langchain(path: str):
   from langchain_community.document_loaders import DirectoryLoader
 
-  path = str(Path("~/Dropbox").expanduser().resolve())
   loader = DirectoryLoader(path, glob="**/*.json", load_hidden=False)
   docs = loader.load()
   return len(docs)
 
 
-def run_bench_llama_index():
+def run_bench_llama_index(path: str):
   from llama_index import SimpleDirectoryReader
 
-  path = str(Path("~/Dropbox").expanduser().resolve())
   reader = SimpleDirectoryReader(
     input_dir=path,
     required_exts="json",
@@ -73,7 +101,7 @@ def run_bench_llama_index():
 def test_bench_glob_rs_sync_list(benchmark, glob_pattern_json, all_processors, processor_key):
   processor = all_processors[processor_key]
   len = benchmark(run_bench, processor, glob_pattern_json, False)
-  assert len == 95
+  assert len == BENCH_JSON_FILES
 
 
 @pytest.mark.bench
@@ -90,45 +118,71 @@ async def test_bench_glob_rs_async_list(aio_benchmark, all_processors, processor
     await processor.aprocess(glob_pattern_json, False)
 
 
+@pytest.mark.bench
+@pytest.mark.parametrize(
+  ["processor_key"],
+  [("glob_processor",), ("glob_processor_rs",)],
+)
+def test_bench_glob_stream_first_result(benchmark, glob_pattern_json, all_processors, processor_key):
+  processor = all_processors[processor_key]
+  first = benchmark(run_bench_first, processor, glob_pattern_json)
+  assert first.path.endswith(".json")
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize(
+  ["processor_key"],
+  [("local_dir_processor",), ("local_dir_processor_rs",)],
+)
+def test_bench_local_dir_sync_list(benchmark, local_dir_all, all_processors, processor_key):
+  processor = all_processors[processor_key]
+  len = benchmark(run_bench, processor, local_dir_all, False)
+  assert len == BENCH_DIRS * BENCH_SUBDIRS * BENCH_FILES
+
+
+@pytest.mark.bench
+def test_bench_walk_files(benchmark, bench_dir):
+  from bodhilibrs.bodhilibrs import walk_files
+
+  batches = benchmark(lambda: list(walk_files(bench_dir, "*.json", True, True)))
+  assert sum(len(batch) for batch in batches) == BENCH_JSON_FILES
+
+
 @pytest.mark.bench
 def test_bench_glob_sync_list(benchmark, glob_processor, glob_pattern_json):
   len = benchmark(run_bench, glob_processor, glob_pattern_json, False)
-  assert len == 95
+  assert len == BENCH_JSON_FILES
 
 
 @pytest.mark.bench
-def test_bench_glob_new(benchmark):
+def test_bench_glob_new(benchmark, bench_dir):
   from bodhilibrs.bodhilibrs import find_files
-  root_folder = str(Path("~/Dropbox").expanduser().resolve())
-  files = benchmark(find_files, root_folder, "*.json", True, True)
-  assert len(files) == 118
 
+  files = benchmark(find_files, bench_dir, "*.json", True, True)
+  assert len(files) == BENCH_JSON_FILES
 
-@pytest.mark.bench
-def test_bench_py_glob(benchmark):
-  # using python, search for all json files in the dropbox folder
-  from pathlib import Path
-
-  root_folder = Path("~/Dropbox").expanduser().resolve()
 
+@pytest.mark.bench
+def test_bench_py_glob(benchmark, bench_dir):
+  # using python, search for all json files in the bench folder
   def find_all_files(folder, pattern):
     return list(folder.glob(pattern))
 
-  files = benchmark(find_all_files, root_folder, "**/*.json")
-  assert len(list(files)) == 118
+  files = benchmark(find_all_files, Path(bench_dir), "**/*.json")
+  assert len(list(files)) == BENCH_JSON_FILES
 
 
 # @pytest.mark.bench
-# def test_bench_glob_langchain(benchmark):
-#   len = benchmark(run_bench_langchain)
-#   assert len == 95
+# def test_bench_glob_langchain(benchmark, bench_dir):
+#   len = benchmark(run_bench_langchain, bench_dir)
+#   assert len == BENCH_JSON_FILES
 
 
 @pytest.mark.bench
 @pytest.mark.skip
-def test_bench_glob_llama_index(benchmark):
-  len = benchmark(run_bench_llama_index)
-  assert len == 95
+def test_bench_glob_llama_index(benchmark, bench_dir):
+  len = benchmark(run_bench_llama_index, bench_dir)
+  assert len == BENCH_JSON_FILES
 
 
 @pytest.fixture(scope="function")
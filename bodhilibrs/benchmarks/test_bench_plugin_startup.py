@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+LIST_SERVICES = "from bodhilib import list_embedders, list_llms; list_llms(); list_embedders()"
+
+
+def run_bench_startup(discovery: str):
+  env = {**os.environ, "BODHILIB_PLUGIN_DISCOVERY": discovery}
+  subprocess.run([sys.executable, "-c", LIST_SERVICES], env=env, check=True)
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize(["discovery"], [("eager",), ("manifest",)])
+def test_bench_plugin_startup_list_services(benchmark, discovery):
+  benchmark.pedantic(run_bench_startup, args=(discovery,), rounds=5)
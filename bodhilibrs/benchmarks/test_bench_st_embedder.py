@@ -0,0 +1,46 @@
+import pytest
+
+st = pytest.importorskip("bodhiext.st")
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+NUM_DOCS = 2_000
+MODEL = "all-MiniLM-L6-v2"
+
+
+@pytest.fixture(scope="module")
+def texts():
+  # mix of short and long texts, as in a chunked corpus
+  return [f"This is sentence number {i}. " * (1 + i % 16) for i in range(NUM_DOCS)]
+
+
+def run_bench(embedder, texts):
+  return len(embedder.embed(texts))
+
+
+@pytest.mark.bench
+@pytest.mark.live
+@pytest.mark.timeout(600)
+@pytest.mark.parametrize(["pool_size"], [(None,), (2,), (4,)])
+def test_bench_st_embedder(benchmark, texts, pool_size):
+  embedder = st.SentenceTransformerEmbedder(model=MODEL, pool_size=pool_size)
+  embedder.warmup()
+  try:
+    count = benchmark.pedantic(run_bench, args=(embedder, texts), rounds=3)
+  finally:
+    embedder.close()
+  assert count == NUM_DOCS
+  benchmark.extra_info["docs_per_sec"] = NUM_DOCS / benchmark.stats.stats.mean
+
+
+@pytest.mark.bench
+@pytest.mark.live
+@pytest.mark.timeout(600)
+@pytest.mark.parametrize(["backend", "quantize"], [("torch", False), ("onnx", False), ("onnx", True)])
+def test_bench_st_embedder_backend(benchmark, tmp_path, texts, backend, quantize):
+  onnx_path = str(tmp_path / "model.onnx")
+  embedder = st.SentenceTransformerEmbedder(model=MODEL, backend=backend, onnx_path=onnx_path, quantize=quantize)
+  embedder.warmup()
+  count = benchmark.pedantic(run_bench, args=(embedder, texts), rounds=3)
+  assert count == NUM_DOCS
+  benchmark.extra_info["docs_per_sec"] = NUM_DOCS / benchmark.stats.stats.mean
@@ -0,0 +1,48 @@
+import pytest
+from bodhiext.resources import LocalDirProcessor, LocalFileProcessor, TextBulkProcessor, TextPlainProcessor
+from bodhilib import local_dir
+
+pytestmark = pytest.mark.filterwarnings("ignore")
+
+NUM_FILES = 50_000
+FILES_PER_DIR = 500
+
+
+@pytest.fixture(scope="module")
+def synthetic_tree(tmp_path_factory):
+  root = tmp_path_factory.mktemp("bench_text_loader")
+  for i in range(NUM_FILES):
+    subdir = root.joinpath(f"dir{i // FILES_PER_DIR:03}")
+    if i % FILES_PER_DIR == 0:
+      subdir.mkdir()
+    subdir.joinpath(f"file{i:05}.txt").write_text(f"This is file {i}. " * 20)
+  return local_dir(path=root, recursive=True)
+
+
+def run_bench_serial(resource):
+  local_dir_processor = LocalDirProcessor()
+  local_file_processor = LocalFileProcessor()
+  text_plain_processor = TextPlainProcessor()
+  count = 0
+  for file in local_dir_processor.process(resource, stream=True):
+    for text_plain in local_file_processor.process(file):
+      count += len(text_plain_processor.process(text_plain))
+  return count
+
+
+def run_bench_bulk(resource, max_workers):
+  processor = TextBulkProcessor(max_workers=max_workers)
+  return sum(1 for _ in processor.process(resource, stream=True))
+
+
+@pytest.mark.bench
+def test_bench_text_loader_serial(benchmark, synthetic_tree):
+  count = benchmark.pedantic(run_bench_serial, args=(synthetic_tree,), rounds=3)
+  assert count == NUM_FILES
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize(["max_workers"], [(1,), (4,), (16,)])
+def test_bench_text_loader_bulk(benchmark, synthetic_tree, max_workers):
+  count = benchmark.pedantic(run_bench_bulk, args=(synthetic_tree, max_workers), rounds=3)
+  assert count == NUM_FILES
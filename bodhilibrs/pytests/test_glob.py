@@ -2,10 +2,11 @@ import os
 import tempfile
 
 import pytest
-from bodhilib import glob_pattern
+from bodhilib import glob_pattern, local_dir
 from pydantic import ValidationError
 
-from bodhilibrs import GlobProcessorRs
+from bodhilibrs import GlobProcessorRs, LocalDirProcessorRs
+from bodhilibrs.bodhilibrs import walk_files
 from bodhilibrs._glob import GlobInput
 
 
@@ -67,3 +68,57 @@ def test_glob_input_path_missing(tmp_test_dir):
   errors = e.value.errors()[0]
   assert errors["type"] == "missing"
   assert errors["msg"] == "Field required"
+
+
+@pytest.mark.parametrize(
+  ["recursive", "exclude_hidden", "files"],
+  [
+    (False, False, [".test3.txt", "test1.txt", "test2.txt"]),
+    (False, True, ["test1.txt", "test2.txt"]),
+    (True, False, [".test3.txt", "test1.txt", "test2.txt", "tmpdir2/.test4.txt", "tmpdir2/test3.txt"]),
+    (True, True, ["test1.txt", "test2.txt", "tmpdir2/test3.txt"]),
+  ],
+)
+@pytest.mark.parametrize(["stream"], [(True,), (False,)])
+def test_local_dir_processor_rs(tmp_test_dir, stream, recursive, exclude_hidden, files):
+  processor = LocalDirProcessorRs(batch_size=2)
+  resources = processor.process(local_dir(tmp_test_dir, recursive=recursive, exclude_hidden=exclude_hidden), stream)
+  resources = list(resources) if stream else resources
+  paths = sorted([resource.metadata["path"] for resource in resources])
+  assert paths == sorted([os.path.join(tmp_test_dir, f) for f in files])
+
+
+def test_walk_files_yields_batches(tmp_test_dir):
+  batches = list(walk_files(tmp_test_dir, "*.txt", True, True, 1))
+  assert all(len(batch) == 1 for batch in batches)
+  assert len(batches) == 5
+
+
+def test_walk_files_invalid_pattern(tmp_test_dir):
+  with pytest.raises(RuntimeError) as e:
+    walk_files(tmp_test_dir, "[", True, True)
+  assert str(e.value).startswith("Glob error:")
+
+
+NESTED_FILE = "tmpdir4/tmpdir2/test6.txt"
+
+
+@pytest.mark.parametrize(
+  ["pattern", "recursive", "files"],
+  [
+    ("tmpdir2/*.txt", False, ["tmpdir2/test3.txt"]),
+    ("*/*.txt", False, ["tmpdir2/test3.txt"]),
+    ("tmpdir2/*.txt", True, ["tmpdir2/test3.txt", NESTED_FILE]),
+    ("**/*.txt", False, ["test1.txt", "test2.txt", "tmpdir2/deep/test5.txt", "tmpdir2/test3.txt", NESTED_FILE]),
+    ("**/*.txt", True, ["test1.txt", "test2.txt", "tmpdir2/deep/test5.txt", "tmpdir2/test3.txt", NESTED_FILE]),
+    ("tmpdir2/**/test*.txt", False, ["tmpdir2/deep/test5.txt", "tmpdir2/test3.txt"]),
+  ],
+)
+def test_glob_processor_rs_pattern_with_separator(tmp_test_dir, glob_processor, pattern, recursive, files):
+  os.makedirs(f"{tmp_test_dir}/tmpdir2/deep")
+  os.makedirs(f"{tmp_test_dir}/tmpdir4/tmpdir2")
+  _tmpfile(f"{tmp_test_dir}/tmpdir2/deep", "test5.txt", "deep world!")
+  _tmpfile(f"{tmp_test_dir}/tmpdir4/tmpdir2", "test6.txt", "nested world!")
+  resources = glob_processor.process(glob_pattern(tmp_test_dir, pattern, recursive=recursive, exclude_hidden=True))
+  paths = sorted([resource.metadata["path"] for resource in resources])
+  assert paths == [os.path.join(tmp_test_dir, f) for f in files]
@@ -2,6 +2,7 @@
 import inspect
 
 from ._glob import GlobProcessorRs as GlobProcessorRs
+from ._local_dir import LocalDirProcessorRs as LocalDirProcessorRs
 
 __all__ = [name for name, obj in globals().items() if not (name.startswith("_") or inspect.ismodule(obj))]
 
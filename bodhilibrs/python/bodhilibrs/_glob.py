@@ -7,7 +7,7 @@ from bodhilib import AbstractResourceProcessor, IsResource, local_file
 from pydantic import BaseModel, BeforeValidator
 from typing_extensions import Annotated
 
-from bodhilibrs.bodhilibrs import find_files
+from bodhilibrs.bodhilibrs import walk_files
 
 from ._aiter import AsyncListIterator
 
@@ -30,7 +30,22 @@ class GlobInput(BaseModel):
   exclude_hidden: bool = False
 
 
+def _iter_resources(walker: Iterator[List[str]]) -> Iterator[IsResource]:
+  for paths in walker:
+    for path in paths:
+      yield local_file(path)
+
+
 class GlobProcessorRs(AbstractResourceProcessor):
+  def __init__(self, batch_size: int = 256) -> None:
+    """Initialize the glob processor backed by the parallel rust directory walker.
+
+    Args:
+        batch_size (int): number of file paths sent back from the walker in a single batch. Defaults to 256.
+    """
+    super().__init__()
+    self.batch_size = batch_size
+
   @typing.overload
   def process(self, resource: IsResource, stream: Optional[Literal[False]] = ...) -> List[IsResource]:
     ...
@@ -45,12 +60,11 @@ class GlobProcessorRs(AbstractResourceProcessor):
   ) -> Union[List[IsResource], Iterator[IsResource]]:
     """Process the resource and return a Document or another resource for further processing."""
     input = GlobInput(**resource.metadata)
-    files: List[str] = find_files(input.path, input.pattern, input.recursive, not input.exclude_hidden)
-    resources: List[IsResource] = [local_file(path) for path in files]
+    walker = walk_files(input.path, input.pattern, input.recursive, not input.exclude_hidden, self.batch_size)
+    resources = _iter_resources(walker)
     if stream:
-      resources_iter: Iterator[IsResource] = iter(resources)
-      return resources_iter
-    return resources
+      return resources
+    return list(resources)
 
   @typing.overload
   async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -0,0 +1,78 @@
+import typing
+from typing import AsyncIterator, Iterator, List, Literal, Optional, Union
+
+from beartype import beartype
+from bodhilib import AbstractResourceProcessor, IsResource
+from pydantic import BaseModel, BeforeValidator
+from typing_extensions import Annotated
+
+from bodhilibrs.bodhilibrs import walk_files
+
+from ._aiter import AsyncListIterator
+from ._glob import _iter_resources, _validate_path
+
+
+class LocalDirInput(BaseModel):
+  resource_type: Literal["local_dir"]
+  path: Annotated[str, BeforeValidator(_validate_path)]
+  recursive: bool = False
+  exclude_hidden: bool = True
+
+
+class LocalDirProcessorRs(AbstractResourceProcessor):
+  def __init__(self, batch_size: int = 256) -> None:
+    """Initialize the local dir processor backed by the parallel rust directory walker.
+
+    Args:
+        batch_size (int): number of file paths sent back from the walker in a single batch. Defaults to 256.
+    """
+    super().__init__()
+    self.batch_size = batch_size
+
+  @typing.overload
+  def process(self, resource: IsResource, stream: Optional[Literal[False]] = ...) -> List[IsResource]:
+    ...
+
+  @typing.overload
+  def process(self, resource: IsResource, stream: Literal[True]) -> Iterator[IsResource]:
+    ...
+
+  @beartype
+  def process(
+    self, resource: IsResource, stream: Optional[bool] = False
+  ) -> Union[List[IsResource], Iterator[IsResource]]:
+    """Process the resource and return a Document or another resource for further processing."""
+    input = LocalDirInput(**resource.metadata)
+    walker = walk_files(input.path, None, input.recursive, not input.exclude_hidden, self.batch_size)
+    resources = _iter_resources(walker)
+    if stream:
+      return resources
+    return list(resources)
+
+  @typing.overload
+  async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
+    ...
+
+  @typing.overload
+  async def aprocess(self, resource: IsResource, astream: Literal[True]) -> AsyncIterator[IsResource]:
+    ...
+
+  @beartype
+  async def aprocess(
+    self, resource: IsResource, astream: Optional[bool] = False
+  ) -> Union[List[IsResource], AsyncIterator[IsResource]]:
+    """Process the resource and return a Document or another resource for further processing."""
+    local_files = self.process(resource, False)
+    if astream:
+      return AsyncListIterator[IsResource](local_files)
+    return local_files
+
+  @property
+  def supported_types(self) -> List[str]:
+    """List of supported resource types."""
+    return ["local_dir"]
+
+  @property
+  def service_name(self) -> str:
+    """Service name of the component."""
+    return self.__class__.__name__
@@ -0,0 +1,463 @@
+use pyo3::prelude::*;
+use std::path::{PathBuf, MAIN_SEPARATOR};
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::sync::mpsc::{sync_channel, Receiver, SyncSender};
+use std::sync::Arc;
+use std::{fs, thread};
+
+const MATCH_OPTIONS: glob::MatchOptions = glob::MatchOptions {
+  case_sensitive: true,
+  require_literal_separator: true,
+  // hidden entries are filtered by the walker, before matching
+  require_literal_leading_dot: false,
+};
+
+// batches buffered ahead of the consumer, the walker threads block on sending once the buffer is full
+const BUFFERED_BATCHES: usize = 4;
+
+/// Glob pattern matched one path segment at a time, following the rules of python's `glob.glob`.
+///
+/// `*`, `?` and `[...]` match within a single segment, and a `**` segment matches zero or more directories. With
+/// `recursive`, the pattern is matched under every directory of the tree, as `**/<pattern>`. The walker tracks the
+/// positions in the pattern the entries of a directory are matched against, and only enters the directories
+/// that can still match.
+struct GlobPattern {
+  // `None` for a `**` segment
+  segments: Vec<Option<glob::Pattern>>,
+}
+
+impl GlobPattern {
+  fn new(pattern: &str, recursive: bool) -> Result<Self, String> {
+    let mut segments = Vec::new();
+    if recursive {
+      segments.push(None);
+    }
+    for segment in pattern.split(|c| c == '/' || c == MAIN_SEPARATOR) {
+      match segment {
+        "" | "." => continue,
+        "**" => segments.push(None),
+        _ => segments.push(Some(
+          glob::Pattern::new(segment).map_err(|e| format!("Glob error: {}", e))?,
+        )),
+      }
+    }
+    Ok(GlobPattern { segments })
+  }
+
+  /// Positions in the pattern to match the entries of the root directory against.
+  fn start(&self) -> Vec<usize> {
+    if self.segments.is_empty() {
+      return Vec::new();
+    }
+    self.expand(vec![0])
+  }
+
+  fn match_file(&self, positions: &[usize], name: &str) -> bool {
+    let last = self.segments.len() - 1;
+    positions.iter().any(|&position| {
+      position == last
+        && match &self.segments[position] {
+          None => true,
+          Some(segment) => segment.matches_with(name, MATCH_OPTIONS),
+        }
+    })
+  }
+
+  /// Positions to match the entries of the sub-directory against, empty if nothing under it can match.
+  fn enter_dir(&self, positions: &[usize], name: &str) -> Vec<usize> {
+    let last = self.segments.len() - 1;
+    let mut entered = Vec::new();
+    for &position in positions {
+      match &self.segments[position] {
+        None => entered.push(position),
+        Some(segment) if position < last && segment.matches_with(name, MATCH_OPTIONS) => entered.push(position + 1),
+        Some(_) => {}
+      }
+    }
+    self.expand(entered)
+  }
+
+  // a `**` matches zero directories as well, so the segment after it is matched from the same directory
+  fn expand(&self, positions: Vec<usize>) -> Vec<usize> {
+    let last = self.segments.len() - 1;
+    let mut expanded = Vec::with_capacity(positions.len());
+    for mut position in positions {
+      expanded.push(position);
+      while position < last && self.segments[position].is_none() {
+        position += 1;
+        expanded.push(position);
+      }
+    }
+    expanded.sort_unstable();
+    expanded.dedup();
+    expanded
+  }
+}
+
+struct WalkOptions {
+  pattern: GlobPattern,
+  hidden: bool,
+  batch_size: usize,
+  // set once the consumer is gone, the walker threads stop reading and spawning
+  stopped: AtomicBool,
+}
+
+impl WalkOptions {
+  fn is_stopped(&self) -> bool {
+    self.stopped.load(Ordering::Relaxed)
+  }
+
+  fn stop(&self) {
+    self.stopped.store(true, Ordering::Relaxed);
+  }
+}
+
+/// Batches of the files found by the background walk, stopping the walk when dropped.
+struct Walk {
+  receiver: Receiver<Vec<String>>,
+  options: Arc<WalkOptions>,
+}
+
+impl Iterator for Walk {
+  type Item = Vec<String>;
+
+  fn next(&mut self) -> Option<Self::Item> {
+    self.receiver.recv().ok()
+  }
+}
+
+impl Drop for Walk {
+  fn drop(&mut self) {
+    self.options.stop();
+  }
+}
+
+/// Iterator over the files found by the parallel directory walker.
+///
+/// The directories are walked on a background rayon scope, and the files are sent back in batches as
+/// they are discovered. At most a few batches are buffered ahead of the consumer, and the walk stops when
+/// the iterator is dropped. Each call to `__next__` releases the GIL while waiting for the next batch.
+#[pyclass]
+pub struct FileWalker {
+  walk: Walk,
+}
+
+#[pymethods]
+impl FileWalker {
+  fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+    slf
+  }
+
+  fn __next__(mut slf: PyRefMut<'_, Self>) -> Option<Vec<String>> {
+    let py = slf.py();
+    let walk = &mut slf.walk;
+    py.allow_threads(|| walk.next())
+  }
+}
+
+#[pyfunction]
+#[pyo3(signature = (dir, pattern=None, recursive=false, hidden=false, batch_size=256))]
+fn walk_files(
+  dir: String,
+  pattern: Option<String>,
+  recursive: bool,
+  hidden: bool,
+  batch_size: usize,
+) -> PyResult<FileWalker> {
+  let walk = _walk_files(dir, pattern, recursive, hidden, batch_size)
+    .map_err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>)?;
+  Ok(FileWalker { walk })
+}
+
+fn _walk_files(
+  dir: String,
+  pattern: Option<String>,
+  recursive: bool,
+  hidden: bool,
+  batch_size: usize,
+) -> Result<Walk, String> {
+  // without a pattern, all the files are listed, from the sub-directories as well if recursive
+  let pattern = match pattern {
+    Some(pattern) => GlobPattern::new(&pattern, recursive)?,
+    None => GlobPattern::new(if recursive { "**" } else { "*" }, false)?,
+  };
+  let positions = pattern.start();
+  let root = PathBuf::from(dir);
+  let options = Arc::new(WalkOptions {
+    pattern,
+    hidden,
+    batch_size: batch_size.max(1),
+    stopped: AtomicBool::new(false),
+  });
+  let (sender, receiver) = sync_channel(BUFFERED_BATCHES);
+  let walk_options = Arc::clone(&options);
+  thread::spawn(move || rayon::scope(|scope| walk_dir(scope, root, positions, walk_options, sender)));
+  Ok(Walk { receiver, options })
+}
+
+fn walk_dir<'s>(
+  scope: &rayon::Scope<'s>,
+  dir: PathBuf,
+  positions: Vec<usize>,
+  options: Arc<WalkOptions>,
+  sender: SyncSender<Vec<String>>,
+) {
+  if positions.is_empty() || options.is_stopped() {
+    return;
+  }
+  let entries = match fs::read_dir(&dir) {
+    Ok(entries) => entries,
+    Err(_) => return,
+  };
+  let mut batch = Vec::with_capacity(options.batch_size);
+  for entry in entries.filter_map(Result::ok) {
+    let file_name = entry.file_name();
+    let name = file_name.to_string_lossy();
+    if !options.hidden && name.starts_with('.') {
+      continue;
+    }
+    let file_type = match entry.file_type() {
+      Ok(file_type) => file_type,
+      Err(_) => continue,
+    };
+    let path = entry.path();
+    if file_type.is_dir() {
+      let entered = options.pattern.enter_dir(&positions, &name);
+      if options.is_stopped() {
+        return;
+      }
+      if !entered.is_empty() {
+        let options = Arc::clone(&options);
+        let sender = sender.clone();
+        scope.spawn(move |scope| walk_dir(scope, path, entered, options, sender));
+      }
+      continue;
+    }
+    // symlinked directories are not followed, symlinked files are
+    if !(file_type.is_file() || (file_type.is_symlink() && path.is_file())) {
+      continue;
+    }
+    if !options.pattern.match_file(&positions, &name) {
+      continue;
+    }
+    if let Some(path) = path.to_str() {
+      batch.push(path.to_owned());
+    }
+    if batch.len() >= options.batch_size {
+      let full_batch = std::mem::replace(&mut batch, Vec::with_capacity(options.batch_size));
+      if !send(&sender, &options, full_batch) {
+        return;
+      }
+    }
+  }
+  if !batch.is_empty() {
+    send(&sender, &options, batch);
+  }
+}
+
+// blocks while the buffer is full, returns false if the consumer is gone
+fn send(sender: &SyncSender<Vec<String>>, options: &WalkOptions, batch: Vec<String>) -> bool {
+  if sender.send(batch).is_err() {
+    options.stop();
+    return false;
+  }
+  true
+}
+
+pub(crate) fn add_to_module(m: &PyModule) -> PyResult<()> {
+  m.add_class::<FileWalker>()?;
+  m.add_function(wrap_pyfunction!(walk_files, m)?)?;
+  Ok(())
+}
+
+#[cfg(test)]
+mod test {
+  use super::_walk_files;
+  use std::io::Write;
+  use std::sync::Arc;
+  use std::time::{Duration, Instant};
+  use std::{fs::File, path::Path};
+
+  fn setup() -> tempfile::TempDir {
+    let temp_dir = tempfile::Builder::new()
+      .prefix("walk_test_")
+      .tempdir()
+      .expect("should create temp dir");
+    create_files(temp_dir.path(), vec!["test1.txt", "test2.csv", ".test3.txt"]);
+    let subdir = temp_dir.path().join("tmpdir2");
+    std::fs::create_dir(&subdir).expect("failed to create subdir");
+    create_files(&subdir, vec!["test4.txt", ".test5.txt"]);
+    let hidden_subdir = temp_dir.path().join(".tmpdir3");
+    std::fs::create_dir(&hidden_subdir).expect("failed to create subdir");
+    create_files(&hidden_subdir, vec!["test6.txt", ".test7.txt"]);
+    temp_dir
+  }
+
+  fn create_files(inside: &Path, files: Vec<&str>) {
+    for file in files {
+      let mut file = File::create(inside.join(file)).expect("failed to create tempfile");
+      writeln!(file, "hello world").unwrap();
+    }
+  }
+
+  fn setup_nested() -> tempfile::TempDir {
+    let temp_dir = setup();
+    let deep = temp_dir.path().join("tmpdir2").join("deep");
+    std::fs::create_dir(&deep).expect("failed to create subdir");
+    create_files(&deep, vec!["test8.txt"]);
+    let nested = temp_dir.path().join("tmpdir4").join("tmpdir2");
+    std::fs::create_dir_all(&nested).expect("failed to create subdir");
+    create_files(&nested, vec!["test9.txt"]);
+    temp_dir
+  }
+
+  fn walk(
+    temp_dir: &tempfile::TempDir,
+    pattern: Option<&str>,
+    recursive: bool,
+    hidden: bool,
+    batch_size: usize,
+  ) -> Vec<String> {
+    let test_dir = temp_dir.path().to_str().unwrap().to_string();
+    let walk = _walk_files(
+      test_dir.clone(),
+      pattern.map(|p| p.to_string()),
+      recursive,
+      hidden,
+      batch_size,
+    )
+    .expect("walk should start");
+    let batches = walk.collect::<Vec<_>>();
+    assert!(batches
+      .iter()
+      .all(|batch| !batch.is_empty() && batch.len() <= batch_size));
+    let mut files = batches
+      .into_iter()
+      .flatten()
+      .map(|path| path.trim_start_matches(&test_dir).to_owned())
+      .collect::<Vec<_>>();
+    files.sort();
+    files
+  }
+
+  fn run_test(pattern: Option<&str>, recursive: bool, hidden: bool, batch_size: usize, expected: Vec<&str>) {
+    let temp_dir = setup();
+    assert_eq!(walk(&temp_dir, pattern, recursive, hidden, batch_size), expected);
+  }
+
+  fn run_nested_test(pattern: &str, recursive: bool, expected: Vec<&str>) {
+    let temp_dir = setup_nested();
+    assert_eq!(walk(&temp_dir, Some(pattern), recursive, false, 256), expected);
+  }
+
+  #[test]
+  fn test_walk_recursive_hidden_glob() {
+    let expected = vec![
+      "/.test3.txt",
+      "/.tmpdir3/.test7.txt",
+      "/.tmpdir3/test6.txt",
+      "/test1.txt",
+      "/tmpdir2/.test5.txt",
+      "/tmpdir2/test4.txt",
+    ];
+    run_test(Some("*.txt"), true, true, 256, expected);
+  }
+
+  #[test]
+  fn test_walk_recursive_not_hidden_glob() {
+    run_test(
+      Some("*.txt"),
+      true,
+      false,
+      256,
+      vec!["/test1.txt", "/tmpdir2/test4.txt"],
+    );
+  }
+
+  #[test]
+  fn test_walk_not_recursive_hidden_glob() {
+    run_test(Some("*.txt"), false, true, 256, vec!["/.test3.txt", "/test1.txt"]);
+  }
+
+  #[test]
+  fn test_walk_all_files_in_batches() {
+    let expected = vec!["/test1.txt", "/test2.csv", "/tmpdir2/test4.txt"];
+    run_test(None, true, false, 1, expected);
+  }
+
+  #[test]
+  fn test_walk_relpath_glob() {
+    run_test(Some("tmpdir2/*.txt"), true, false, 256, vec!["/tmpdir2/test4.txt"]);
+  }
+
+  #[test]
+  fn test_walk_relpath_glob_not_recursive() {
+    run_nested_test("tmpdir2/*.txt", false, vec!["/tmpdir2/test4.txt"]);
+  }
+
+  #[test]
+  fn test_walk_wildcard_dir_glob() {
+    run_nested_test("*/*.txt", false, vec!["/tmpdir2/test4.txt"]);
+  }
+
+  #[test]
+  fn test_walk_relpath_glob_does_not_cross_separator() {
+    run_nested_test(
+      "tmpdir2/*.txt",
+      true,
+      vec!["/tmpdir2/test4.txt", "/tmpdir4/tmpdir2/test9.txt"],
+    );
+  }
+
+  #[test]
+  fn test_walk_double_star_matches_top_level() {
+    let expected = vec![
+      "/test1.txt",
+      "/tmpdir2/deep/test8.txt",
+      "/tmpdir2/test4.txt",
+      "/tmpdir4/tmpdir2/test9.txt",
+    ];
+    run_nested_test("**/*.txt", true, expected.clone());
+    run_nested_test("**/*.txt", false, expected);
+  }
+
+  #[test]
+  fn test_walk_double_star_in_between() {
+    run_nested_test(
+      "tmpdir2/**/test*.txt",
+      false,
+      vec!["/tmpdir2/deep/test8.txt", "/tmpdir2/test4.txt"],
+    );
+  }
+
+  #[test]
+  fn test_walk_stops_when_dropped() {
+    let temp_dir = setup();
+    for i in 0..64 {
+      let subdir = temp_dir.path().join(format!("dir{}", i));
+      std::fs::create_dir(&subdir).expect("failed to create subdir");
+      create_files(&subdir, vec!["a.txt", "b.txt"]);
+    }
+    let test_dir = temp_dir.path().to_str().unwrap().to_string();
+    let mut walk = _walk_files(test_dir, None, true, false, 1).expect("walk should start");
+    assert_eq!(walk.next().map(|batch| batch.len()), Some(1));
+    let options = Arc::clone(&walk.options);
+    drop(walk);
+    assert!(options.is_stopped());
+    // the walker threads release the options once they have all returned
+    let deadline = Instant::now() + Duration::from_secs(5);
+    while Arc::strong_count(&options) > 1 {
+      assert!(
+        Instant::now() < deadline,
+        "walk should stop after the walker is dropped"
+      );
+      std::thread::sleep(Duration::from_millis(1));
+    }
+  }
+
+  #[test]
+  fn test_walk_invalid_pattern() {
+    let result = _walk_files(".".to_string(), Some("[".to_string()), false, false, 256);
+    assert!(result.is_err());
+  }
+}
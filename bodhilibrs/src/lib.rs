@@ -1,4 +1,5 @@
 mod _glob;
+mod _walk;
 pub mod splitter;
 use pyo3::prelude::*;
 
@@ -6,6 +7,7 @@ use pyo3::prelude::*;
 #[pymodule]
 fn bodhilibrs(_py: Python, m: &PyModule) -> PyResult<()> {
   _glob::add_to_module(m)?;
+  _walk::add_to_module(m)?;
   Ok(())
 }
 
@@ -4,6 +4,7 @@ import inspect
 from ._components import LLM as LLM
 from ._components import LLM_SERVICE as LLM_SERVICE
 from ._components import PROMPT_SOURCE as PROMPT_SOURCE
+from ._components import RERANKER as RERANKER
 from ._components import RESOURCE_FACTORY as RESOURCE_FACTORY
 from ._components import RESOURCE_PROCESSOR as RESOURCE_PROCESSOR
 from ._components import RESOURCE_QUEUE as RESOURCE_QUEUE
@@ -12,6 +13,7 @@ from ._components import AbstractResourceProcessor as AbstractResourceProcessor
 from ._components import Embedder as Embedder
 from ._components import PromptSource as PromptSource
 from ._components import PromptTemplate as PromptTemplate
+from ._components import Reranker as Reranker
 from ._components import ResourceProcessor as ResourceProcessor
 from ._components import ResourceProcessorFactory as ResourceProcessorFactory
 from ._components import ResourceQueue as ResourceQueue
@@ -23,6 +25,7 @@ from ._components import VectorDBError as VectorDBError
 from ._components import get_embedder as get_embedder
 from ._components import get_llm as get_llm
 from ._components import get_prompt_source as get_prompt_source
+from ._components import get_reranker as get_reranker
 from ._components import get_resource_factory as get_resource_factory
 from ._components import get_resource_processor as get_resource_processor
 from ._components import get_resource_queue as get_resource_queue
@@ -31,6 +34,7 @@ from ._components import get_vector_db as get_vector_db
 from ._components import list_embedders as list_embedders
 from ._components import list_llms as list_llms
 from ._components import list_prompt_sources as list_prompt_sources
+from ._components import list_rerankers as list_rerankers
 from ._components import list_resource_factory as list_resource_factory
 from ._components import list_resource_processors as list_resource_processors
 from ._components import list_resource_queues as list_resource_queues
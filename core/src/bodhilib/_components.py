@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import functools
 import typing
 from typing import (
   Any,
@@ -40,6 +42,7 @@ RESOURCE_PROCESSOR = "resource_processor"
 RESOURCE_FACTORY = "resource_factory"
 SPLITTER = "splitter"
 EMBEDDER = "embedder"
+RERANKER = "reranker"
 LLM_SERVICE = "llm"
 VECTOR_DB = "vector_db"
 
@@ -421,6 +424,47 @@ class Embedder(abc.ABC):
     return 0
 
 
+# endregion
+# region reranker
+#######################################################################################################################
+class Reranker(abc.ABC):
+  """Abstract base class for rerankers.
+
+  A reranker scores the relevance of each candidate node to the query, more precisely than the similarity of the
+  embeddings, and is used to pick the top nodes from a wider set of candidates retrieved from the vector db.
+  A reranker should inherit from this class and implement the abstract methods.
+  """
+
+  @abc.abstractmethod
+  def score(self, query: TextLike, nodes: List[Node]) -> List[float]:
+    """Scores the relevance of the nodes to the query.
+
+    Args:
+        query (:data:`~bodhilib.TextLike`): the query
+        nodes (List[:class:`~bodhilib.Node`]): the candidate nodes
+
+    Returns:
+        List[float]: relevance score of each node, in the order of the nodes, higher is more relevant
+    """
+
+  def rerank(self, query: TextLike, nodes: List[Node], n: Optional[int] = None) -> List[Node]:
+    """Returns the top n nodes by their relevance to the query, in the order of the relevance.
+
+    Args:
+        query (:data:`~bodhilib.TextLike`): the query
+        nodes (List[:class:`~bodhilib.Node`]): the candidate nodes
+        n (Optional[int]): number of nodes to return, all the nodes if None
+
+    Returns:
+        List[:class:`~bodhilib.Node`]: the nodes ordered by relevance
+    """
+    if not nodes:
+      return []
+    scores = self.score(query, nodes)
+    order = sorted(range(len(nodes)), key=lambda i: -scores[i])
+    return [nodes[i] for i in order[:n]]
+
+
 # endregion
 # region llm
 #######################################################################################################################
@@ -666,6 +710,24 @@ class VectorDB(abc.ABC):
         VectorDBError: Wraps any database delete error raised by the underlying client.
     """
 
+  async def aquery(
+    self,
+    collection_name: str,
+    embedding: Union[Embedding, Node, SupportsEmbedding],
+    filter: Optional[Union[Dict[str, Any], Filter]] = None,
+    **kwargs: Dict[str, Any],
+  ) -> List[Node]:
+    """Search for the nearest vectors in the database asynchronously.
+
+    Takes the same arguments as :meth:`query`. Runs :meth:`query` in the default executor, so the event loop is
+    not blocked. Implementations with an async client should override it to use the async client.
+
+    Returns:
+        List of nodes with metadata.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(self.query, collection_name, embedding, filter, **kwargs))
+
 
 # endregion
 # region semanticsearchengine
@@ -733,7 +795,8 @@ class SemanticSearchEngine(abc.ABC):
     astream: Optional[bool] = None,
     prompt_template: Optional[PromptTemplate] = None,
     n: Optional[int] = 5,
-  ) -> Union[Prompt, AsyncIterator[Prompt]]:
+    stream: Optional[bool] = None,
+  ) -> Union[Prompt, Iterator[Prompt], AsyncIterator[Prompt]]:
     """Generate answer for given query using RAG technique.
 
     In RAG (Retrieval Augmented Generation), the following happens:
@@ -752,9 +815,13 @@ class SemanticSearchEngine(abc.ABC):
       astream (Optional[bool]): option to asynchronously stream the results as they are ready.
           If True, returns a PromptStream that streams the results as they are ready from LLM.
           If False, returns the result synchronously when ready.
+      n (Optional[int]): maximum number of nearest neighbours to use as the context
+      stream (Optional[bool]): option to stream the results as they are ready from LLM.
+          If True, returns an iterator of Prompt, e.g. :class:`~bodhilib.PromptStream`.
 
     Returns:
-      Prompt: a Prompt, if astream is False
+      Prompt: a Prompt, if astream and stream are False
+      Iterator[Prompt]: an iterator of Prompt, if stream is True
       AsyncIterator[Prompt]: an async iterator of Prompt, if astream is True
     """
 
@@ -779,6 +846,7 @@ def get_prompt_source(
   oftype: Optional[Type[PS]] = None,
   publisher: Optional[str] = "bodhiext",
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> PS:
   """Get an instance of PromptSource for given arguments."""
@@ -794,6 +862,7 @@ def get_prompt_source(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     **kwargs,
   )
   return cast(PS, prompt_source)
@@ -810,6 +879,7 @@ def get_resource_queue(
   oftype: Optional[Type[RQ]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> RQ:
   """Get an instance of resource queue for given arguments.
@@ -823,6 +893,8 @@ def get_resource_queue(
           the resource queue is cast to `oftype` and returned for better IDE support.
       publisher (Optional[str]): publisher/developer of the resource queue plugin, e.g. "bodhilib","<github-username>"
       version (Optional[str]): version of the resource queue
+      cached (bool): if True, the instance is cached and shared with the subsequent calls with the same arguments.
+          See :meth:`~bodhilib.PluginManager.close`.
       **kwargs (Dict[str, Any]): pass through arguments for the resource queue, e.g. aws_access_key_id, notion_db etc.
 
   Returns:
@@ -844,6 +916,7 @@ def get_resource_queue(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     **kwargs,
   )
   return cast(RQ, resource_queue)
@@ -864,6 +937,7 @@ def get_resource_processor(
   oftype: Optional[Type[RP]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> RP:
   if oftype is None:
@@ -878,6 +952,7 @@ def get_resource_processor(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     **kwargs,
   )
   return cast(RP, resource_processor)
@@ -898,6 +973,7 @@ def get_resource_factory(
   oftype: Optional[Type[RF]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> RF:
   if oftype is None:
@@ -912,6 +988,7 @@ def get_resource_factory(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     **kwargs,
   )
   return cast(RF, resource_processor)
@@ -940,6 +1017,7 @@ def get_splitter(
   oftype: Optional[Type[S]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> S:
   """Get an instance of splitter for given arguments.
@@ -959,6 +1037,7 @@ def get_splitter(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     **kwargs,
   )
   return cast(S, splitter)
@@ -975,6 +1054,7 @@ def get_embedder(
   oftype: Optional[Type[E]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> E:
   """Get an instance of embedder given the service name, publisher (optional) and version(optional).
@@ -985,6 +1065,8 @@ def get_embedder(
           the embedder is cast to `oftype` and returned for better IDE support.
       publisher (Optional[str]): publisher or developer of the embedder plugin, e.g. "bodhilib","<github-username>"
       version (Optional[str]): version of the embedder
+      cached (bool): if True, the instance is cached and shared with the subsequent calls with the same arguments.
+          See :meth:`~bodhilib.PluginManager.close`.
       **kwargs (Dict[str, Any]): pass through arguments for the embedder, e.g. dimension etc.
 
   Returns:
@@ -1000,7 +1082,9 @@ def get_embedder(
     return_type = oftype
 
   manager = PluginManager.instance()
-  embedder: E = manager.get(service_name, EMBEDDER, oftype=return_type, publisher=publisher, version=version, **kwargs)
+  embedder: E = manager.get(
+    service_name, EMBEDDER, oftype=return_type, publisher=publisher, version=version, cached=cached, **kwargs
+  )
   return cast(E, embedder)
 
 
@@ -1010,6 +1094,57 @@ def list_embedders() -> List[Service]:
   return manager.list_services(EMBEDDER)
 
 
+# Reranker
+RR = TypeVar("RR", bound=Reranker)
+"""TypeVar for Reranker."""
+
+
+def get_reranker(
+  service_name: str,
+  *,
+  oftype: Optional[Type[RR]] = None,
+  publisher: Optional[str] = None,
+  version: Optional[str] = None,
+  cached: bool = False,
+  **kwargs: Dict[str, Any],
+) -> RR:
+  """Get an instance of reranker given the service name, publisher (optional) and version(optional).
+
+  Args:
+      service_name (str): name of the service, e.g. "cross_encoder" etc.
+      oftype (Optional[Type[T]]): if the type of reranker is known, pass the type in argument `oftype`,
+          the reranker is cast to `oftype` and returned for better IDE support.
+      publisher (Optional[str]): publisher or developer of the reranker plugin, e.g. "bodhilib","<github-username>"
+      version (Optional[str]): version of the reranker
+      cached (bool): if True, the instance is cached and shared with the subsequent calls with the same arguments.
+          See :meth:`~bodhilib.PluginManager.close`.
+      **kwargs (Dict[str, Any]): pass through arguments for the reranker, e.g. model etc.
+
+  Returns:
+      RR (:data:`~bodhilib.RR` | :class:`~bodhilib.Reranker`): an instance of Reranker service
+          of type `oftype`, if oftype is passed, else of type :class:`~bodhilib.Reranker`
+
+  Raises:
+      TypeError: if the type of reranker is not oftype
+  """
+  if oftype is None:
+    return_type: Type[Any] = Reranker
+  else:
+    return_type = oftype
+
+  manager = PluginManager.instance()
+  reranker: RR = manager.get(
+    service_name, RERANKER, oftype=return_type, publisher=publisher, version=version, cached=cached, **kwargs
+  )
+  return cast(RR, reranker)
+
+
+def list_rerankers() -> List[Service]:
+  """List all rerankers installed and available."""
+  manager = PluginManager.instance()
+  return manager.list_services(RERANKER)
+
+
 # LLM
 L = TypeVar("L", bound=LLM)
 """TypeVar for LLM."""
@@ -1023,6 +1158,7 @@ def get_llm(
   oftype: Optional[Type[L]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   api_config: Optional[LLMApiConfig] = None,
   llm_config: Optional[LLMConfig] = None,
   **kwargs: Dict[str, Any],
@@ -1038,6 +1174,8 @@ def get_llm(
           the LLM is cast to `oftype` and returned for better IDE support.
       publisher (Optional[str]): publisher or developer of the service plugin, e.g. "bodhilib", "<github-username>"
       version (Optional[str]): version of the service
+      cached (bool): if True, the instance is cached and shared with the subsequent calls with the same arguments.
+          See :meth:`~bodhilib.PluginManager.close`.
       api_config (Optional[LLMApiConfig]): api config for the LLM call
       llm_config (Optional[LLMConfig]): default llm config for the generate call
       **kwargs (Dict[str, Any]): pass through arguments for the LLM service, e.g. "temperature", "max_tokens", etc.
@@ -1067,6 +1205,7 @@ def get_llm(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     api_config=passed_api_config,  # type: ignore
     llm_config=passed_llm_config,  # type: ignore
     **kwargs,
@@ -1091,6 +1230,7 @@ def get_vector_db(
   oftype: Optional[Type[V]] = None,
   publisher: Optional[str] = None,
   version: Optional[str] = None,
+  cached: bool = False,
   **kwargs: Dict[str, Any],
 ) -> V:
   """Get an instance of VectorDB for the given service name.
@@ -1110,6 +1250,7 @@ def get_vector_db(
     oftype=return_type,
     publisher=publisher,
     version=version,
+    cached=cached,
     **kwargs,
   )
   return cast(V, vector_db)
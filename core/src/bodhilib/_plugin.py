@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 import itertools
+import operator
+import os
+import re
 import sys
-from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, cast
+import threading
+from concurrent.futures import Future
+from importlib import metadata as importlib_metadata
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type, TypeVar, cast
 
 import pluggy
+from pydantic import BaseModel
 
 from bodhilib.common import package_name
 from bodhilib.logging import logger
@@ -12,6 +19,17 @@ from bodhilib.logging import logger
 hookspec = pluggy.HookspecMarker(package_name)
 service_provider = pluggy.HookimplMarker(package_name)
 current_module = sys.modules[__name__]
+MANIFEST_GROUP = f"{package_name}_services"
+"""Entry point group for the plugins declaring their services statically.
+
+Each entry point is named `<publisher>/<service_type>/<service_name>`, and refers to the service builder,
+e.g. `"bodhiext/embedder/sentence_transformers" = "bodhiext.st:sentence_transformer_builder"`.
+The version of the service is the version of the distribution declaring it."""
+PLUGIN_DISCOVERY_ENV = "BODHILIB_PLUGIN_DISCOVERY"
+"""Environment variable to set the plugin discovery mode, `manifest` (default) or `eager`.
+
+In `manifest` mode, the plugins declaring a service manifest are imported only when a service is built.
+In `eager` mode, all the plugins are imported to list the services."""
 
 
 class Service:
@@ -78,6 +96,168 @@ def bodhilib_list_services() -> List[Service]:
   return []
 
 
+_VERSION_PATTERN = re.compile(
+  r"^v?(\d+(?:\.\d+)*)(?:[-_.]?(dev|a|alpha|b|beta|c|rc|pre|preview|post)[-_.]?(\d*))?$", re.IGNORECASE
+)
+_VERSION_PHASES = {"dev": 0, "a": 1, "alpha": 1, "b": 2, "beta": 2, "c": 3, "rc": 3, "pre": 3, "preview": 3}
+_FINAL_PHASE = 4
+_POST_PHASE = 5
+_VERSION_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+  "==": operator.eq,
+  "!=": operator.ne,
+  ">=": operator.ge,
+  "<=": operator.le,
+  ">": operator.gt,
+  "<": operator.lt,
+}
+_SPECIFIER_PATTERN = re.compile(r"^\s*(==|!=|>=|<=|~=|>|<)?\s*(\S+)\s*$")
+_VersionKey = Tuple[Tuple[int, ...], Tuple[int, int]]
+
+
+def _version_key(version: str) -> _VersionKey:
+  match = _VERSION_PATTERN.match(version.strip())
+  if match is None:
+    raise ValueError(f"Invalid version: {version=}")
+  release = [int(part) for part in match.group(1).split(".")]
+  # 1.0 and 1.0.0 are the same version
+  while len(release) > 1 and release[-1] == 0:
+    release.pop()
+  phase, number = match.group(2), int(match.group(3) or 0)
+  if phase is None:
+    return tuple(release), (_FINAL_PHASE, 0)
+  if phase.lower() == "post":
+    return tuple(release), (_POST_PHASE, number)
+  return tuple(release), (_VERSION_PHASES[phase.lower()], number)
+
+
+def _version_matches(version: str, specifier: str) -> bool:
+  """Checks if the version satisfies the specifier.
+
+  The specifier is a comma separated list of clauses, e.g. ">=0.1.0,<0.2". A clause without an operator
+  matches the exact version. Supported operators are `==`, `!=`, `>=`, `<=`, `>`, `<` and `~=`.
+  """
+  try:
+    key = _version_key(version)
+  except ValueError:
+    return version == specifier
+  for clause in specifier.split(","):
+    match = _SPECIFIER_PATTERN.match(clause)
+    if match is None:
+      raise ValueError(f"Invalid version specifier: {specifier=}")
+    op, other = match.group(1) or "==", _version_key(match.group(2))
+    if op == "~=":
+      if not (key >= other and _release_prefix_matches(key[0], match.group(2))):
+        return False
+    elif not _VERSION_OPERATORS[op](key, other):
+      return False
+    # <0.2 does not match the pre-releases of 0.2, e.g. 0.2-dev
+    if op == "<" and other[1][0] == _FINAL_PHASE and key[0] == other[0]:
+      return False
+  return True
+
+
+def _release_prefix_matches(release: Tuple[int, ...], specifier_version: str) -> bool:
+  # compatible release, ~=1.4.2 matches >=1.4.2,==1.4.*
+  release_match = _VERSION_PATTERN.match(specifier_version.strip())
+  assert release_match is not None, f"Invalid version: {specifier_version=}"
+  parts = [int(part) for part in release_match.group(1).split(".")]
+  prefix = tuple(parts[:-1] if len(parts) > 1 else parts)
+  padded = release + (0,) * max(0, len(prefix) - len(release))
+  return padded[: len(prefix)] == prefix
+
+
+class _ServiceRegistry:
+  """Index of the services by service type, service name, publisher and version.
+
+  The candidates for a service type and name are sorted with the latest version first, and then by publisher,
+  so the resolution is deterministic when multiple plugins publish the same service name.
+  """
+
+  def __init__(self, services: List[Service]) -> None:
+    self.by_type: Dict[str, List[Service]] = {}
+    self.by_name: Dict[Tuple[str, str], List[Service]] = {}
+    self.by_key: Dict[Tuple[str, str, str, str], Service] = {}
+    for service in services:
+      key = (service.service_type, service.service_name, service.publisher, service.version)
+      if key in self.by_key:
+        logger.warning({"msg": "duplicate service, ignoring", "service": service})
+        continue
+      self.by_key[key] = service
+      self.by_type.setdefault(service.service_type, []).append(service)
+      self.by_name.setdefault((service.service_type, service.service_name), []).append(service)
+    for candidates in self.by_name.values():
+      candidates.sort(key=lambda service: service.publisher)
+      candidates.sort(key=_sort_version_key, reverse=True)
+
+  def resolve(
+    self, service_type: str, service_name: str, publisher: Optional[str] = None, version: Optional[str] = None
+  ) -> Optional[Service]:
+    if publisher is not None and version is not None:
+      service = self.by_key.get((service_type, service_name, publisher, version))
+      if service is not None:
+        return service
+    for service in self.by_name.get((service_type, service_name), []):
+      if publisher is not None and service.publisher != publisher:
+        continue
+      if version is not None and not _version_matches(service.version, version):
+        continue
+      return service
+    return None
+
+  def list_services(self, service_type: str) -> List[Service]:
+    return list(self.by_type.get(service_type, []))
+
+
+def _sort_version_key(service: Service) -> _VersionKey:
+  try:
+    return _version_key(service.version)
+  except ValueError:
+    # invalid versions are sorted last
+    return (), (-1, 0)
+
+
+class _LazyServiceBuilder:
+  """Service builder declared in the service manifest, imports the plugin when the service is first built."""
+
+  def __init__(self, entry_point: importlib_metadata.EntryPoint) -> None:
+    self.entry_point = entry_point
+    self.builder: Optional[Callable] = None
+
+  def __call__(self, **kwargs: Any) -> Any:
+    if self.builder is None:
+      self.builder = self.entry_point.load()
+    return self.builder(**kwargs)
+
+  def __repr__(self) -> str:
+    return f"_LazyServiceBuilder({self.entry_point.value})"
+
+
+def _manifest_service(entry_point: importlib_metadata.EntryPoint, version: str) -> Optional[Service]:
+  parts = entry_point.name.split("/")
+  if len(parts) != 3 or not all(parts):
+    logger.warning({"msg": "invalid service manifest entry, ignoring", "entry_point": entry_point})
+    return None
+  publisher, service_type, service_name = parts
+  return Service(service_name, service_type, publisher, _LazyServiceBuilder(entry_point), version)
+
+
+def _cache_key(value: Any) -> Hashable:
+  # normalizes the arguments to a hashable key, config models and collections are compared by value
+  if isinstance(value, BaseModel):
+    return (type(value).__qualname__, value.model_dump_json())
+  if isinstance(value, dict):
+    return tuple(sorted(((str(k), _cache_key(v)) for k, v in value.items()), key=lambda item: item[0]))
+  if isinstance(value, (list, tuple)):
+    return tuple(_cache_key(v) for v in value)
+  if isinstance(value, (set, frozenset)):
+    return frozenset(_cache_key(v) for v in value)
+  try:
+    hash(value)
+  except TypeError as e:
+    raise ValueError(f"Cannot cache service instance, argument is not hashable: {value!r}") from e
+  return cast(Hashable, value)
+
+
 C = TypeVar("C")
 """TypeVar for Component (one of sub-class of :class:`~bodhilib.LLM`, :class:`~bodhilib.Embedder`,
 :class:`~bodhilib.ResourceQueue`).
@@ -88,6 +268,9 @@ class PluginManager:
   """Searches for and loads bodhilib plugins."""
 
   _instance: Optional["PluginManager"] = None
+  registry: Optional[_ServiceRegistry] = None
+  # the plugins are loaded once, by the first of the concurrent lookups
+  registry_lock = threading.Lock()
 
   def __new__(cls) -> "PluginManager":
     """Override `__new__` in case constructor is directly called."""
@@ -105,12 +288,15 @@ class PluginManager:
     return instance
 
   def __init__(self) -> None:
-    """Initialize plugin manager and load the bodhilib plugins."""
+    """Initialize plugin manager, the bodhilib plugins are loaded when the services are first requested."""
     pm = pluggy.PluginManager(package_name)
     pm.add_hookspecs(current_module)
-    pm.load_setuptools_entrypoints(package_name)
     self.pm = pm
     self.services: Optional[List[Service]] = None
+    self.registry = None
+    # the instance of a cached service is built once, the concurrent callers wait on its future
+    self.instances: Dict[Tuple[Any, ...], Future] = {}
+    self.instances_lock = threading.Lock()
 
   def get(
     self,
@@ -120,6 +306,7 @@ class PluginManager:
     oftype: Optional[Type[C]] = None,
     publisher: Optional[str] = None,
     version: Optional[str] = None,
+    cached: bool = False,
     **kwargs: Dict[str, Any],
   ) -> C:
     """Get an instance of service for the given service and type.
@@ -130,7 +317,11 @@ class PluginManager:
         oftype (Optional[Type[T]]): if the type of service is known, pass the type in argument `oftype`,
             the service is cast to `oftype` and returned for better IDE support.
         publisher (Optional[str]): publisher or developer of the service plugin, e.g. "bodhilib","<github-username>"
-        version (Optional[str]): version of the service
+        version (Optional[str]): version of the service, or a version range, e.g. ">=0.1.0,<0.2".
+            If multiple services match, the latest version is returned.
+        cached (bool): if True, the instance is cached and shared with the subsequent calls for the same service
+            and the same pass through arguments. The cached instances are released using :meth:`close`.
+            Defaults to False.
         **kwargs (Dict[str, Any]): pass through arguments for the service, e.g. "temperature", "max_tokens", etc.
 
     Returns:
@@ -139,13 +330,19 @@ class PluginManager:
 
     Raises:
         TypeError: if the type of service is not oftype
+        ValueError: if no service matches the service name, type, publisher and version,
+            or if the service is `cached` and a pass through argument is not hashable
     """
     if oftype is None:
       return_type: Type[Any] = type(Any)
     else:
       return_type = oftype
-    if self.services is None:
-      self.services = self._fetch_services()
+    service = self._get_registry().resolve(service_type, service_name, publisher, version)
+    if service is None:
+      raise ValueError(
+        f"Service {service_name=} of type {service_type=} not found in registered services"
+        + ("" if publisher is None and version is None else f", {publisher=}, {version=}")
+      )
     all_args = {
       "service_name": service_name,
       "service_type": service_type,
@@ -155,23 +352,71 @@ class PluginManager:
     }
     # remove None values
     all_args = {k: v for k, v in all_args.items() if v is not None}
-    for service in self.services:
-      if service.service_name == service_name and service.service_type == service_type:
-        component = service.service_builder(**all_args)
-        if not isinstance(component, return_type):
-          raise TypeError(f'Expecting {service_type} of type "{oftype}", but got "{type(component)}"')
-        return cast(C, component)
-    raise ValueError(f"Service {service_name=} of type {service_type=} not found in registered services")
+    if cached:
+      key = (service.service_type, service.service_name, service.publisher, service.version, _cache_key(kwargs))
+      with self.instances_lock:
+        future = self.instances.get(key)
+        building = future is None
+        if future is None:
+          future = self.instances[key] = Future()
+      if building:
+        # built outside the lock, so a slow build does not block the lookups of the other services
+        try:
+          future.set_result(service.service_builder(**all_args))
+        except BaseException as e:
+          with self.instances_lock:
+            if self.instances.get(key) is future:
+              del self.instances[key]
+          future.set_exception(e)
+          raise
+      component = future.result()
+    else:
+      component = service.service_builder(**all_args)
+    if not isinstance(component, return_type):
+      raise TypeError(f'Expecting {service_type} of type "{oftype}", but got "{type(component)}"')
+    return cast(C, component)
+
+  def close(self) -> None:
+    """Closes and releases the cached service instances.
+
+    The instances having a `close` method, e.g. :class:`~bodhilib.VectorDB`, are closed before being released.
+    """
+    with self.instances_lock:
+      futures = list(self.instances.values())
+      self.instances.clear()
+    instances = [future.result() for future in futures if future.done() and future.exception() is None]
+    for instance in instances:
+      close = getattr(instance, "close", None)
+      if not callable(close):
+        continue
+      try:
+        close()
+      except Exception as e:
+        logger.warning({"msg": "error closing service instance", "instance": instance, "error": e})
 
   def list_services(self, service_type: str) -> List[Service]:
     """List all services of type service_type installed and available."""
-    if self.services is None:
-      self.services = self._fetch_services()
-    return [s for s in self.services if s.service_type == service_type]
+    return self._get_registry().list_services(service_type)
+
+  def _get_registry(self) -> _ServiceRegistry:
+    registry = self.registry
+    if registry is not None:
+      return registry
+    with PluginManager.registry_lock:
+      if self.registry is None:
+        if self.services is None:
+          self.services = self._fetch_services()
+        self.registry = _ServiceRegistry(self.services)
+      return self.registry
 
   def _fetch_services(self) -> List[Service]:
     logger.debug({"msg": "fetching services"})
-    services = list(itertools.chain(*self.pm.hook.bodhilib_list_services()))
+    if os.environ.get(PLUGIN_DISCOVERY_ENV, "manifest") == "eager":
+      self.pm.load_setuptools_entrypoints(package_name)
+      manifest_services = []
+    else:
+      manifest_services = self._load_plugins()
+    services = list(itertools.chain(*self.pm.hook.bodhilib_list_services())) + manifest_services
     logger.debug({"msg": "fetched services", "services": services})
     # get list of services which are not instance of Service and log with warning
     invalid_services = [p for p in services if not isinstance(p, Service)]
@@ -181,3 +426,20 @@ class PluginManager:
     valid_services = [p for p in services if isinstance(p, Service)]
     logger.debug({"msg": "valid services", "services": valid_services})
     return valid_services
+
+  def _load_plugins(self) -> List[Service]:
+    # distributions declaring a service manifest are not imported,
+    # others are loaded and registered with pluggy to list the services using the hook
+    manifest_services: List[Service] = []
+    for dist in importlib_metadata.distributions():
+      entry_points = dist.entry_points
+      manifest = [ep for ep in entry_points if ep.group == MANIFEST_GROUP]
+      if manifest:
+        services = [_manifest_service(ep, dist.version) for ep in manifest]
+        manifest_services.extend(service for service in services if service is not None)
+        continue
+      for ep in entry_points:
+        if ep.group != package_name or self.pm.get_plugin(ep.name) or self.pm.is_blocked(ep.name):
+          continue
+        self.pm.register(ep.load(), name=ep.name)
+    return manifest_services
@@ -1,3 +1,8 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import EntryPoint
 from typing import List
 from unittest.mock import Mock
 
@@ -75,3 +80,244 @@ def test_plugin_service_eq():
   other = Service("test", "llm", "test_bodhilib", object(), "0.1.0", {})
   assert first == other
   assert hash(first) == hash(other)
+
+
+def _register_all(plugin_manager: PluginManager, *services: Service) -> None:
+  for service in services:
+    plugin_manager.register(service)
+
+
+def test_plugin_manager_get_resolves_latest_version():
+  old_builder, new_builder, dev_builder = Mock(), Mock(), Mock()
+  plugin_manager = PluginManagerStub()
+  _register_all(
+    plugin_manager,
+    Service("test", "llm", "test_bodhilib", old_builder, "0.1.9"),
+    Service("test", "llm", "test_bodhilib", new_builder, "0.1.10"),
+    Service("test", "llm", "test_bodhilib", dev_builder, "0.1.11-dev"),
+  )
+  plugin_manager.get("test", "llm", oftype=Mock)
+  dev_builder.assert_called_once()
+  plugin_manager.get("test", "llm", oftype=Mock, version="<0.1.11")
+  new_builder.assert_called_once()
+  plugin_manager.get("test", "llm", oftype=Mock, version=">=0.1,<0.1.10")
+  old_builder.assert_called_once()
+
+
+@pytest.mark.parametrize(
+  ["publisher", "expected"],
+  [(None, "first_publisher"), ("first_publisher", "first_publisher"), ("second_publisher", "second_publisher")],
+)
+def test_plugin_manager_get_matches_publisher(publisher, expected):
+  builders = {"first_publisher": Mock(), "second_publisher": Mock()}
+  plugin_manager = PluginManagerStub()
+  _register_all(
+    plugin_manager,
+    Service("test", "llm", "second_publisher", builders["second_publisher"], "0.1.0"),
+    Service("test", "llm", "first_publisher", builders["first_publisher"], "0.1.0"),
+  )
+  plugin_manager.get("test", "llm", oftype=Mock, publisher=publisher)
+  builders[expected].assert_called_once()
+  assert all(not builder.called for name, builder in builders.items() if name != expected)
+
+
+def test_plugin_manager_get_raises_if_no_version_matches():
+  plugin_manager = PluginManagerStub()
+  plugin_manager.register(Service("test", "llm", "test_bodhilib", Mock(), "0.1.0"))
+  with pytest.raises(ValueError) as e:
+    plugin_manager.get("test", "llm", oftype=Mock, version=">=0.2")
+  expected = (
+    "Service service_name='test' of type service_type='llm' not found in registered services, "
+    "publisher=None, version='>=0.2'"
+  )
+  assert str(e.value) == expected
+
+
+def test_plugin_manager_list_services_by_type():
+  plugin_manager = PluginManagerStub()
+  llm = Service("test", "llm", "test_bodhilib", Mock(), "0.1.0")
+  embedder = Service("test", "embedder", "test_bodhilib", Mock(), "0.1.0")
+  _register_all(plugin_manager, llm, embedder, Service("test", "llm", "test_bodhilib", Mock(), "0.1.0"))
+  assert plugin_manager.list_services("llm") == [llm]
+  assert plugin_manager.list_services("embedder") == [embedder]
+  assert plugin_manager.list_services("vector_db") == []
+
+
+@pytest.mark.parametrize(
+  ["version", "specifier", "expected"],
+  [
+    ("0.1.17", "0.1.17", True),
+    ("0.1.17", "==0.1.17.0", True),
+    ("0.1.17-dev", "0.1.17", False),
+    ("0.1.17-dev", ">=0.1.16", True),
+    ("0.1.17-dev", "<0.1.17", False),
+    ("0.1.17-dev", "<0.1.17rc1", True),
+    ("0.1.17rc1", ">0.1.17a2", True),
+    ("0.1.17.post1", ">0.1.17", True),
+    ("1.4.5", "~=1.4.2", True),
+    ("1.5.0", "~=1.4.2", False),
+    ("1.1.0", "~=1.0.2", False),
+    ("1.9", "~=1.4", True),
+    ("2.0", "~=1.4", False),
+    ("0.2.0", ">=0.1, !=0.2.0", False),
+    ("custom", "custom", True),
+  ],
+)
+def test_version_matches(version, specifier, expected):
+  from bodhilib._plugin import _version_matches
+
+  assert _version_matches(version, specifier) is expected
+
+
+class _IsolatedPluginManager(PluginManager):
+  def __new__(cls) -> "_IsolatedPluginManager":
+    return object.__new__(cls)
+
+
+class _FakeDistribution:
+  def __init__(self, version: str, entry_points: List[EntryPoint]) -> None:
+    self.version = version
+    self.entry_points = entry_points
+
+
+@pytest.fixture
+def manifest_plugin(tmp_path, monkeypatch):
+  module_name = f"_bodhilib_manifest_plugin_{tmp_path.name}"
+  tmp_path.joinpath(f"{module_name}.py").write_text("def build(**kwargs):\n  return kwargs\n")
+  monkeypatch.syspath_prepend(str(tmp_path))
+  entry_points = [
+    EntryPoint("test_publisher/llm/lazy_llm", f"{module_name}:build", "bodhilib_services"),
+    EntryPoint("invalid_name", f"{module_name}:build", "bodhilib_services"),
+    EntryPoint(module_name, module_name, "bodhilib"),
+  ]
+  distributions = [_FakeDistribution("1.2.0", entry_points)]
+  monkeypatch.setattr("bodhilib._plugin.importlib_metadata.distributions", lambda: distributions)
+  yield module_name
+  sys.modules.pop(module_name, None)
+
+
+def test_plugin_manager_manifest_services_are_loaded_lazily(manifest_plugin):
+  plugin_manager = _IsolatedPluginManager()
+  services = plugin_manager.list_services("llm")
+  assert [(s.service_name, s.publisher, s.version) for s in services] == [("lazy_llm", "test_publisher", "1.2.0")]
+  assert manifest_plugin not in sys.modules
+  component = plugin_manager.get("lazy_llm", "llm", oftype=dict, temperature=0.5)
+  assert manifest_plugin in sys.modules
+  assert component == {"service_name": "lazy_llm", "service_type": "llm", "temperature": 0.5}
+
+
+def test_plugin_manager_eager_discovery_loads_plugins(manifest_plugin, monkeypatch):
+  loaded = []
+  monkeypatch.setenv("BODHILIB_PLUGIN_DISCOVERY", "eager")
+  monkeypatch.setattr(
+    "pluggy.PluginManager.load_setuptools_entrypoints", lambda self, group, name=None: loaded.append(group)
+  )
+  plugin_manager = _IsolatedPluginManager()
+  assert plugin_manager.list_services("llm") == []
+  assert loaded == ["bodhilib"]
+
+
+@pytest.fixture
+def caching_manager():
+  plugin_manager = _IsolatedPluginManager()
+  builder = Mock(side_effect=lambda **kwargs: Mock(spec=LLM))
+  plugin_manager.services = [Service("test", "llm", "test_bodhilib", builder, "0.1.0")]
+  return plugin_manager, builder
+
+
+def test_plugin_manager_cached_instances_are_shared(caching_manager):
+  plugin_manager, builder = caching_manager
+  first = plugin_manager.get("test", "llm", oftype=LLM, cached=True, llm_config=LLMConfig(model="a"), tags=["x"])
+  second = plugin_manager.get("test", "llm", oftype=LLM, cached=True, tags=["x"], llm_config=LLMConfig(model="a"))
+  other = plugin_manager.get("test", "llm", oftype=LLM, cached=True, llm_config=LLMConfig(model="b"), tags=["x"])
+  uncached = plugin_manager.get("test", "llm", oftype=LLM, llm_config=LLMConfig(model="a"), tags=["x"])
+  assert first is second
+  assert first is not other
+  assert first is not uncached
+  assert builder.call_count == 3
+
+
+def test_plugin_manager_close_releases_cached_instances(caching_manager):
+  plugin_manager, builder = caching_manager
+  first = plugin_manager.get("test", "llm", oftype=LLM, cached=True)
+  first.close = Mock(side_effect=RuntimeError("already closed"))
+  plugin_manager.close()
+  first.close.assert_called_once()
+  second = plugin_manager.get("test", "llm", oftype=LLM, cached=True)
+  assert second is not first
+
+
+def test_plugin_manager_cached_build_does_not_block_other_services(caching_manager):
+  plugin_manager, builder = caching_manager
+  started, release = threading.Event(), threading.Event()
+
+  def slow_builder(**kwargs):
+    started.set()
+    assert release.wait(5)
+    return Mock(spec=LLM)
+
+  plugin_manager.services.append(Service("slow", "llm", "test_bodhilib", slow_builder, "0.1.0"))
+  with ThreadPoolExecutor(max_workers=3) as executor:
+    slow = [executor.submit(plugin_manager.get, "slow", "llm", oftype=LLM, cached=True) for _ in range(2)]
+    assert started.wait(5)
+    # the other cached service is built while the slow one is still building
+    other = executor.submit(plugin_manager.get, "test", "llm", oftype=LLM, cached=True).result(timeout=5)
+    release.set()
+    first, second = [future.result(timeout=5) for future in slow]
+  assert first is second
+  assert other is not first
+  assert builder.call_count == 1
+
+
+def test_plugin_manager_cached_builder_gets_other_cached_service(caching_manager):
+  plugin_manager, _ = caching_manager
+
+  def nested_builder(**kwargs):
+    return {"inner": plugin_manager.get("test", "llm", oftype=LLM, cached=True)}
+
+  plugin_manager.services.append(Service("nested", "llm", "test_bodhilib", nested_builder, "0.1.0"))
+  component = plugin_manager.get("nested", "llm", oftype=dict, cached=True)
+  assert component["inner"] is plugin_manager.get("test", "llm", oftype=LLM, cached=True)
+
+
+def test_plugin_manager_cached_build_error_is_not_cached(caching_manager):
+  plugin_manager, builder = caching_manager
+  builder.side_effect = [RuntimeError("build failed"), Mock(spec=LLM)]
+  with pytest.raises(RuntimeError, match="build failed"):
+    plugin_manager.get("test", "llm", oftype=LLM, cached=True)
+  assert isinstance(plugin_manager.get("test", "llm", oftype=LLM, cached=True), LLM)
+  assert builder.call_count == 2
+
+
+def test_plugin_manager_cached_raises_for_unhashable_argument(caching_manager):
+  plugin_manager, _ = caching_manager
+
+  class _Unhashable:
+    __hash__ = None
+
+  with pytest.raises(ValueError) as e:
+    plugin_manager.get("test", "llm", oftype=LLM, cached=True, client=_Unhashable())
+  assert str(e.value).startswith("Cannot cache service instance, argument is not hashable")
+
+
+def test_plugin_manager_loads_plugins_once_for_concurrent_lookups(manifest_plugin, monkeypatch):
+  plugin_manager = _IsolatedPluginManager()
+  barrier = threading.Barrier(4)
+  load_plugins = plugin_manager._load_plugins
+  calls = []
+
+  def slow_load_plugins():
+    calls.append(1)
+    time.sleep(0.05)
+    return load_plugins()
+
+  monkeypatch.setattr(plugin_manager, "_load_plugins", slow_load_plugins)
+
+  def lookup():
+    barrier.wait()
+    return plugin_manager.list_services("llm")
+
+  with ThreadPoolExecutor(max_workers=4) as executor:
+    results = list(executor.map(lambda _: lookup(), range(4)))
+  assert len(calls) == 1
+  assert all([service.service_name for service in services] == ["lazy_llm"] for services in results)
@@ -0,0 +1,28 @@
+from typing import List
+from unittest.mock import patch
+
+from bodhilib import Node, PluginManager, Reranker, Service, TextLike, list_rerankers
+
+
+class _LengthReranker(Reranker):
+  def score(self, query: TextLike, nodes: List[Node]) -> List[float]:
+    return [float(len(node.text)) for node in nodes]
+
+
+@patch.object(PluginManager, "list_services")
+def test_reranker_list_services_calls_plugin_manager(mock_list_services):
+  mock_list_services.return_value = [Service("test", "reranker", "bodhilib-test", lambda: None, "0.1.0")]
+  _ = list_rerankers()
+  mock_list_services.assert_called_once_with("reranker")
+
+
+def test_reranker_rerank_orders_by_score():
+  nodes = [Node(text="aa"), Node(text="a"), Node(text="aaa")]
+  result = _LengthReranker().rerank("query", nodes, n=2)
+  assert [node.text for node in result] == ["aaa", "aa"]
+
+
+def test_reranker_rerank_returns_all_nodes_if_n_is_none():
+  nodes = [Node(text="a"), Node(text="aa")]
+  assert [node.text for node in _LengthReranker().rerank("query", nodes)] == ["aa", "a"]
+  assert _LengthReranker().rerank("query", []) == []
@@ -3,6 +3,10 @@ from typing import Any, Dict, List, cast
 import yaml
 
 
+# the libyaml bindings parse several times faster than the pure python loader
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 class CustomDumper(yaml.SafeDumper):
   """Custom dumper that represents multi-line strings using '|'."""
 
@@ -43,5 +47,5 @@ def yaml_dump(data: Any, **kwargs) -> str:  # type: ignore
 
 
 def yaml_load(data: str) -> Dict[str, Any]:
-  """YAML safe load from the file content."""
-  return cast(Dict[str, Any], yaml.safe_load(data))
+  """YAML safe load from the file content, using the libyaml based loader if available."""
+  return cast(Dict[str, Any], yaml.load(data, Loader=SafeLoader))
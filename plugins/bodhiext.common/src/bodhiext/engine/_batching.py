@@ -0,0 +1,85 @@
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from bodhilib import Embedder, Node
+
+# a few milliseconds, long enough to gather the concurrent queries, short enough to not add noticeable latency
+DEFAULT_BATCH_WINDOW = 0.002
+
+
+class EmbeddingBatcher:
+  def __init__(self, embedder: Embedder, window: float = DEFAULT_BATCH_WINDOW) -> None:
+    """Coalesces the concurrent embedding requests into batches for the embedder.
+
+    The nodes requested within `window` seconds of the first pending request are embedded together in a single
+    call to the embedder, run in the default executor. The batch is sent early when it reaches the embedder's
+    batch size.
+
+    Args:
+        embedder (:class:`~bodhilib.Embedder`): the embedder to batch the requests for
+        window (float): seconds to wait for more requests before sending a batch
+    """
+    self.embedder = embedder
+    self.window = window
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._pending: List[Tuple[Node, "asyncio.Future[Node]"]] = []
+    self._timer: Optional[asyncio.TimerHandle] = None
+    # references to the running batches, so they are not garbage collected before completion
+    self._batches: Set["asyncio.Task[None]"] = set()
+
+  async def embed(self, node: Node) -> Node:
+    """Returns the node with its embedding, once its batch is embedded."""
+    loop = asyncio.get_running_loop()
+    if loop is not self._loop:
+      self._detach()
+      self._loop = loop
+    future: "asyncio.Future[Node]" = loop.create_future()
+    self._pending.append((node, future))
+    if 0 < self.embedder.batch_size <= len(self._pending):
+      self._flush(loop)
+    elif self._timer is None:
+      self._timer = loop.call_later(self.window, self._flush, loop)
+    return await future
+
+  def _detach(self) -> None:
+    # the pending requests belong to the event loop they were made on, and are embedded on that loop
+    loop, pending, timer = self._loop, self._pending, self._timer
+    self._pending, self._timer = [], None
+    if loop is None or loop.is_closed():
+      return
+    if timer is not None:
+      loop.call_soon_threadsafe(timer.cancel)
+    if pending:
+      loop.call_soon_threadsafe(self._send, loop, pending)
+
+  def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+    if loop is not self._loop:
+      # the timer of a detached event loop, its requests were sent on detaching
+      return
+    if self._timer is not None:
+      self._timer.cancel()
+      self._timer = None
+    pending, self._pending = self._pending, []
+    if pending:
+      self._send(loop, pending)
+
+  def _send(self, loop: asyncio.AbstractEventLoop, pending: List[Tuple[Node, "asyncio.Future[Node]"]]) -> None:
+    task = loop.create_task(self._embed_batch(pending))
+    self._batches.add(task)
+    task.add_done_callback(self._batches.discard)
+
+  async def _embed_batch(self, pending: List[Tuple[Node, "asyncio.Future[Node]"]]) -> None:
+    loop = asyncio.get_running_loop()
+    nodes = [node for node, _ in pending]
+    try:
+      embedded: List[Node] = await loop.run_in_executor(None, self.embedder.embed, nodes)
+      if len(embedded) != len(nodes):
+        raise ValueError(f"Embedder returned {len(embedded)} embeddings for a batch of {len(nodes)} nodes")
+    except Exception as e:
+      for _, future in pending:
+        if not future.done():
+          future.set_exception(e)
+      return
+    for (_, future), node in zip(pending, embedded):
+      if not future.done():
+        future.set_result(node)
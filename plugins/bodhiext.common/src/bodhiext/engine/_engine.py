@@ -1,9 +1,11 @@
+import asyncio
 import textwrap
 import typing
-from typing import AsyncIterator, List, Literal, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, List, Literal, Optional, Union
 
 from bodhiext.prompt_template import StringPromptTemplate
-from bodhiext.resources import DefaultQueueProcessor, DocumentVectorizer
+from bodhiext.resources import BM25Index, DefaultQueueProcessor, DocumentVectorizer
 from bodhilib import (
   LLM,
   Embedder,
@@ -11,6 +13,7 @@ from bodhilib import (
   Node,
   Prompt,
   PromptTemplate,
+  Reranker,
   ResourceProcessorFactory,
   ResourceQueue,
   SemanticSearchEngine,
@@ -20,6 +23,22 @@ from bodhilib import (
   to_prompt,
 )
 
+from ._batching import DEFAULT_BATCH_WINDOW, EmbeddingBatcher
+from ._fusion import reciprocal_rank_fusion
+from ._packing import count_words, pack_contexts
+
+DEFAULT_RAG_TEMPLATE = textwrap.dedent(
+  """
+  Below are snippets of document related to question at the end.
+  Read and understand the context properly to answer the question.
+  {% for context in contexts -%}
+  {{ loop.index }}. {{ context.text }}
+  {% endfor %}
+  Answer the question below based on the context provided above
+  Question: {{query}}
+  """
+).strip()
+
 
 class DefaultSemanticEngine(SemanticSearchEngine):
   def __init__(
@@ -32,16 +51,50 @@ class DefaultSemanticEngine(SemanticSearchEngine):
     llm: LLM,
     collection_name: str,
     distance: Optional[str] = "cosine",
+    context_tokens: Optional[int] = None,
+    count_tokens: Optional[Callable[[str], int]] = None,
+    hybrid: bool = False,
+    reranker: Optional[Reranker] = None,
+    rerank_factor: int = 4,
+    batch_window: float = DEFAULT_BATCH_WINDOW,
   ):
+    """Semantic search engine, ingesting the resources into the vector db, and answering the queries using RAG.
+
+    Args:
+        context_tokens (Optional[int]): token budget for the contexts in the RAG prompt, unlimited if None
+        count_tokens (Optional[Callable[[str], int]]): counts the tokens of a context, defaults to number of words
+        hybrid (bool): if True, the ingested nodes are also indexed for BM25 lexical search, and :meth:`ann` fuses
+            the lexical and vector search results using reciprocal rank fusion
+        reranker (Optional[:class:`~bodhilib.Reranker`]): if given, :meth:`ann` retrieves `n * rerank_factor`
+            candidates, and returns the top n candidates reranked by the reranker
+        rerank_factor (int): number of candidates retrieved for reranking, as a multiple of n
+        batch_window (float): seconds the concurrent async :meth:`ann` calls are gathered for, to embed their
+            queries in a single embedder batch
+    """
     self.resource_queue = resource_queue
     self.embedder = embedder
     self.vector_db = vector_db
     self.llm = llm
     self.collection_name = collection_name
     self.distance = distance or "cosine"
-    document_vectorizer = DocumentVectorizer(splitter, embedder, vector_db, llm, collection_name, distance)
+    self.context_tokens = context_tokens
+    self.count_tokens = count_tokens or count_words
+    assert rerank_factor > 0, f"{rerank_factor=} should be greater than 0"
+    self.reranker = reranker
+    self.rerank_factor = rerank_factor
+    self.embedding_batcher = EmbeddingBatcher(embedder, window=batch_window)
+    self.bm25_index = BM25Index() if hybrid else None
+    # runs the lexical search concurrently with the vector search of the calling thread
+    self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(thread_name_prefix="bm25") if hybrid else None
+    document_vectorizer = DocumentVectorizer(
+      splitter, embedder, vector_db, llm, collection_name, distance, bm25_index=self.bm25_index
+    )
     self.queue_processor = DefaultQueueProcessor(resource_queue, factory)
     self.queue_processor.add_resource_processor(document_vectorizer)
+    # built once, and rendered with the cached compiled template on every rag call
+    self.default_prompt_template = StringPromptTemplate(
+      prompts=[Prompt(text=DEFAULT_RAG_TEMPLATE)], metadata={"format": "jinja2"}
+    )
 
   def add_resource(self, resource: IsResource) -> None:
     self.resource_queue.push(resource)
@@ -61,6 +114,12 @@ class DefaultSemanticEngine(SemanticSearchEngine):
   async def aingest(self) -> None:
     await self.queue_processor.astart()
 
+  def close(self) -> None:
+    """Stops the executor of the hybrid search, if started."""
+    executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown(wait=True)
+
   @typing.overload
   def ann(self, query: TextLike, *, n: Optional[int] = ...) -> List[Node]:
     ...
@@ -76,12 +135,53 @@ class DefaultSemanticEngine(SemanticSearchEngine):
   def ann(
     self, query: TextLike, astream: Optional[bool] = None, n: Optional[int] = 5
   ) -> Union[List[Node], AsyncIterator[List[Node]]]:
-    if astream:
-      raise NotImplementedError("async ann is not implemented")
     prompt = to_prompt(query)
+    if astream:
+      return self._aann(prompt, n)
+    if self.reranker is None:
+      return self._search(prompt, n)
+    candidates = self._search(prompt, None if n is None else n * self.rerank_factor)
+    return self.reranker.rerank(prompt, candidates, n)
+
+  def _search(self, prompt: Prompt, n: Optional[int]) -> List[Node]:
+    if self.bm25_index is None or self._executor is None:
+      return self._vector_search(prompt, n)
+    lexical_future = self._executor.submit(self.bm25_index.search, prompt.text, n)
+    vector = self._vector_search(prompt, n)
+    lexical = [node for node, _ in lexical_future.result()]
+    return reciprocal_rank_fusion([vector, lexical], n)
+
+  async def _aann(self, prompt: Prompt, n: Optional[int]) -> AsyncIterator[List[Node]]:
+    # the results are yielded once, when all the nodes are retrieved
+    if self.reranker is None:
+      yield await self._asearch(prompt, n)
+      return
+    candidates = await self._asearch(prompt, None if n is None else n * self.rerank_factor)
+    loop = asyncio.get_running_loop()
+    yield await loop.run_in_executor(None, self.reranker.rerank, prompt, candidates, n)
+
+  async def _asearch(self, prompt: Prompt, n: Optional[int]) -> List[Node]:
+    if self.bm25_index is None:
+      return await self._avector_search(prompt, n)
+    loop = asyncio.get_running_loop()
+    vector, scored = await asyncio.gather(
+      self._avector_search(prompt, n), loop.run_in_executor(None, self.bm25_index.search, prompt.text, n)
+    )
+    return reciprocal_rank_fusion([vector, [node for node, _ in scored]], n)
+
+  async def _avector_search(self, prompt: Prompt, n: Optional[int]) -> List[Node]:
+    embedding = await self.embedding_batcher.embed(Node(text=prompt.text))
+    if n is None:
+      return await self.vector_db.aquery(self.collection_name, embedding)
+    result = await self.vector_db.aquery(self.collection_name, embedding, limit=n)  # type: ignore
+    return result[:n]
+
+  def _vector_search(self, prompt: Prompt, n: Optional[int]) -> List[Node]:
     embeddings = self.embedder.embed(prompt)
-    result = self.vector_db.query(self.collection_name, embeddings[0])
-    return result
+    if n is None:
+      return self.vector_db.query(self.collection_name, embeddings[0])
+    result = self.vector_db.query(self.collection_name, embeddings[0], limit=n)  # type: ignore
+    return result[:n]
 
   def rag(
     self,
@@ -89,23 +189,14 @@ class DefaultSemanticEngine(SemanticSearchEngine):
     prompt_template: Optional[PromptTemplate] = None,
     astream: Optional[bool] = False,
     n: Optional[int] = 5,
-  ) -> Union[Prompt, AsyncIterator[Prompt]]:
+    stream: Optional[bool] = False,
+  ) -> Union[Prompt, Iterator[Prompt], AsyncIterator[Prompt]]:
     if astream:
       raise NotImplementedError("async answer is not implemented")
-    contexts: List[Node] = self.ann(query, astream=astream, n=n)
+    nodes: List[Node] = self.ann(query, astream=astream, n=n)
+    contexts = pack_contexts(nodes, n=n, max_tokens=self.context_tokens, count_tokens=self.count_tokens)
     if prompt_template is None:
-      text = """
-        Below are snippets of document related to question at the end.
-        Read and understand the context properly to answer the question.
-        {% for context in contexts -%}
-        {{ loop.index }}. {{context}}
-        {% endfor %}
-        Answer the question below based on the context provided above
-        Question: {{query}}
-      """
-      text = textwrap.dedent(text).strip()
-      prompt = Prompt(text=text)
-      prompt_template = StringPromptTemplate(prompts=[prompt], metadata={"format": "jinja2"})
+      prompt_template = self.default_prompt_template
     prompts = prompt_template.to_prompts(contexts=contexts, query=query)  # type: ignore
-    response = self.llm.generate(prompts, astream=astream)
+    response = self.llm.generate(prompts, stream=stream, astream=astream)  # type: ignore
     return response
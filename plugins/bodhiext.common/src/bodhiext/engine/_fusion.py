@@ -0,0 +1,31 @@
+from typing import Dict, Hashable, List, Optional
+
+from bodhilib import Node
+
+# the rank constant from the reciprocal rank fusion paper, dampening the weight of the top ranks
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: List[List[Node]], n: Optional[int] = None, k: int = RRF_K) -> List[Node]:
+  """Fuses the rankings of the nodes by the sum of their reciprocal ranks, `1 / (k + rank)`, across the rankings.
+
+  The nodes are identified by their id, or by their text if the id is missing.
+
+  Args:
+      rankings (List[List[:class:`~bodhilib.Node`]]): the rankings, each in the order of its own score
+      n (Optional[int]): number of nodes to return, all nodes if None
+      k (int): rank constant
+
+  Returns:
+      List[:class:`~bodhilib.Node`]: the fused ranking
+  """
+  scores: Dict[Hashable, float] = {}
+  nodes: Dict[Hashable, Node] = {}
+  for ranking in rankings:
+    for rank, node in enumerate(ranking, start=1):
+      key = node.id if node.id is not None else node.text
+      nodes.setdefault(key, node)
+      scores[key] = scores.get(key, 0.0) + 1 / (k + rank)
+  # sorted is stable, the ties keep the order of the first ranking
+  fused = [nodes[key] for key in sorted(scores, key=lambda key: -scores[key])]
+  return fused if n is None else fused[:n]
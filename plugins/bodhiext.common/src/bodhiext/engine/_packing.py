@@ -0,0 +1,95 @@
+from typing import Callable, Hashable, List, Optional
+
+from bodhilib import Node
+
+# overlaps shorter than this are coincidental, and not the overlap between the consecutive chunks of a split
+MIN_OVERLAP_CHARS = 16
+
+
+def count_words(text: str) -> int:
+  """Returns the number of whitespace separated words, used as the default estimate of the number of tokens."""
+  return len(text.split())
+
+
+def pack_contexts(
+  nodes: List[Node],
+  n: Optional[int] = None,
+  max_tokens: Optional[int] = None,
+  count_tokens: Callable[[str], int] = count_words,
+) -> List[Node]:
+  """Packs the retrieved nodes into the contexts for the RAG prompt.
+
+  The nodes are expected in the order of their score, as returned by the vector database. Overlapping chunks of the
+  same parent document are merged into a single context, so the overlapping text is sent only once. The contexts
+  are then greedily added in the order of score, skipping the ones not fitting in the remaining token budget.
+
+  Args:
+      nodes (List[:class:`~bodhilib.Node`]): the retrieved nodes, in the order of their score
+      n (Optional[int]): maximum number of contexts, all contexts if None
+      max_tokens (Optional[int]): token budget for the contexts, unlimited if None
+      count_tokens (Callable[[str], int]): counts the tokens of the context text, defaults to number of words
+
+  Returns:
+      List[:class:`~bodhilib.Node`]: the contexts, in the order of their score
+  """
+  contexts = _merge_overlapping(nodes)
+  if n is not None:
+    contexts = contexts[:n]
+  if max_tokens is None:
+    return contexts
+  packed: List[Node] = []
+  remaining = max_tokens
+  for context in contexts:
+    tokens = count_tokens(context.text)
+    if tokens <= remaining:
+      packed.append(context)
+      remaining -= tokens
+  return packed
+
+
+def _merge_overlapping(nodes: List[Node]) -> List[Node]:
+  contexts: List[Node] = []
+  for node in nodes:
+    key = _parent_key(node)
+    for i, context in enumerate(contexts):
+      if key is None or _parent_key(context) != key:
+        continue
+      merged = _merge_text(context.text, node.text)
+      if merged is not None:
+        # the merged context keeps the position of the higher scoring chunk
+        contexts[i] = context.model_copy(update={"text": merged})
+        break
+    else:
+      contexts.append(node)
+  return contexts
+
+
+def _parent_key(node: Node) -> Optional[Hashable]:
+  if node.parent is not None:
+    return node.parent.metadata.get("path") or id(node.parent)
+  path = node.metadata.get("path")
+  return str(path) if path is not None else None
+
+
+def _merge_text(first: str, second: str) -> Optional[str]:
+  if second in first:
+    return first
+  if first in second:
+    return second
+  merged = _join_overlap(first, second)
+  if merged is None:
+    merged = _join_overlap(second, first)
+  return merged
+
+
+def _join_overlap(head: str, tail: str) -> Optional[str]:
+  # finds the longest suffix of head which is a prefix of tail
+  if min(len(head), len(tail)) < MIN_OVERLAP_CHARS:
+    return None
+  marker = tail[:MIN_OVERLAP_CHARS]
+  start = head.find(marker, max(0, len(head) - len(tail)))
+  while start != -1:
+    if tail.startswith(head[start:]):
+      return head + tail[len(head) - start :]
+    start = head.find(marker, start + 1)
+  return None
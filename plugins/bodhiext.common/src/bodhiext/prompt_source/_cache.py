@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bodhilib import PathLike, PromptTemplate
+from bodhilib.logging import logger
+
+from ._yaml import _parse_templates, _to_templates
+
+CACHE_VERSION = 1
+
+
+class TemplateFileCache:
+  def __init__(self, cache_dir: PathLike) -> None:
+    """Cache of the parsed prompt template files, serialized as json in the `cache_dir`.
+
+    A cached file is reused if the modified time and size of the file are unchanged, or else if the hash of the
+    file content is unchanged. Otherwise the file is parsed again, and the cache updated.
+
+    Args:
+        cache_dir (:data:`~bodhilib.PathLike`): directory to store the parsed templates, created if missing
+    """
+    self.cache_dir = Path(cache_dir)
+    self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+  def load(self, path: PathLike) -> List[PromptTemplate]:
+    """Returns the prompt templates of the yaml file, from the cache if the file is unchanged."""
+    abspath = os.path.abspath(path)
+    stat = os.stat(abspath)
+    cache_file = self.cache_dir / f"{hashlib.sha256(abspath.encode('utf-8')).hexdigest()}.json"
+    entry = _read_entry(cache_file)
+    if entry is not None and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+      return _to_templates(entry["templates"])
+    with open(abspath, "rb") as f:
+      content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if entry is not None and entry["sha256"] == digest:
+      parsed_templates = entry["templates"]
+    else:
+      parsed_templates = _parse_templates(content.decode("utf-8"))
+    entry = {
+      "version": CACHE_VERSION,
+      "mtime_ns": stat.st_mtime_ns,
+      "size": stat.st_size,
+      "sha256": digest,
+      "templates": parsed_templates,
+    }
+    _write_entry(cache_file, entry)
+    return _to_templates(parsed_templates)
+
+
+def _read_entry(cache_file: Path) -> Optional[Dict[str, Any]]:
+  try:
+    with open(cache_file, "r", encoding="utf-8") as f:
+      entry: Dict[str, Any] = json.load(f)
+  except (OSError, ValueError):
+    return None
+  return entry if entry.get("version") == CACHE_VERSION else None
+
+
+def _write_entry(cache_file: Path, entry: Dict[str, Any]) -> None:
+  try:
+    serialized = json.dumps(entry)
+  except (TypeError, ValueError) as e:
+    logger.debug(f"Skipping caching the parsed templates, not json serializable: {e}")
+    return
+  # written to a temporary file and renamed, so a concurrent reader never sees a partial entry
+  tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+  try:
+    tmp_file.write_text(serialized, encoding="utf-8")
+    os.replace(tmp_file, cache_file)
+  except OSError as e:
+    logger.debug(f"Unable to write the template cache: {cache_file}, error: {e}")
@@ -0,0 +1,115 @@
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Hashable, List, Optional, Set, Tuple
+
+from bodhilib import And, Condition, Nor, OperatorCondition, Or, PromptTemplate
+
+LIST_OPERATORS = ("$in", "$nin", "$all")
+
+
+class TemplateIndex:
+  def __init__(self, templates: List[PromptTemplate]) -> None:
+    """Inverted indexes over the metadata of the prompt templates.
+
+    Every metadata key is indexed, the scalar values by value, and the list values (e.g. `tags`) by element.
+    The `$eq`, `$in` and `$all` conditions, and their `$and` and `$or` combinations, are looked up as set
+    operations over the indexes. The other operators are not indexed, and are evaluated on the templates.
+
+    The matches and the errors are the same as evaluating the condition on every template. If a template left out
+    by the indexes lacks a field of the condition, or has a non-list value for a list operator, evaluating the
+    condition can raise a ValueError for it, and the condition is evaluated on all the templates instead.
+
+    Args:
+        templates (List[:class:`~bodhilib.PromptTemplate`]): the templates to index, in the order returned
+    """
+    self.templates = templates
+    self.by_id: Dict[Any, PromptTemplate] = {}
+    self.values: DefaultDict[str, DefaultDict[Hashable, Set[int]]] = defaultdict(lambda: defaultdict(set))
+    self.elements: DefaultDict[str, DefaultDict[Hashable, Set[int]]] = defaultdict(lambda: defaultdict(set))
+    # positions of the templates having the field, and having a list value for the field
+    self.fields: DefaultDict[str, Set[int]] = defaultdict(set)
+    self.lists: DefaultDict[str, Set[int]] = defaultdict(set)
+    self._invalid: Dict[Tuple[str, bool], Set[int]] = {}
+    for position, template in enumerate(templates):
+      metadata = template.metadata
+      if "id" in metadata and _is_hashable(metadata["id"]):
+        self.by_id.setdefault(metadata["id"], template)
+      for key, value in metadata.items():
+        self.fields[key].add(position)
+        if isinstance(value, list):
+          self.lists[key].add(position)
+          for element in value:
+            if _is_hashable(element):
+              self.elements[key][element].add(position)
+        elif _is_hashable(value):
+          self.values[key][value].add(position)
+
+  def find(self, condition: Condition) -> List[PromptTemplate]:
+    """Returns the templates matching the condition, in the order of the templates."""
+    positions = self.candidates(condition)
+    if positions is not None and not self._invalid_positions(condition) <= positions:
+      # a template left out can raise evaluating the condition, evaluated on all the templates to raise the same
+      positions = None
+    templates = self.templates if positions is None else [self.templates[position] for position in sorted(positions)]
+    return [template for template in templates if condition.evaluate(template.metadata)]
+
+  def candidates(self, condition: Condition) -> Optional[Set[int]]:
+    """Returns the positions of the templates that can match the condition, or None if not indexed.
+
+    The candidates are a superset of the matches, the condition is evaluated on the candidates to find the matches.
+    """
+    if isinstance(condition, OperatorCondition):
+      return self._operator_candidates(condition)
+    if isinstance(condition, And):
+      indexed = [c for c in (self.candidates(sub) for sub in condition.conditions) if c is not None]
+      return set.intersection(*indexed) if indexed else None
+    if isinstance(condition, Or):
+      union: Set[int] = set()
+      for sub in condition.conditions:
+        sub_candidates = self.candidates(sub)
+        if sub_candidates is None:
+          return None
+        union |= sub_candidates
+      return union
+    return None
+
+  def _invalid_positions(self, condition: Condition) -> Set[int]:
+    # positions of the templates the condition can raise a ValueError for, when evaluated
+    if isinstance(condition, OperatorCondition):
+      is_list = condition.operator in LIST_OPERATORS
+      key = (condition.field, is_list)
+      if key not in self._invalid:
+        valid = self.lists[condition.field] if is_list else self.fields[condition.field]
+        self._invalid[key] = set(range(len(self.templates))) - valid
+      return self._invalid[key]
+    if isinstance(condition, (And, Or, Nor)):
+      return set().union(*(self._invalid_positions(sub) for sub in condition.conditions))
+    return set(range(len(self.templates)))
+
+  def _operator_candidates(self, condition: OperatorCondition) -> Optional[Set[int]]:
+    field, value = condition.field, condition.value
+    if condition.operator == "$eq" and not isinstance(value, list) and _is_hashable(value):
+      return set(self.values[field].get(value, set()))
+    if condition.operator in ("$in", "$all") and _is_hashable_list(value):
+      postings = [self.elements[field].get(element, set()) for element in value]
+      if condition.operator == "$in":
+        return set().union(*postings)
+      if postings:
+        return set.intersection(*postings)
+    return None
+
+
+def matches(condition: Condition, template: PromptTemplate) -> bool:
+  """Returns True if the template matches the condition, evaluated as by :meth:`TemplateIndex.find`."""
+  return bool(TemplateIndex([template]).find(condition))
+
+
+def _is_hashable(value: Any) -> bool:
+  try:
+    hash(value)
+  except TypeError:
+    return False
+  return True
+
+
+def _is_hashable_list(value: Any) -> bool:
+  return isinstance(value, (list, tuple, set)) and all(_is_hashable(element) for element in value)
@@ -1,12 +1,16 @@
 import importlib.resources
 import os
 import sys
+import time
 import typing
-from typing import Any, Dict, Iterator, List, Literal, Optional, Union
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
 from bodhiext.common import __version__
 from bodhilib import Filter, PathLike, PromptSource, PromptTemplate, Service, service_provider
+from bodhilib.logging import logger
 
+from ._cache import TemplateFileCache
+from ._index import TemplateIndex, matches
 from ._yaml import _is_yaml, load_prompt_template_yaml
 
 DEFAULT_TEMPLATES_PKG = "bodhiext.prompt_source.templates"
@@ -16,7 +20,12 @@ class LocalPromptSource(PromptSource):
   """BodhiPromptSource is a prompt source implementation by bodhiext."""
 
   def __init__(
-    self, dir: Optional[PathLike] = None, file: Optional[PathLike] = None, files: Optional[List[PathLike]] = None
+    self,
+    dir: Optional[PathLike] = None,
+    file: Optional[PathLike] = None,
+    files: Optional[List[PathLike]] = None,
+    cache_dir: Optional[PathLike] = None,
+    watch_interval: Optional[float] = None,
   ) -> None:
     """Initialize LocalPromptSource with the prompt template directory or files.
 
@@ -31,6 +40,11 @@ class LocalPromptSource(PromptSource):
         file (Optional[:data:`~bodhilib.PathLike`]): Path to the yaml file containing prompt templates.
         files: Optional[List[:data:`~bodhilib.PathLike`]]: Path to list of yaml files containing prompt templates.
             If passed, all the yaml files are loaded as prompt templates.
+        cache_dir (Optional[:data:`~bodhilib.PathLike`]): Directory to cache the parsed templates of the files.
+            If passed, the unchanged files are loaded from the cache instead of parsing the yaml.
+        watch_interval (Optional[float]): If passed, the files are checked for changes on access, at most once
+            every `watch_interval` seconds. Only the changed files are parsed again, and the yaml files added to
+            :arg:`dir` are loaded.
 
     Raises:
         ValueError: If :arg:`dir` is passed and does not exist or is not a directory.
@@ -40,6 +54,7 @@ class LocalPromptSource(PromptSource):
             or is not a file,
             or is not a yaml file.
     """
+    self.dir = dir
     self.files: List[PathLike] = []
     if dir is not None:
       if not os.path.exists(dir):
@@ -67,7 +82,15 @@ class LocalPromptSource(PromptSource):
       self.files.extend(files)
     if (files is not None or dir is not None) and not self.files:
       raise ValueError("No files found to load")
+    self.explicit_files: List[PathLike] = list(files) if files is not None else []
+    self.cache = TemplateFileCache(cache_dir) if cache_dir is not None else None
+    self.watch_interval = watch_interval
     self.templates: Optional[List[PromptTemplate]] = None
+    self.index: Optional[TemplateIndex] = None
+    self._file_templates: Dict[str, Tuple[Tuple[int, int], List[PromptTemplate]]] = {}
+    # the templates of the package do not change, parsed once
+    self._pkg_templates: Optional[List[PromptTemplate]] = None
+    self._checked_at = 0.0
 
   @typing.overload
   def find(self, filter: Union[Filter, Dict[str, Any]], stream: Optional[Literal[False]] = ...) -> List[PromptTemplate]:
@@ -82,39 +105,104 @@ class LocalPromptSource(PromptSource):
   ) -> Union[List[PromptTemplate], Iterator[PromptTemplate]]:
     if isinstance(filter, dict):
       filter = Filter.from_dict(filter)
-    if not self.templates:
-      self.templates = self._load_templates()
-    templates = [template for template in self.templates if filter.evaluate(template.metadata)]
-    # TODO: implement stream for find
+    if stream and self.templates is None:
+      condition = filter.condition
+      return (template for template in self._stream_templates() if matches(condition, template))
+    templates = self._get_index().find(filter.condition)
     if stream:
       return iter(templates)
     return templates
 
   def list_all(self, stream: Optional[bool] = False) -> Union[List[PromptTemplate], Iterator[PromptTemplate]]:
-    if not self.templates:
-      self.templates = self._load_templates()
-    # TODO: implement stream for list_all
+    if stream and self.templates is None:
+      return self._stream_templates()
+    templates = self._get_templates()
     if stream:
-      return iter(self.templates)
-    return self.templates
+      return iter(templates)
+    return templates
 
   def find_by_id(self, id: str) -> Optional[PromptTemplate]:
-    templates: List[PromptTemplate] = self.find({"id": str(id)})
-    return templates[0] if templates else None
+    return self._get_index().by_id.get(str(id))
+
+  def reload(self) -> bool:
+    """Reloads the templates of the changed files, and the files added to the directory.
+
+    Returns:
+        bool: True if any of the files was added, changed or removed
+    """
+    if self.dir is not None:
+      self.files = [*self._load_files(self.dir), *self.explicit_files]
+    templates = self._load_templates()
+    self._checked_at = time.monotonic()
+    changed = (
+      self.templates is None
+      or len(templates) != len(self.templates)
+      or any(new is not old for new, old in zip(templates, self.templates))
+    )
+    if changed:
+      self.templates = templates
+    return changed
+
+  def _get_templates(self) -> List[PromptTemplate]:
+    if self.templates is None:
+      self.templates = self._load_templates()
+      self._checked_at = time.monotonic()
+    elif self.watch_interval is not None and time.monotonic() - self._checked_at >= self.watch_interval:
+      self.reload()
+    return self.templates
+
+  def _get_index(self) -> TemplateIndex:
+    templates = self._get_templates()
+    if self.index is None or self.index.templates is not templates:
+      self.index = TemplateIndex(templates)
+    return self.index
 
   def _load_files(self, dir: PathLike) -> List[str]:
     return [os.path.join(root, file) for root, _, files in os.walk(dir) for file in files if _is_yaml(file)]
 
   def _load_templates(self) -> List[PromptTemplate]:
-    templates = []
-    if self.files:
-      for file in self.files:
-        parsed_templates = load_prompt_template_yaml(file)
-        templates.extend(parsed_templates)
-    else:
-      templates.extend(self._load_from_pkg(DEFAULT_TEMPLATES_PKG))
+    templates = list(self._iter_templates())
+    paths = {str(file) for file in self.files}
+    self._file_templates = {path: loaded for path, loaded in self._file_templates.items() if path in paths}
     return templates
 
+  def _stream_templates(self) -> Iterator[PromptTemplate]:
+    templates = []
+    for template in self._iter_templates():
+      templates.append(template)
+      yield template
+    # consumed fully, the later calls use the loaded templates
+    if self.templates is None:
+      self.templates = templates
+      self._checked_at = time.monotonic()
+
+  def _iter_templates(self) -> Iterator[PromptTemplate]:
+    # the files are parsed one at a time, yielding the templates of a file as soon as it is parsed
+    if not self.files:
+      if self._pkg_templates is None:
+        self._pkg_templates = self._load_from_pkg(DEFAULT_TEMPLATES_PKG)
+      yield from self._pkg_templates
+      return
+    for file in list(self.files):
+      path = str(file)
+      try:
+        loaded = self._load_file(path)
+      except FileNotFoundError:
+        logger.warning(f"Prompt template file not found, skipping: {path}")
+        continue
+      self._file_templates[path] = loaded
+      yield from loaded[1]
+
+  def _load_file(self, path: str) -> Tuple[Tuple[int, int], List[PromptTemplate]]:
+    # the templates of a file are parsed again only if the file is modified
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    loaded = self._file_templates.get(path)
+    if loaded is not None and loaded[0] == key:
+      return loaded
+    templates = self.cache.load(path) if self.cache is not None else load_prompt_template_yaml(path)
+    return key, templates
+
   def _load_from_pkg(self, pkg: str) -> List[PromptTemplate]:
     templates = []
     if sys.version_info < (3, 9):
@@ -8,16 +8,23 @@ from bodhiext.common import yaml_dump, yaml_load
 
 
 def load_prompt_template_yaml(path: PathLike) -> List[PromptTemplate]:
-  templates: List[PromptTemplate] = []
   if not _is_yaml(path):
     logger.debug(f"skipping parsing file for prompt templates: {path}")
-    return templates
-
+    return []
   with open(path, "r") as f:
-    parsed_templates = yaml_load(f.read())
-  for parsed_template in parsed_templates["templates"]:
-    prompts = parsed_template.pop("prompts")
-    template = StringPromptTemplate(prompts=prompts, metadata=parsed_template)
+    return _to_templates(_parse_templates(f.read()))
+
+
+def _parse_templates(content: str) -> List[Dict[str, Any]]:
+  parsed_templates: List[Dict[str, Any]] = yaml_load(content)["templates"]
+  return parsed_templates
+
+
+def _to_templates(parsed_templates: List[Dict[str, Any]]) -> List[PromptTemplate]:
+  templates: List[PromptTemplate] = []
+  for parsed_template in parsed_templates:
+    metadata = {k: v for k, v in parsed_template.items() if k != "prompts"}
+    template = StringPromptTemplate(prompts=parsed_template["prompts"], metadata=metadata)
     templates.append(template)
   return templates
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 from typing import (
   Any,
   Dict,
@@ -11,9 +12,13 @@ from typing import (
 
 from bodhiext.common import yaml_dump
 from bodhilib import Prompt, PromptTemplate
-from jinja2 import Template
+from jinja2 import Environment, Template
 from pydantic import BaseModel, Field
 
+# templates are compiled once using the shared environment, and reused for rendering across the calls
+JINJA_ENV = Environment()
+TEMPLATE_CACHE_SIZE = 1024
+
 # region prompt template
 #######################################################################################################################
 
@@ -88,7 +93,7 @@ class StringPromptTemplate(BaseModel, PromptTemplate):
     if self.format == "jinja2":
       results = []
       for prompt in self.prompts:
-        template = Template(prompt.text)
+        template = _compile_jinja2(prompt.text)
         text = template.render(**all_args)
         result = Prompt(text, role=prompt.role, source=prompt.source)
         results.append(result)
@@ -96,4 +101,9 @@ class StringPromptTemplate(BaseModel, PromptTemplate):
     raise ValueError(f"Unknown format {self.format}, allowed values: ['fstring', 'jinja2']")
 
 
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_jinja2(text: str) -> Template:
+  return JINJA_ENV.from_string(text)
+
+
 # endregion
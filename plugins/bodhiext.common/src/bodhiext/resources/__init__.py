@@ -1,7 +1,17 @@
 """:mod:`bodhiext.resource_queue` bodhiext package for resource queues."""
 import inspect
 
+from ._bm25 import BM25Index as BM25Index
+from ._bulk import TextBulkProcessor as TextBulkProcessor
+from ._bulk import bulk_processor_service_builder as bulk_processor_service_builder
 from ._doc_vec import DocumentVectorizer as DocumentVectorizer
+from ._loaders import CsvProcessor as CsvProcessor
+from ._loaders import FileLoader as FileLoader
+from ._loaders import HtmlProcessor as HtmlProcessor
+from ._loaders import JsonlProcessor as JsonlProcessor
+from ._loaders import JsonProcessor as JsonProcessor
+from ._loaders import MarkdownProcessor as MarkdownProcessor
+from ._loaders import loader_service_builder as loader_service_builder
 from ._plugin import bodhilib_list_services as bodhilib_list_services
 from ._processor import DefaultFactory as DefaultFactory
 from ._processor import DefaultQueueProcessor as DefaultQueueProcessor
@@ -11,6 +21,9 @@ from ._processor import LocalFileProcessor as LocalFileProcessor
 from ._processor import TextPlainProcessor as TextPlainProcessor
 from ._processor import resource_factory_service_builder as resource_factory_service_builder
 from ._processor import resource_processor_service_builder as resource_processor_service_builder
+from ._progress import IngestProgress as IngestProgress
+from ._progress import current_progress as current_progress
+from ._progress import track_progress as track_progress
 from ._queue import InMemoryResourceQueue as InMemoryResourceQueue
 from ._queue import resource_queue_service_builder as resource_queue_service_builder
 
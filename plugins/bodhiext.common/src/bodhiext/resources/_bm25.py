@@ -0,0 +1,101 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from bodhilib import Node
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+  """Splits the text into lowercase word tokens, used for indexing as well as querying."""
+  return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+  def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+    """In-process inverted index over the ingested nodes, for lexical retrieval using BM25 scoring.
+
+    The postings of a term are stored as compact unsigned int arrays of node positions and term frequencies. Nodes
+    are appended incrementally as they are ingested, without rebuilding the index, and a node added again with the
+    same id replaces the indexed one. The index covers the nodes ingested by this process, and is not persisted.
+
+    Args:
+        k1 (float): term frequency saturation parameter
+        b (float): document length normalization parameter
+    """
+    self.k1 = k1
+    self.b = b
+    self.nodes: List[Node] = []
+    self.lengths = array("I")
+    self.total_length = 0
+    self.terms: Dict[str, int] = {}
+    self.postings: List[Tuple[array, array]] = []
+    self.positions: Dict[str, int] = {}
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self.nodes)
+
+  def add(self, nodes: List[Node]) -> None:
+    """Adds the nodes to the index, retaining only their id, text and metadata.
+
+    A node with the id of an indexed node replaces it.
+    """
+    with self._lock:
+      for node in nodes:
+        # the parent document and the embedding are not retained, to keep the index memory bound to the chunks
+        indexed = Node(id=node.id, text=node.text, metadata=node.metadata)
+        tokens = tokenize(node.text)
+        position = self.positions.get(node.id) if node.id is not None else None
+        if position is None:
+          position = len(self.nodes)
+          self.nodes.append(indexed)
+          self.lengths.append(len(tokens))
+          if node.id is not None:
+            self.positions[node.id] = position
+        else:
+          self._remove_postings(position)
+          self.nodes[position] = indexed
+          self.lengths[position] = len(tokens)
+        self.total_length += len(tokens)
+        for term, frequency in Counter(tokens).items():
+          term_id = self.terms.get(term)
+          if term_id is None:
+            term_id = self.terms[term] = len(self.postings)
+            self.postings.append((array("I"), array("I")))
+          positions, frequencies = self.postings[term_id]
+          positions.append(position)
+          frequencies.append(frequency)
+
+  def _remove_postings(self, position: int) -> None:
+    for term in set(tokenize(self.nodes[position].text)):
+      positions, frequencies = self.postings[self.terms[term]]
+      index = positions.index(position)
+      del positions[index]
+      del frequencies[index]
+    self.total_length -= self.lengths[position]
+
+  def search(self, query: str, n: Optional[int] = 5) -> List[Tuple[Node, float]]:
+    """Returns the top n nodes matching the query terms, with their BM25 scores, in the order of the score."""
+    with self._lock:
+      count = len(self.nodes)
+      if count == 0:
+        return []
+      average_length = self.total_length / count
+      scores: Dict[int, float] = {}
+      for term in set(tokenize(query)):
+        term_id = self.terms.get(term)
+        if term_id is None:
+          continue
+        positions, frequencies = self.postings[term_id]
+        idf = math.log(1 + (count - len(positions) + 0.5) / (len(positions) + 0.5))
+        for position, frequency in zip(positions, frequencies):
+          norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / average_length)
+          scores[position] = scores.get(position, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+      top = heapq.nlargest(n or len(scores), scores.items(), key=lambda item: item[1])
+      return [(self.nodes[position], score) for position, score in top]
@@ -0,0 +1,236 @@
+import codecs
+import os
+import typing
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Literal, Optional, Tuple, Union
+
+from beartype import beartype
+from bodhilib import RESOURCE_PROCESSOR, AbstractResourceProcessor, Document, IsResource, text_plain_file
+from bodhilib.logging import logger
+
+from ..common._aiter import AsyncListIterator
+from ._processor import (
+  CHUNK_SIZE,
+  DEFAULT_ENCODING,
+  GLOB,
+  LARGE_FILE_SIZE,
+  LOCAL_DIR,
+  SUPPORTED_EXTS,
+  GlobProcessor,
+  LocalDirProcessor,
+  TextPlainProcessor,
+  _detect_bom,
+)
+
+TEXT_BULK = "text_bulk"
+SUPPORTED_BULK_PROCESSORS = {f"{TEXT_BULK}": [LOCAL_DIR, GLOB]}
+DEFAULT_ENCODINGS = ["utf-8", "cp1252", "latin-1"]
+
+
+class TextBulkProcessor(AbstractResourceProcessor):
+  def __init__(
+    self,
+    max_workers: Optional[int] = None,
+    batch_size: int = 64,
+    encodings: Optional[List[str]] = None,
+    large_file_size: int = LARGE_FILE_SIZE,
+    chunk_size: int = CHUNK_SIZE,
+  ) -> None:
+    """Initialize the bulk text processor.
+
+    Loads all the text files in a `local_dir` or `glob` resource directly as documents, reading and decoding
+    the files concurrently on a bounded thread pool. The other files are returned as `local_file` resources, to
+    be loaded by their processors. The processor is offered as the `text_bulk` service, after the one file at a
+    time processors for the same resource types. Add it to the factory to use it in their place.
+
+    The files larger than `large_file_size` are not read at once, they are read as a sequence of documents
+    in the order of the files, the same as :class:`~bodhiext.resources.TextPlainProcessor`, and decoded using
+    the same `encodings`.
+
+    Args:
+        max_workers (Optional[int]): number of threads reading the files.
+            Defaults to `min(32, os.cpu_count() + 4)`.
+        batch_size (int): maximum number of files being read ahead of the consumer. Defaults to 64.
+        encodings (Optional[List[str]]): encodings to try, in order, for files without a byte order mark.
+            Defaults to `["utf-8", "cp1252", "latin-1"]`.
+        large_file_size (int): files larger than this size (in bytes) are read in chunks. Defaults to 16 MiB.
+        chunk_size (int): maximum size (in bytes) of a document read from a large file. Defaults to 1 MiB.
+    """
+    super().__init__()
+    assert batch_size > 0, f"{batch_size=} should be greater than 0"
+    self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    self.batch_size = batch_size
+    self.encodings = encodings or DEFAULT_ENCODINGS
+    self.large_file_size = large_file_size
+    self.local_dir_processor = LocalDirProcessor()
+    self.glob_processor = GlobProcessor()
+    self.text_plain_processor = TextPlainProcessor(large_file_size=large_file_size, chunk_size=chunk_size)
+
+  @typing.overload
+  def process(self, resource: IsResource, stream: Optional[Literal[False]] = ...) -> List[IsResource]:
+    ...
+
+  @typing.overload
+  def process(self, resource: IsResource, stream: Literal[True]) -> Iterator[IsResource]:
+    ...
+
+  @beartype
+  def process(
+    self, resource: IsResource, stream: Optional[bool] = False
+  ) -> Union[List[IsResource], Iterator[IsResource]]:
+    if resource.resource_type == LOCAL_DIR:
+      files = self.local_dir_processor.process(resource, stream=True)
+    elif resource.resource_type == GLOB:
+      files = self.glob_processor.process(resource, stream=True)
+    else:
+      raise ValueError(f"Unsupported resource type: {resource.resource_type}, supports {self.supported_types}")
+    documents = self._load(files)
+    if stream:
+      return documents
+    return list(documents)
+
+  @typing.overload
+  async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
+    ...
+
+  @typing.overload
+  async def aprocess(self, resource: IsResource, astream: Literal[True]) -> AsyncIterator[IsResource]:
+    ...
+
+  async def aprocess(
+    self, resource: IsResource, astream: Optional[bool] = False
+  ) -> Union[List[IsResource], AsyncIterator[IsResource]]:
+    resources = self.process(resource)
+    if astream:
+      return AsyncListIterator(resources)
+    return resources
+
+  def _load(self, files: Iterator[IsResource]) -> Iterator[IsResource]:
+    # keeps at most batch_size files in flight, yielding the documents in the order of the paths
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      pending: Deque[Future] = deque()
+      for file in files:
+        path = file.metadata["path"]
+        if not _is_text_plain(path):
+          # loaded by the processor of its file type, once the queue processor routes it
+          yield file
+          continue
+        if _file_size(path) > self.large_file_size:
+          # the files read ahead are yielded first, to keep the order of the paths
+          while pending:
+            yield from _completed(pending.popleft())
+          yield from self._load_large(path)
+          continue
+        pending.append(executor.submit(_read_text, path, self.encodings))
+        if len(pending) >= self.batch_size:
+          yield from _completed(pending.popleft())
+      while pending:
+        yield from _completed(pending.popleft())
+
+  def _load_large(self, path: str) -> Iterator[IsResource]:
+    try:
+      encoding = _detect_encoding(path, self.encodings)
+      if encoding is None or codecs.lookup(encoding).name == DEFAULT_ENCODING:
+        yield from self.text_plain_processor.process(text_plain_file(path=path), stream=True)
+      else:
+        yield from self.text_plain_processor._read_text_chunks(Path(path), encoding, 0)
+    except (OSError, ValueError) as e:
+      logger.warning(f"Unable to read file: {path}, error: {e}")
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [LOCAL_DIR, GLOB]
+
+  @property
+  def service_name(self) -> str:
+    return TEXT_BULK
+
+
+def _file_size(path: str) -> int:
+  try:
+    return os.stat(path).st_size
+  except OSError:
+    # reported when the file is read
+    return 0
+
+
+def _is_text_plain(path: str) -> bool:
+  return SUPPORTED_EXTS.get(Path(path).suffix.lower()) == "text/plain"
+
+
+def _completed(future: "Future[Optional[Document]]") -> Iterator[IsResource]:
+  document = future.result()
+  if document is not None:
+    yield document
+
+
+def _read_text(path: str, encodings: List[str]) -> Optional[Document]:
+  try:
+    content = Path(path).read_bytes()
+    text, encoding = _decode(content, encodings)
+  except (OSError, ValueError) as e:
+    logger.warning(f"Unable to read file: {path}, error: {e}")
+    return None
+  return Document(text=text, path=path, encoding=encoding)
+
+
+def _decode(content: bytes, encodings: List[str]) -> Tuple[str, str]:
+  bom, encoding = _detect_bom(content)
+  if bom:
+    return content.decode(encoding), encoding
+  for encoding in encodings:
+    try:
+      return content.decode(encoding), encoding
+    except UnicodeDecodeError:
+      continue
+  raise ValueError(f"Unable to decode the content using encodings {encodings}")
+
+
+def _detect_encoding(path: str, encodings: List[str]) -> Optional[str]:
+  # validates the encodings over the whole file a block at a time, None if the file has a byte order mark
+  with open(path, "rb") as f:
+    bom, _ = _detect_bom(f.read(len(codecs.BOM_UTF32_LE)))
+    if bom:
+      return None
+    for encoding in encodings:
+      f.seek(0)
+      decoder = codecs.getincrementaldecoder(encoding)()
+      try:
+        while block := f.read(CHUNK_SIZE):
+          decoder.decode(block)
+        decoder.decode(b"", final=True)
+      except UnicodeDecodeError:
+        continue
+      return encoding
+  raise ValueError(f"Unable to decode the content using encodings {encodings}")
+
+
+def bulk_processor_service_builder(
+  *,
+  service_name: str,
+  service_type: Optional[str] = RESOURCE_PROCESSOR,
+  publisher: Optional[str] = "bodhiext",
+  max_workers: Optional[int] = None,
+  batch_size: Optional[int] = None,
+  encodings: Optional[List[str]] = None,
+  large_file_size: Optional[int] = None,
+  chunk_size: Optional[int] = None,
+  **kwargs: Dict[str, Any],
+) -> TextBulkProcessor:
+  if service_name not in SUPPORTED_BULK_PROCESSORS.keys():
+    raise ValueError(f"Unknown service: {service_name=}, supported_processors={SUPPORTED_BULK_PROCESSORS.keys()}")
+  if service_type != RESOURCE_PROCESSOR:
+    raise ValueError(f"Service type not supported: {service_type=}, supported service_type: {RESOURCE_PROCESSOR}")
+  if publisher is not None and publisher != "bodhiext":
+    raise ValueError(f"Unknown publisher: {publisher=}")
+  all_args = {
+    "max_workers": max_workers,
+    "batch_size": batch_size,
+    "encodings": encodings,
+    "large_file_size": large_file_size,
+    "chunk_size": chunk_size,
+  }
+  all_args = {k: v for k, v in all_args.items() if v is not None}
+  return TextBulkProcessor(**all_args)  # type: ignore
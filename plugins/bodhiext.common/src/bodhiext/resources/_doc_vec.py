@@ -15,6 +15,8 @@ from bodhilib import (
 from bodhilib.logging import logger
 
 from ..common._aiter import AsyncListIterator, abatch, batch
+from ._bm25 import BM25Index
+from ._progress import current_progress
 
 
 class DocumentVectorizer(AbstractResourceProcessor):
@@ -26,13 +28,20 @@ class DocumentVectorizer(AbstractResourceProcessor):
     llm: LLM,
     collection_name: str,
     distance: Optional[str] = "cosine",
+    bm25_index: Optional[BM25Index] = None,
   ) -> None:
+    """Splits the documents into nodes, and upserts the nodes with their embeddings into the vector db.
+
+    Args:
+        bm25_index (Optional[:class:`BM25Index`]): if given, the upserted nodes are also added to the lexical index
+    """
     self.splitter = splitter
     self.embedder = embedder
     self.vector_db = vector_db
     self.llm = llm
     self.collection_name = collection_name
     self.distance = distance or "cosine"
+    self.bm25_index = bm25_index
 
   @typing.overload
   def process(self, resource: IsResource, stream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -52,8 +61,13 @@ class DocumentVectorizer(AbstractResourceProcessor):
     nodes: List[Node] = self.splitter.split(document)
     batch_size = max(1, self.embedder.batch_size)
     for node_batch in batch(nodes, batch_size):
+      _copy_parent_metadata(node_batch)
       embeddings: List[Node] = self.embedder.embed(node_batch)
       self.vector_db.upsert(self.collection_name, embeddings)
+      if self.bm25_index is not None:
+        self.bm25_index.add(embeddings)
+      _record(nodes=len(node_batch), embeddings=len(embeddings))
+    _record(documents=1)
     logger.info("[process] process complete")
     if stream:
       return iter([])
@@ -77,8 +91,13 @@ class DocumentVectorizer(AbstractResourceProcessor):
     nodes: AsyncIterator[Node] = self.splitter.split(document, astream=True)
     batch_size = max(1, self.embedder.batch_size)
     async for node_batch in abatch(nodes, batch_size):
+      _copy_parent_metadata(node_batch)
       embeddings = self.embedder.embed(node_batch)
       self.vector_db.upsert(self.collection_name, embeddings)
+      if self.bm25_index is not None:
+        self.bm25_index.add(embeddings)
+      _record(nodes=len(node_batch), embeddings=len(embeddings))
+    _record(documents=1)
     logger.info("[doc_vec] async process complete")
     if astream:
       return AsyncListIterator([])
@@ -91,3 +110,17 @@ class DocumentVectorizer(AbstractResourceProcessor):
   @property
   def service_name(self) -> str:
     return "rag_resource_processor"
+
+
+def _copy_parent_metadata(nodes: List[Node]) -> None:
+  # stored with the node in the vector db, so the retrieved chunks can be related to their document, e.g. by path
+  for node in nodes:
+    if node.parent is not None:
+      parent_metadata = {k: v for k, v in node.parent.metadata.items() if k not in ("text", "resource_type")}
+      node.metadata = {**parent_metadata, **node.metadata}
+
+
+def _record(documents: int = 0, nodes: int = 0, embeddings: int = 0) -> None:
+  progress = current_progress()
+  if progress is not None:
+    progress.record(documents=documents, nodes=nodes, embeddings=embeddings)
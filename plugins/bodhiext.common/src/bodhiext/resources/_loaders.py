@@ -0,0 +1,387 @@
+import abc
+import csv
+import json
+import re
+import typing
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, TextIO, Tuple, Union
+
+from beartype import beartype
+from bodhilib import RESOURCE_PROCESSOR, AbstractResourceProcessor, Document, IsResource, ResourceProcessor
+from pydantic import BaseModel, BeforeValidator
+from typing_extensions import Annotated
+
+from ..common._aiter import AsyncListIterator
+from ._processor import (
+  CSV,
+  CSV_TYPE,
+  HTML,
+  HTML_TYPE,
+  JSON,
+  JSON_TYPE,
+  JSONL,
+  JSONL_TYPE,
+  MARKDOWN,
+  MARKDOWN_TYPE,
+  _validate_file,
+)
+
+SUPPORTED_LOADERS = {
+  f"{MARKDOWN}": [MARKDOWN_TYPE],
+  f"{HTML}": [HTML_TYPE],
+  f"{JSON}": [JSON_TYPE],
+  f"{JSONL}": [JSONL_TYPE],
+  f"{CSV}": [CSV_TYPE],
+}
+READ_SIZE = 64 * 1024
+MARKDOWN_HEADING = re.compile(r"^ {0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+MARKDOWN_FENCES = ("```", "~~~")
+WHITESPACE = re.compile(r"\s+")
+HTML_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+HTML_SKIPPED = {"script", "style", "noscript", "template", "head"}
+HTML_BLOCKS = {
+  "address",
+  "article",
+  "aside",
+  "blockquote",
+  "br",
+  "dd",
+  "div",
+  "dl",
+  "dt",
+  "figcaption",
+  "footer",
+  "header",
+  "hr",
+  "li",
+  "main",
+  "nav",
+  "ol",
+  "p",
+  "pre",
+  "section",
+  "table",
+  "td",
+  "th",
+  "tr",
+  "ul",
+}
+
+
+class FileInput(BaseModel):
+  resource_type: str
+  path: Annotated[str, BeforeValidator(_validate_file)]
+
+
+class FileLoader(AbstractResourceProcessor):
+  """Base class for the processors loading a file as a stream of :class:`~bodhilib.Document`.
+
+  The file is read incrementally, so with `stream=True` only the record being built is held in memory.
+  """
+
+  @typing.overload
+  def process(self, resource: IsResource, stream: Optional[Literal[False]] = ...) -> List[IsResource]:
+    ...
+
+  @typing.overload
+  def process(self, resource: IsResource, stream: Literal[True]) -> Iterator[IsResource]:
+    ...
+
+  @beartype
+  def process(
+    self, resource: IsResource, stream: Optional[bool] = False
+  ) -> Union[List[IsResource], Iterator[IsResource]]:
+    input = FileInput(**resource.metadata)
+    if input.resource_type not in self.supported_types:
+      raise ValueError(f"Unsupported resource type: {input.resource_type}, supports {self.supported_types}")
+    documents = self._load(Path(input.path))
+    if stream:
+      return documents
+    return list(documents)
+
+  @typing.overload
+  async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
+    ...
+
+  @typing.overload
+  async def aprocess(self, resource: IsResource, astream: Literal[True]) -> AsyncIterator[IsResource]:
+    ...
+
+  @beartype
+  async def aprocess(
+    self, resource: IsResource, astream: Optional[bool] = False
+  ) -> Union[List[IsResource], AsyncIterator[IsResource]]:
+    resources = self.process(resource)
+    if astream:
+      return AsyncListIterator(resources)
+    return resources
+
+  @abc.abstractmethod
+  def _load(self, path: Path) -> Iterator[IsResource]:
+    """Reads the file and yields the documents as they are parsed."""
+
+
+class MarkdownProcessor(FileLoader):
+  """Loads a markdown file as one :class:`~bodhilib.Document` per section.
+
+  A section starts at a heading, and the heading is available as `heading` in the document metadata.
+  Headings inside fenced code blocks are not treated as section breaks.
+  """
+
+  def _load(self, path: Path) -> Iterator[IsResource]:
+    section = 0
+    heading: Optional[str] = None
+    lines: List[str] = []
+    in_fence = False
+    with open(path, "r", encoding="utf-8") as f:
+      for line in f:
+        if line.lstrip().startswith(MARKDOWN_FENCES):
+          in_fence = not in_fence
+        match = None if in_fence else MARKDOWN_HEADING.match(line)
+        if match is not None:
+          if "".join(lines).strip():
+            yield Document(text="".join(lines), path=str(path), section=section, heading=heading)
+            section += 1
+          heading = match.group(2)
+          lines = []
+        lines.append(line)
+    if "".join(lines).strip():
+      yield Document(text="".join(lines), path=str(path), section=section, heading=heading)
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [MARKDOWN_TYPE]
+
+  @property
+  def service_name(self) -> str:
+    return MARKDOWN
+
+
+class HtmlProcessor(FileLoader):
+  """Loads the visible text of a html file as one :class:`~bodhilib.Document` per section.
+
+  A section starts at a `h1`-`h6` heading. Scripts, styles and the `head` of the page are skipped.
+  """
+
+  def _load(self, path: Path) -> Iterator[IsResource]:
+    parser = _HtmlTextParser()
+    section = 0
+    with open(path, "r", encoding="utf-8") as f:
+      while chunk := f.read(READ_SIZE):
+        parser.feed(chunk)
+        for heading, text in parser.drain():
+          yield Document(text=text, path=str(path), section=section, heading=heading)
+          section += 1
+    parser.close()
+    parser.flush()
+    for heading, text in parser.drain():
+      yield Document(text=text, path=str(path), section=section, heading=heading)
+      section += 1
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [HTML_TYPE]
+
+  @property
+  def service_name(self) -> str:
+    return HTML
+
+
+class JsonProcessor(FileLoader):
+  def __init__(self, text_key: Optional[str] = None) -> None:
+    """Initialize the json processor.
+
+    If the file contains a top level array, each element is loaded as a :class:`~bodhilib.Document`,
+    parsing the elements one at a time. Otherwise the file is loaded as a single document.
+
+    Args:
+        text_key (Optional[str]): key of the record field used as the document text. If not set, or the
+            record does not have the key, the document text is the record serialized as json.
+    """
+    super().__init__()
+    self.text_key = text_key
+
+  def _load(self, path: Path) -> Iterator[IsResource]:
+    with open(path, "r", encoding="utf-8") as f:
+      for index, record in enumerate(_iter_json(f)):
+        yield _record_document(record, path, index, self.text_key)
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [JSON_TYPE]
+
+  @property
+  def service_name(self) -> str:
+    return JSON
+
+
+class JsonlProcessor(FileLoader):
+  def __init__(self, text_key: Optional[str] = None) -> None:
+    """Initialize the jsonl processor, loading each line of the file as a :class:`~bodhilib.Document`.
+
+    Args:
+        text_key (Optional[str]): key of the record field used as the document text. If not set, or the
+            record does not have the key, the document text is the record serialized as json.
+    """
+    super().__init__()
+    self.text_key = text_key
+
+  def _load(self, path: Path) -> Iterator[IsResource]:
+    with open(path, "r", encoding="utf-8") as f:
+      index = 0
+      for line in f:
+        if not line.strip():
+          continue
+        yield _record_document(json.loads(line), path, index, self.text_key)
+        index += 1
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [JSONL_TYPE]
+
+  @property
+  def service_name(self) -> str:
+    return JSONL
+
+
+class CsvProcessor(FileLoader):
+  """Loads each row of a csv file as a :class:`~bodhilib.Document`.
+
+  The first row is used as the header, and the document text has a `column: value` line for each column.
+  """
+
+  def _load(self, path: Path) -> Iterator[IsResource]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+      for index, row in enumerate(csv.DictReader(f)):
+        text = "\n".join(f"{column}: {value}" for column, value in row.items())
+        yield Document(text=text, path=str(path), record=index)
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [CSV_TYPE]
+
+  @property
+  def service_name(self) -> str:
+    return CSV
+
+
+class _HtmlTextParser(HTMLParser):
+  def __init__(self) -> None:
+    super().__init__(convert_charrefs=True)
+    self.sections: List[Tuple[Optional[str], str]] = []
+    self.parts: List[str] = []
+    self.heading: Optional[str] = None
+    self.heading_parts: Optional[List[str]] = None
+    self.skipped = 0
+
+  def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+    if tag in HTML_SKIPPED:
+      self.skipped += 1
+    elif tag in HTML_HEADINGS:
+      self.flush()
+      self.heading_parts = []
+    elif tag in HTML_BLOCKS:
+      self.parts.append("\n")
+
+  def handle_endtag(self, tag: str) -> None:
+    if tag in HTML_SKIPPED:
+      self.skipped = max(0, self.skipped - 1)
+    elif tag in HTML_HEADINGS and self.heading_parts is not None:
+      self.heading = _normalize_text("".join(self.heading_parts))
+      self.heading_parts = None
+      self.parts.append("\n")
+    elif tag in HTML_BLOCKS:
+      self.parts.append("\n")
+
+  def handle_data(self, data: str) -> None:
+    if self.skipped:
+      return
+    # line breaks in the source are whitespace, the block elements break the lines
+    data = WHITESPACE.sub(" ", data)
+    self.parts.append(data)
+    if self.heading_parts is not None:
+      self.heading_parts.append(data)
+
+  def flush(self) -> None:
+    text = _normalize_text("".join(self.parts))
+    if text:
+      self.sections.append((self.heading, text))
+    self.parts = []
+
+  def drain(self) -> List[Tuple[Optional[str], str]]:
+    sections, self.sections = self.sections, []
+    return sections
+
+
+def _normalize_text(text: str) -> str:
+  lines = (" ".join(line.split()) for line in text.split("\n"))
+  return "\n".join(line for line in lines if line)
+
+
+def _iter_json(f: TextIO) -> Iterator[Any]:
+  # parses the elements of a top level array one at a time, reading more of the file only when the buffered
+  # text does not contain a complete element
+  decoder = json.JSONDecoder()
+  buffer = f.read(READ_SIZE).lstrip()
+  if not buffer.startswith("["):
+    yield json.loads(buffer + f.read())
+    return
+  pos = 1
+  while True:
+    while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+      pos += 1
+    if pos < len(buffer) and buffer[pos] == "]":
+      return
+    try:
+      if pos >= len(buffer):
+        raise json.JSONDecodeError("Expecting value", buffer, pos)
+      value, end = decoder.raw_decode(buffer, pos)
+      # a number at the end of the buffer might continue in the next read
+      complete = end < len(buffer)
+    except json.JSONDecodeError:
+      complete = False
+    if complete:
+      yield value
+      pos = end
+      continue
+    more = f.read(READ_SIZE)
+    if not more:
+      raise ValueError(f"Invalid json array, unexpected end of file at {pos=}")
+    buffer = buffer[pos:] + more
+    pos = 0
+
+
+def _record_document(record: Any, path: Path, index: int, text_key: Optional[str]) -> Document:
+  if text_key is not None and isinstance(record, dict) and text_key in record:
+    text = str(record[text_key])
+  else:
+    text = json.dumps(record, ensure_ascii=False)
+  return Document(text=text, path=str(path), record=index)
+
+
+def loader_service_builder(
+  *,
+  service_name: str,
+  service_type: Optional[str] = RESOURCE_PROCESSOR,
+  publisher: Optional[str] = "bodhiext",
+  text_key: Optional[str] = None,
+  **kwargs: Dict[str, Any],
+) -> ResourceProcessor:
+  if service_name not in SUPPORTED_LOADERS.keys():
+    raise ValueError(f"Unknown service: {service_name=}, supported_loaders={SUPPORTED_LOADERS.keys()}")
+  if service_type != RESOURCE_PROCESSOR:
+    raise ValueError(f"Service type not supported: {service_type=}, supported service_type: {RESOURCE_PROCESSOR}")
+  if publisher is not None and publisher != "bodhiext":
+    raise ValueError(f"Unknown publisher: {publisher=}")
+  if service_name == MARKDOWN:
+    return MarkdownProcessor()
+  if service_name == HTML:
+    return HtmlProcessor()
+  if service_name == JSON:
+    return JsonProcessor(text_key=text_key)
+  if service_name == JSONL:
+    return JsonlProcessor(text_key=text_key)
+  if service_name == CSV:
+    return CsvProcessor()
+  raise ValueError(f"Unknown service: {service_name=}, {SUPPORTED_LOADERS}")
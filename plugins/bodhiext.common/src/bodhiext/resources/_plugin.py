@@ -4,6 +4,8 @@ from bodhiext.common._version import __version__
 from bodhilib import RESOURCE_FACTORY, RESOURCE_PROCESSOR, RESOURCE_QUEUE, Service, service_provider
 
 from ..common._constants import DEFAULT_RESOURCE_FACTORY, IN_MEMORY_SERVICE
+from ._bulk import SUPPORTED_BULK_PROCESSORS, bulk_processor_service_builder
+from ._loaders import SUPPORTED_LOADERS, loader_service_builder
 from ._processor import SUPPORTED_PROCESSORS, resource_factory_service_builder, resource_processor_service_builder
 from ._queue import resource_queue_service_builder
 
@@ -23,6 +25,29 @@ def bodhilib_list_services() -> List[Service]:
         metadata={"supported_types": supported_types},
       )
     )
+  for name, supported_types in SUPPORTED_LOADERS.items():
+    services.append(
+      Service(
+        service_name=name,
+        service_type=RESOURCE_PROCESSOR,
+        publisher="bodhiext",
+        service_builder=loader_service_builder,
+        version=__version__,
+        metadata={"supported_types": supported_types},
+      )
+    )
+  # listed after the local_dir and glob processors, so those remain the default for the resource types
+  for name, supported_types in SUPPORTED_BULK_PROCESSORS.items():
+    services.append(
+      Service(
+        service_name=name,
+        service_type=RESOURCE_PROCESSOR,
+        publisher="bodhiext",
+        service_builder=bulk_processor_service_builder,
+        version=__version__,
+        metadata={"supported_types": supported_types},
+      )
+    )
   return [
     Service(
       service_name=IN_MEMORY_SERVICE,
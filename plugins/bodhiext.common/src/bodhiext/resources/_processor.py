@@ -1,16 +1,35 @@
+import codecs
+import fnmatch
+import mmap
 import os
+import re
 import typing
-from glob import glob
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, Union
+from typing import (
+  Any,
+  AsyncIterator,
+  Dict,
+  FrozenSet,
+  Iterable,
+  Iterator,
+  List,
+  Literal,
+  Optional,
+  Pattern,
+  Set,
+  Tuple,
+  Union,
+)
 
 from beartype import beartype
 from bodhilib import (
+  DOCUMENT,
   RESOURCE_FACTORY,
   RESOURCE_PROCESSOR,
   AbstractResourceProcessor,
   Document,
   IsResource,
+  Resource,
   ResourceProcessor,
   ResourceProcessorFactory,
   ResourceQueue,
@@ -27,6 +46,7 @@ from typing_extensions import Annotated
 
 from ..common._aiter import AsyncListIterator
 from ..common._constants import DEFAULT_RESOURCE_FACTORY
+from ._progress import current_progress
 
 GLOB = "glob"
 LOCAL_DIR = "local_dir"
@@ -38,7 +58,41 @@ SUPPORTED_PROCESSORS = {
   f"{LOCAL_FILE}": [LOCAL_FILE],
   f"{TEXT_PLAIN}": ["text/plain"],
 }
-SUPPORTED_EXTS = [".txt"]
+MARKDOWN = "markdown"
+HTML = "html"
+JSON = "json"
+JSONL = "jsonl"
+CSV = "csv"
+MARKDOWN_TYPE = "text/markdown"
+HTML_TYPE = "text/html"
+JSON_TYPE = "application/json"
+JSONL_TYPE = "application/jsonl"
+CSV_TYPE = "text/csv"
+SUPPORTED_EXTS = {
+  ".txt": "text/plain",
+  ".md": MARKDOWN_TYPE,
+  ".markdown": MARKDOWN_TYPE,
+  ".html": HTML_TYPE,
+  ".htm": HTML_TYPE,
+  ".json": JSON_TYPE,
+  ".jsonl": JSONL_TYPE,
+  ".csv": CSV_TYPE,
+}
+# the types of the files loaded into documents, counted as the files processed
+FILE_TYPES = set(SUPPORTED_EXTS.values())
+LARGE_FILE_SIZE = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+SENTENCE_BREAKS = [b"\n", b".", b"?", b"!"]
+TEXT_SENTENCE_BREAKS = ["\n", ".", "?", "!"]
+DEFAULT_ENCODING = "utf-8"
+# utf-32 boms are checked before utf-16, as the utf-32-le bom starts with the utf-16-le bom
+BOMS = [
+  (codecs.BOM_UTF32_LE, "utf-32"),
+  (codecs.BOM_UTF32_BE, "utf-32"),
+  (codecs.BOM_UTF8, "utf-8-sig"),
+  (codecs.BOM_UTF16_LE, "utf-16"),
+  (codecs.BOM_UTF16_BE, "utf-16"),
+]
 
 
 def _validate_path(input: Union[str, Path]) -> str:
@@ -59,6 +113,143 @@ def _validate_file(input: Union[str, Path]) -> str:
   return str(path.absolute())
 
 
+def _walk_files(root: str, recursive: bool, exclude_hidden: bool) -> Iterator["os.DirEntry[str]"]:
+  """Walks the directory tree using :func:`os.scandir` and yields the files as they are found.
+
+  Hidden files and directories are visited in the same pass, and the file type cached on the
+  :class:`os.DirEntry` is used instead of a separate stat call per entry. Symlinked directories are not followed.
+  """
+  pending = [root]
+  while pending:
+    current = pending.pop()
+    subdirs = []
+    try:
+      with os.scandir(current) as entries:
+        for entry in entries:
+          if exclude_hidden and entry.name.startswith("."):
+            continue
+          if entry.is_dir(follow_symlinks=False):
+            if recursive:
+              subdirs.append(entry.path)
+            continue
+          if entry.is_file():
+            yield entry
+    except OSError as e:
+      logger.warning(f"Unable to scan directory: {current}, error: {e}")
+      continue
+    # reversed, so the sub-directories are visited in the order they were listed
+    pending.extend(reversed(subdirs))
+
+
+class _GlobPattern:
+  def __init__(self, pattern: str, recursive: bool) -> None:
+    """Glob pattern matched one path segment at a time, following the rules of :func:`glob.glob`.
+
+    `*`, `?` and `[...]` match within a single segment, and a `**` segment matches zero or more directories. With
+    `recursive`, the pattern is matched under every directory of the tree, as `**/<pattern>`.
+    """
+    segments = [segment for segment in pattern.replace(os.sep, "/").split("/") if segment not in ("", ".")]
+    if recursive:
+      segments = ["**"] + segments
+    self.segments = segments
+    self.matchers: List[Optional[Pattern[str]]] = [
+      None if segment == "**" else re.compile(fnmatch.translate(segment)) for segment in segments
+    ]
+
+  def start(self) -> FrozenSet[int]:
+    """Returns the positions in the pattern to match the entries of the root directory against."""
+    if not self.segments:
+      return frozenset()
+    return self._expand(frozenset([0]))
+
+  def match_file(self, positions: FrozenSet[int], name: str) -> bool:
+    last = len(self.segments) - 1
+    for position in positions:
+      matcher = self.matchers[position]
+      if position == last and (matcher is None or matcher.match(name)):
+        return True
+    return False
+
+  def enter_dir(self, positions: FrozenSet[int], name: str) -> FrozenSet[int]:
+    """Returns the positions to match the entries of the sub-directory against, empty if nothing can match."""
+    last = len(self.segments) - 1
+    entered: Set[int] = set()
+    for position in positions:
+      matcher = self.matchers[position]
+      if matcher is None:
+        entered.add(position)
+      elif position < last and matcher.match(name):
+        entered.add(position + 1)
+    return self._expand(frozenset(entered))
+
+  def _expand(self, positions: FrozenSet[int]) -> FrozenSet[int]:
+    # a `**` matches zero directories as well, so the segment after it is matched from the same directory
+    expanded = set(positions)
+    for position in sorted(positions):
+      while position < len(self.segments) - 1 and self.matchers[position] is None:
+        position += 1
+        expanded.add(position)
+    return frozenset(expanded)
+
+
+def _glob_walk(root: str, pattern: _GlobPattern, exclude_hidden: bool) -> Iterator["os.DirEntry[str]"]:
+  """Walks the directories named by the glob pattern using :func:`os.scandir`, and yields the files matching it."""
+  pending = [(root, pattern.start())]
+  while pending:
+    current, positions = pending.pop()
+    subdirs = []
+    try:
+      with os.scandir(current) as entries:
+        for entry in entries:
+          if exclude_hidden and entry.name.startswith("."):
+            continue
+          if entry.is_dir(follow_symlinks=False):
+            entered = pattern.enter_dir(positions, entry.name)
+            if entered:
+              subdirs.append((entry.path, entered))
+            continue
+          if entry.is_file() and pattern.match_file(positions, entry.name):
+            yield entry
+    except OSError as e:
+      logger.warning(f"Unable to scan directory: {current}, error: {e}")
+      continue
+    pending.extend(reversed(subdirs))
+
+
+def _detect_bom(content: bytes) -> Tuple[bytes, str]:
+  """Returns the byte order mark the content starts with and its encoding, or no mark and utf-8."""
+  for bom, encoding in BOMS:
+    if content.startswith(bom):
+      return bom, encoding
+  return b"", DEFAULT_ENCODING
+
+
+def _text_chunk_end(text: str) -> int:
+  """Returns the end of the chunk in the decoded text, after the last sentence break, or the last space."""
+  cut = max(text.rfind(sentence_break) for sentence_break in TEXT_SENTENCE_BREAKS)
+  if cut < 0:
+    cut = text.rfind(" ")
+  return cut + 1 if cut >= 0 else len(text)
+
+
+def _chunk_end(mm: mmap.mmap, start: int, end: int) -> int:
+  """Returns the end offset of the chunk, aligned to the last sentence break in the chunk.
+
+  Falls back to the last space, and then to the last utf-8 character boundary if no break is found.
+  """
+  if end >= len(mm):
+    return len(mm)
+  cut = max(mm.rfind(sentence_break, start, end) for sentence_break in SENTENCE_BREAKS)
+  if cut < start:
+    cut = mm.rfind(b" ", start, end)
+  if cut >= start:
+    return cut + 1
+  boundary = end
+  while boundary > start and (mm[boundary] & 0xC0) == 0x80:
+    boundary -= 1
+  return boundary if boundary > start else end
+
+
 class GlobInput(BaseModel):
   resource_type: Literal["glob"]
   path: Annotated[str, BeforeValidator(_validate_path)]
@@ -101,30 +292,10 @@ class GlobProcessor(AbstractResourceProcessor):
     self, resource: IsResource, stream: Optional[bool] = False
   ) -> Union[List[IsResource], Iterator[IsResource]]:
     input = GlobInput(**resource.metadata)
-    path = Path(input.path)
-    pattern = input.pattern
-    exclude_hidden = input.exclude_hidden
-    recursive = input.recursive
-    resources: List[IsResource] = []
-    if not exclude_hidden:
-      root = Path(path)
-      if recursive:
-        root = Path(path).joinpath("**")
-      glob_pattern = str(root.joinpath(f".{pattern}"))
-      for file in glob(glob_pattern, recursive=recursive):
-        if os.path.isdir(file):
-          continue
-        resources.append(local_file(file))
-    if recursive:
-      path = path.joinpath("**")
-    glob_pattern = str(path.joinpath(pattern))
-    for file in glob(glob_pattern, recursive=recursive):
-      if os.path.isdir(file):
-        continue
-      resources.append(local_file(file))
+    resources = self._glob_files(input.path, input.pattern, input.recursive, input.exclude_hidden)
     if stream:
-      return iter(resources)
-    return resources
+      return resources
+    return list(resources)
 
   @typing.overload
   async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -143,6 +314,10 @@ class GlobProcessor(AbstractResourceProcessor):
       return AsyncListIterator(resources)
     return resources
 
+  def _glob_files(self, path: str, pattern: str, recursive: bool, exclude_hidden: bool) -> Iterator[IsResource]:
+    for entry in _glob_walk(path, _GlobPattern(pattern, recursive), exclude_hidden):
+      yield local_file(entry.path)
+
   @property
   def supported_types(self) -> List[str]:
     return [GLOB]
@@ -169,18 +344,10 @@ class LocalDirProcessor(AbstractResourceProcessor):
     self, resource: IsResource, stream: Optional[bool] = False
   ) -> Union[List[IsResource], Iterator[IsResource]]:
     input = LocalDirInput(**resource.metadata)
-    path = Path(input.path)
-    exclude_hidden = input.exclude_hidden
-    recursive = input.recursive
-    resources = []
-    if not exclude_hidden:
-      pattern = "**/.*" if recursive else ".*"
-      resources.extend(self._glob_files(path, pattern, recursive))
-    pattern = "**/*" if recursive else "*"
-    resources.extend(self._glob_files(path, pattern, recursive))
+    resources = self._list_files(input.path, input.recursive, input.exclude_hidden)
     if stream:
-      return iter(resources)
-    return resources
+      return resources
+    return list(resources)
 
   @typing.overload
   async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -199,13 +366,9 @@ class LocalDirProcessor(AbstractResourceProcessor):
       return AsyncListIterator(resources)
     return resources
 
-  def _glob_files(self, path: Path, pattern: str, recursive: bool) -> List[IsResource]:
-    resources: List[IsResource] = []
-    for file in glob(str(Path(path).joinpath(pattern)), recursive=recursive):
-      if os.path.isdir(file):
-        continue
-      resources.append(local_file(file))
-    return resources
+  def _list_files(self, path: str, recursive: bool, exclude_hidden: bool) -> Iterator[IsResource]:
+    for entry in _walk_files(path, recursive, exclude_hidden):
+      yield local_file(entry.path)
 
   @property
   def supported_types(self) -> List[str]:
@@ -235,12 +398,16 @@ class LocalFileProcessor(AbstractResourceProcessor):
     input = LocalFileInput(**resource.metadata)
     path = Path(input.path)
     ext = path.suffix
-    if ext == ".txt":
+    resource_type = SUPPORTED_EXTS.get(ext.lower())
+    if resource_type is None:
+      raise ValueError(f"Unsupported file extension: {ext}, supports {list(SUPPORTED_EXTS)}")
+    if resource_type == "text/plain":
       resources: List[IsResource] = [text_plain_file(path=path)]
-      if stream:
-        return iter(resources)
-      return resources
-    raise ValueError(f"Unsupported file extension: {ext}, supports {SUPPORTED_EXTS}")
+    else:
+      resources = [Resource(resource_type=resource_type, path=str(path))]
+    if stream:
+      return iter(resources)
+    return resources
 
   @typing.overload
   async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -269,8 +436,21 @@ class LocalFileProcessor(AbstractResourceProcessor):
 
 
 class TextPlainProcessor(AbstractResourceProcessor):
-  def __init__(self) -> None:
+  def __init__(self, large_file_size: int = LARGE_FILE_SIZE, chunk_size: int = CHUNK_SIZE) -> None:
+    """Initialize the text/plain processor.
+
+    The files are decoded as utf-8, or using the encoding of the byte order mark the file starts with.
+
+    Args:
+        large_file_size (int): files larger than this size (in bytes) are memory-mapped and read lazily
+            as a sequence of documents. Defaults to 16 MiB.
+        chunk_size (int): maximum size (in bytes) of a document read from a large file. The chunks are cut
+            at the last sentence break within the chunk size. Defaults to 1 MiB.
+    """
     super().__init__()
+    assert chunk_size > 0, f"{chunk_size=} should be greater than 0"
+    self.large_file_size = large_file_size
+    self.chunk_size = chunk_size
 
   @typing.overload
   def process(self, resource: IsResource, stream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -286,10 +466,53 @@ class TextPlainProcessor(AbstractResourceProcessor):
   ) -> Union[List[IsResource], Iterator[IsResource]]:
     input = TextPlainInput(**resource.metadata)
     path = Path(input.path)
-    resources: List[IsResource] = [Document(text=path.read_text(), path=str(path))]
+    # the same encoding is used for the file read at once and read in chunks, utf-8 unless the file has a bom
+    with open(path, "rb") as f:
+      bom, encoding = _detect_bom(f.read(len(codecs.BOM_UTF32_LE)))
+    if path.stat().st_size <= self.large_file_size:
+      text = path.read_bytes().decode(encoding)
+      resources: List[IsResource] = [Document(text=text, path=str(path))]
+      if stream:
+        return iter(resources)
+      return resources
+    if encoding in (DEFAULT_ENCODING, "utf-8-sig"):
+      documents = self._read_chunks(path, len(bom))
+    else:
+      documents = self._read_text_chunks(path, encoding, len(bom))
     if stream:
-      return iter(resources)
-    return resources
+      return documents
+    return list(documents)
+
+  def _read_chunks(self, path: Path, start: int) -> Iterator[IsResource]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      size = len(mm)
+      chunk = 0
+      while start < size:
+        end = _chunk_end(mm, start, min(start + self.chunk_size, size))
+        # only the chunk is copied out of the mapped file
+        text = mm[start:end].decode(DEFAULT_ENCODING)
+        yield Document(text=text, path=str(path), chunk=chunk, offset=start)
+        start = end
+        chunk += 1
+
+  def _read_text_chunks(self, path: Path, encoding: str, bom_size: int) -> Iterator[IsResource]:
+    # utf-16 and utf-32 files are decoded as a stream, a character takes at most 4 bytes in either encoding
+    max_chars = max(1, self.chunk_size // 4)
+    with open(path, "r", encoding=encoding, newline="") as f:
+      pending = ""
+      offset = bom_size
+      chunk = 0
+      while True:
+        block = f.read(max_chars - len(pending))
+        text = pending + block
+        if not text:
+          break
+        end = _text_chunk_end(text) if block else len(text)
+        text, pending = text[:end], text[end:]
+        yield Document(text=text, path=str(path), chunk=chunk, offset=offset)
+        # the encoder prepends the bom to the encoded chunk
+        offset += len(text.encode(encoding)) - bom_size
+        chunk += 1
 
   @typing.overload
   async def aprocess(self, resource: IsResource, astream: Optional[Literal[False]] = ...) -> List[IsResource]:
@@ -323,10 +546,15 @@ class DefaultFactory(ResourceProcessorFactory):
     self.cached: Dict[str, List[ResourceProcessor]] = {}
 
   def add_resource_processor(self, processor: ResourceProcessor) -> None:
+    """Adds the processor for its supported types, ahead of the processors already found for the types.
+
+    The processors are picked in the order returned by :meth:`find`, so the processor added last is the one used
+    for the type, whether added before or after the processors of the plugins are looked up.
+    """
     for supported_type in processor.supported_types:
       if supported_type not in self.cached:
         self.cached[supported_type] = []
-      self.cached[supported_type].append(processor)
+      self.cached[supported_type].insert(0, processor)
 
   def find(self, resource_type: str) -> List[ResourceProcessor]:
     if resource_type in self.cached:
@@ -375,9 +603,35 @@ class DefaultQueueProcessor(ResourceQueueProcessor):
     return self.factory.add_resource_processor(processor)
 
   def process(self) -> None:
+    """Processes the resources in the queue, until the queue is empty.
+
+    If the progress is tracked using :func:`track_progress`, the processed files are counted, and a resource
+    failing to process is recorded as an error, and the processing continues with the next resource.
+    """
     while (resource := self.resource_queue.pop(block=False)) is not None:
-      results = self._process(resource)
-      for result in results:
+      progress = current_progress()
+      if progress is None:
+        self._process_resource(resource)
+        continue
+      try:
+        self._process_resource(resource)
+      except Exception as e:
+        logger.warning(f"Failed to process {resource.resource_type=}, error={e}")
+        progress.record_error(f"{resource.resource_type} {resource.metadata.get('path', '')}: {e}")
+        continue
+      if resource.resource_type in FILE_TYPES:
+        progress.record(files=1)
+
+  def _process_resource(self, resource: IsResource) -> None:
+    if resource.resource_type == DOCUMENT:
+      self._push_all(self._process(resource))
+      return
+    # resources are processed as a stream, and the documents are sent to the listener as they are produced,
+    # so a large resource producing many documents is not held in the queue all at once
+    for result in self._process(resource, stream=True):
+      if result.resource_type == DOCUMENT:
+        self._push_all(self._process(result))
+      else:
         self.resource_queue.push(result)
 
   def start(self) -> None:
@@ -400,13 +654,19 @@ class DefaultQueueProcessor(ResourceQueueProcessor):
   def shutdown(self) -> None:
     raise NotImplementedError()
 
-  def _process(self, resource: IsResource) -> List[IsResource]:
+  def _process(self, resource: IsResource, stream: bool = False) -> Iterable[IsResource]:
     processor = self._find_processor(resource)
     if processor is None:
       return []
+    if stream:
+      return processor.process(resource, stream=True)
     results = processor.process(resource)
     return results
 
+  def _push_all(self, resources: Iterable[IsResource]) -> None:
+    for resource in resources:
+      self.resource_queue.push(resource)
+
   def _find_processor(self, resource: IsResource) -> Optional[ResourceProcessor]:
     resource_type = resource.resource_type
     processors = self.factory.find(resource_type)
@@ -415,7 +675,7 @@ class DefaultQueueProcessor(ResourceQueueProcessor):
       logger.warning(f"No processor found for {resource_type=}, skipping")
       return None
     if len(processors) > 1:
-      logger.warning(f"Multiple processors found for {resource_type=}, picking {processors[0].service_name}")
+      logger.debug(f"Multiple processors found for {resource_type=}, picking {processors[0].service_name}")
     return processors[0]
 
 
@@ -442,6 +702,8 @@ def resource_processor_service_builder(
   service_name: str,
   service_type: Optional[str] = RESOURCE_PROCESSOR,
   publisher: Optional[str] = "bodhiext",
+  large_file_size: Optional[int] = None,
+  chunk_size: Optional[int] = None,
   **kwargs: Dict[str, Any],
 ) -> ResourceProcessor:
   if service_name not in SUPPORTED_PROCESSORS.keys():
@@ -457,5 +719,7 @@ def resource_processor_service_builder(
   if service_name == LOCAL_FILE:
     return LocalFileProcessor()
   if service_name == TEXT_PLAIN:
-    return TextPlainProcessor()
+    all_args = {"large_file_size": large_file_size, "chunk_size": chunk_size}
+    all_args = {k: v for k, v in all_args.items() if v is not None}
+    return TextPlainProcessor(**all_args)  # type: ignore
   raise ValueError(f"Unknown service: {service_name=}, {SUPPORTED_PROCESSORS}")
@@ -0,0 +1,81 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class IngestProgress:
+  def __init__(self) -> None:
+    """Counts of the files, documents, nodes and embeddings processed by an ingestion, and the errors.
+
+    The progress is recorded by the resource processors while it is tracked using :func:`track_progress`, and can be
+    read from other threads while the ingestion is running.
+    """
+    self.files = 0
+    self.documents = 0
+    self.nodes = 0
+    self.embeddings = 0
+    self.errors: List[str] = []
+    self.started_at: Optional[float] = None
+    self.finished_at: Optional[float] = None
+    self._lock = threading.Lock()
+
+  def start(self) -> None:
+    self.started_at = time.time()
+
+  def finish(self) -> None:
+    self.finished_at = time.time()
+
+  def record(self, files: int = 0, documents: int = 0, nodes: int = 0, embeddings: int = 0) -> None:
+    with self._lock:
+      self.files += files
+      self.documents += documents
+      self.nodes += nodes
+      self.embeddings += embeddings
+
+  def record_error(self, error: str) -> None:
+    with self._lock:
+      self.errors.append(error)
+
+  @property
+  def elapsed(self) -> float:
+    """Seconds elapsed since the start, until the finish if finished."""
+    if self.started_at is None:
+      return 0.0
+    return (self.finished_at or time.time()) - self.started_at
+
+  def to_dict(self) -> Dict[str, Any]:
+    """Returns the counts, the elapsed time and the throughput per second as a dict."""
+    with self._lock:
+      elapsed = self.elapsed
+      return {
+        "files": self.files,
+        "documents": self.documents,
+        "nodes": self.nodes,
+        "embeddings": self.embeddings,
+        "errors": list(self.errors),
+        "elapsed": elapsed,
+        "files_per_sec": self.files / elapsed if elapsed > 0 else 0.0,
+        "embeddings_per_sec": self.embeddings / elapsed if elapsed > 0 else 0.0,
+      }
+
+
+_current_progress: ContextVar[Optional[IngestProgress]] = ContextVar("ingest_progress", default=None)
+
+
+def current_progress() -> Optional[IngestProgress]:
+  """Returns the progress tracked in the current context, or None if not tracking."""
+  return _current_progress.get()
+
+
+@contextmanager
+def track_progress(progress: IngestProgress) -> Iterator[IngestProgress]:
+  """Records the progress of the resources processed within the context into `progress`."""
+  token = _current_progress.set(progress)
+  progress.start()
+  try:
+    yield progress
+  finally:
+    progress.finish()
+    _current_progress.reset(token)
@@ -17,6 +17,7 @@ def text_splitter_service_builder(
   overlap: Optional[int] = None,
   eos_patterns: Optional[List[str]] = None,
   eow_patterns: Optional[List[str]] = None,
+  tokenizer: Optional[Any] = None,
   **kwargs: Dict[str, Any],
 ) -> TextSplitter:
   """Service builder for text splitter."""
@@ -31,6 +32,7 @@ def text_splitter_service_builder(
     "overlap": overlap,
     "eos_patterns": eos_patterns,
     "eow_patterns": eow_patterns,
+    "tokenizer": tokenizer,
     **kwargs,
   }
   all_args = {k: v for k, v in all_args.items() if v is not None}
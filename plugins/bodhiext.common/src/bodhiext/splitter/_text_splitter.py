@@ -1,10 +1,13 @@
+import bisect
+import itertools
 import re
 import typing
-from typing import AsyncIterator, Callable, Iterator, List, Literal, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Callable, Iterator, List, Literal, Optional, Sequence, Tuple, Union
 
-from bodhiext.common import AsyncListIterator
 from bodhilib import Document, Node, SerializedInput, Splitter, to_document_list
 
+TOKENIZE_BATCH_SIZE = 32
+
 
 class TextSplitter(Splitter):
   """Splitter splits a :class:`~bodhilib.Document` into :class:`~bodhilib.Node`."""
@@ -17,6 +20,7 @@ class TextSplitter(Splitter):
     overlap: int = 16,
     eos_patterns: Optional[List[str]] = None,
     eow_patterns: Optional[List[str]] = None,
+    tokenizer: Optional[Any] = None,
   ) -> None:
     r"""Initializing splitter to split text based on sentence and word splits.
 
@@ -30,6 +34,11 @@ class TextSplitter(Splitter):
         eow_patterns (Optional[List[str]]): List of patterns to split words.
             The patterns should be regex. E.g. `[r"\s", r"\-"]`.
             Defaults to `[r"\s", r"\-", r"\:", r"\.", r"\?", r"\!", r"\n"]`.
+        tokenizer (Optional[Any]): a huggingface fast tokenizer, e.g. the `tokenizer` of the
+            :class:`~bodhiext.st.SentenceTransformerEmbedder`. If set, `max_len`, `min_len` and `overlap` are
+            number of tokens instead of words, and every split fits in `max_len` tokens including the special
+            tokens added by the tokenizer. The splits end at a sentence, or else a word, boundary where possible.
+            Defaults to None.
     """
     assert max_len > min_len, f"{max_len=} should be greater than {min_len=}"
     assert overlap < max_len, f"{overlap=} should be less than {max_len=}"
@@ -46,6 +55,13 @@ class TextSplitter(Splitter):
     if eow_patterns is None:
       eow_patterns = [r"\s", r"-", r":", r"\.", r"\?", r"\!", r"\n"]
     self.word_splitter = _build_word_splitter(eow_patterns)
+    self.eos_matcher = re.compile("|".join(eos_patterns))
+
+    self.tokenizer = tokenizer
+    self.max_tokens = max_len
+    if tokenizer is not None and hasattr(tokenizer, "num_special_tokens_to_add"):
+      self.max_tokens = max_len - tokenizer.num_special_tokens_to_add()
+      assert self.max_tokens > min_len, f"{max_len=} less the special tokens should be greater than {min_len=}"
 
   @typing.overload
   def split(self, inputs: SerializedInput) -> List[Node]:
@@ -62,31 +78,77 @@ class TextSplitter(Splitter):
   def split(
     self, inputs: SerializedInput, astream: Optional[bool] = None
   ) -> Union[List[Node], Iterator[Node], AsyncIterator[Node]]:
-    docs = to_document_list(inputs)
-    nodes = []
-    for doc in docs:
-      current_words: List[str] = []
-      sentences = self.sentence_splitter(doc.text)
-      for sentence in sentences:
-        words = self.word_splitter(sentence)
-        # the sentence can be combined without exceeding max_len
-        if len(current_words) + len(words) < self.max_len:
-          current_words += words
-          words = []
-          continue
-        # the sentence cannot be combined without exceeding max_len
-        new_nodes, new_current_words, new_words = self._build_nodes(doc, current_words, words)
-        nodes.extend(new_nodes)
-        assert new_words == [], f"{new_words=} should be empty"
-        current_words = new_current_words
-      if len(current_words) > self.overlap:
-        node_text = "".join(current_words)
-        node = Node(text=node_text, parent=doc)
-        nodes.append(node)
-    # TODO: implement streaming for text splitter
+    docs = _iter_documents(inputs)
     if astream is None or astream is False:
-      return nodes
-    return AsyncListIterator(nodes)
+      return list(self._split_documents(docs))
+    return self._asplit(docs)
+
+  async def _asplit(self, docs: Iterator[Document]) -> AsyncIterator[Node]:
+    # the documents are consumed one at a time, so a large resource streamed as a sequence of documents
+    # is never held in memory all at once
+    for node in self._split_documents(docs):
+      yield node
+
+  def _split_documents(self, docs: Iterator[Document]) -> Iterator[Node]:
+    if self.tokenizer is None:
+      for doc in docs:
+        yield from self._split_document(doc)
+      return
+    # the documents are tokenized in batches, a single call to the fast tokenizer for each batch
+    while doc_batch := list(itertools.islice(docs, TOKENIZE_BATCH_SIZE)):
+      encodings = self.tokenizer([doc.text for doc in doc_batch], add_special_tokens=False, return_offsets_mapping=True)
+      for doc, offsets in zip(doc_batch, encodings["offset_mapping"]):
+        yield from self._split_tokens(doc, offsets)
+
+  def _split_tokens(self, doc: Document, offsets: Sequence[Tuple[int, int]]) -> Iterator[Node]:
+    # the splits are ranges of tokens, with the text taken from the character offsets of the tokens
+    offsets = [(start, end) for start, end in offsets if end > start]
+    sentence_ends = [match.end() for match in self.eos_matcher.finditer(doc.text)]
+    start = 0
+    while start < len(offsets):
+      end = min(start + self.max_tokens, len(offsets))
+      if end < len(offsets):
+        end = self._token_split_end(offsets, sentence_ends, start, end)
+      yield Node(text=doc.text[offsets[start][0] : offsets[end - 1][1]], parent=doc)
+      if end == len(offsets):
+        break
+      # the overlap starts at a word start, taking fewer tokens if needed
+      start = max(end - self.overlap, start + 1)
+      while start < end and offsets[start - 1][1] == offsets[start][0]:
+        start += 1
+
+  def _token_split_end(self, offsets: List[Tuple[int, int]], sentence_ends: List[int], start: int, end: int) -> int:
+    # splits before the token at `end`, moved back to the last sentence end, or else the last word start,
+    # keeping at least min_len tokens in the split
+    candidates = range(end, start + self.min_len, -1)
+    for split_end in candidates:
+      gap_start, gap_end = offsets[split_end - 1][1], offsets[split_end][0]
+      idx = bisect.bisect_left(sentence_ends, gap_start)
+      if idx < len(sentence_ends) and sentence_ends[idx] <= gap_end:
+        return split_end
+    for split_end in candidates:
+      if offsets[split_end - 1][1] < offsets[split_end][0]:
+        return split_end
+    return end
+
+  def _split_document(self, doc: Document) -> Iterator[Node]:
+    current_words: List[str] = []
+    sentences = self.sentence_splitter(doc.text)
+    for sentence in sentences:
+      words = self.word_splitter(sentence)
+      # the sentence can be combined without exceeding max_len
+      if len(current_words) + len(words) < self.max_len:
+        current_words += words
+        words = []
+        continue
+      # the sentence cannot be combined without exceeding max_len
+      new_nodes, new_current_words, new_words = self._build_nodes(doc, current_words, words)
+      yield from new_nodes
+      assert new_words == [], f"{new_words=} should be empty"
+      current_words = new_current_words
+    if len(current_words) > self.overlap:
+      node_text = "".join(current_words)
+      yield Node(text=node_text, parent=doc)
 
   def _build_nodes(
     self, doc: Document, current_words: List[str], words: List[str]
@@ -147,6 +209,15 @@ class TextSplitter(Splitter):
     return nodes, current_words, words
 
 
+def _iter_documents(inputs: SerializedInput) -> Iterator[Document]:
+  # an iterator of inputs is converted lazily, one item at a time
+  if isinstance(inputs, Iterator):
+    for item in inputs:
+      yield from to_document_list(item)
+    return
+  yield from to_document_list(inputs)
+
+
 def _build_sentence_splitter(eos_patterns: List[str]) -> Callable[[str], List[str]]:
   return _build_symbol_splitter(eos_patterns)
 
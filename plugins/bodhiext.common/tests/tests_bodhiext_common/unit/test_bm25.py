@@ -0,0 +1,74 @@
+import pytest
+from bodhiext.resources import BM25Index
+from bodhilib import Document, Node
+
+
+@pytest.fixture
+def index():
+  index = BM25Index()
+  index.add(
+    [
+      Node(id="1", text="The quick brown fox jumps over the lazy dog", embedding=[0.1]),
+      Node(id="2", text="Error code E1042 raised by the ingest worker"),
+      Node(id="3", text="the dog sleeps, the dog dreams"),
+    ]
+  )
+  return index
+
+
+def test_bm25_search_ranks_by_score(index):
+  result = index.search("dog", n=5)
+  assert [node.id for node, _ in result] == ["3", "1"]
+  assert result[0][1] > result[1][1] > 0
+
+
+def test_bm25_search_matches_exact_terms_case_insensitive(index):
+  result = index.search("e1042", n=5)
+  assert [node.id for node, _ in result] == ["2"]
+
+
+def test_bm25_search_limits_to_n(index):
+  assert len(index.search("the", n=2)) == 2
+
+
+def test_bm25_search_unknown_terms(index):
+  assert index.search("unknown", n=5) == []
+  assert BM25Index().search("dog") == []
+
+
+def test_bm25_add_is_incremental(index):
+  index.add([Node(id="4", text="fox fox fox")])
+  assert len(index) == 4
+  assert index.search("fox", n=1)[0][0].id == "4"
+
+
+def test_bm25_does_not_retain_embeddings(index):
+  node, _ = index.search("quick", n=1)[0]
+  assert node.id == "1"
+  assert node.embedding is None
+
+
+def test_bm25_retains_only_id_text_and_metadata():
+  index = BM25Index()
+  parent = Document(text="a large parent document " * 100, metadata={"path": "doc.txt"})
+  index.add([Node(id="1", text="quick fox", parent=parent, metadata={"path": "doc.txt"}, embedding=[0.1])])
+  node, _ = index.search("fox", n=1)[0]
+  assert (node.id, node.text, node.metadata) == ("1", "quick fox", {"path": "doc.txt"})
+  assert node.parent is None
+  assert node.embedding is None
+
+
+def test_bm25_add_replaces_node_with_same_id(index):
+  index.add([Node(id="2", text="fox den")])
+  assert len(index) == 3
+  assert index.search("e1042", n=5) == []
+  assert [node.id for node, _ in index.search("fox", n=5)] == ["2", "1"]
+  rebuilt = BM25Index()
+  rebuilt.add(
+    [
+      Node(id="1", text="The quick brown fox jumps over the lazy dog"),
+      Node(id="2", text="fox den"),
+      Node(id="3", text="the dog sleeps, the dog dreams"),
+    ]
+  )
+  assert index.search("fox dog", n=5) == rebuilt.search("fox dog", n=5)
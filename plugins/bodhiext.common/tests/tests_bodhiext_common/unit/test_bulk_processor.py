@@ -0,0 +1,159 @@
+import codecs
+from pathlib import Path
+from types import GeneratorType
+from typing import AsyncIterator, List
+
+import pytest
+from bodhiext.resources import DefaultFactory, DefaultQueueProcessor, InMemoryResourceQueue, TextBulkProcessor
+from bodhiext.resources._bulk import TEXT_BULK
+from bodhilib import (
+  DOCUMENT,
+  LOCAL_FILE,
+  Document,
+  IsResource,
+  ResourceProcessor,
+  get_resource_processor,
+  glob_pattern,
+  local_dir,
+  local_file,
+)
+
+
+@pytest.fixture
+def bulk_dir(tmpdir):
+  for i in range(10):
+    Path(tmpdir).joinpath(f"file{i:02}.txt").write_text(f"content {i}", encoding="utf-8")
+  Path(tmpdir).joinpath("data.csv").write_text("greeting,name\nhello,world\n")
+  subdir = Path(tmpdir).joinpath("subdir")
+  subdir.mkdir()
+  subdir.joinpath("nested.txt").write_text("nested")
+  return Path(tmpdir)
+
+
+@pytest.mark.parametrize(
+  ["stream"],
+  [(True,), (False,)],
+)
+def test_bulk_processor_local_dir(bulk_dir, stream):
+  processor = TextBulkProcessor(max_workers=4, batch_size=3)
+  documents = processor.process(local_dir(path=bulk_dir, recursive=True), stream=stream)
+  if stream:
+    assert isinstance(documents, GeneratorType)
+  resources = list(documents)
+  assert len(resources) == 12
+  # the non text files are returned as is, to be loaded by their processors
+  files = [resource for resource in resources if resource.resource_type == LOCAL_FILE]
+  assert [Path(file.metadata["path"]).name for file in files] == ["data.csv"]
+  documents = [resource for resource in resources if resource.resource_type != LOCAL_FILE]
+  assert all(isinstance(document, Document) for document in documents)
+  assert all(document.resource_type == DOCUMENT for document in documents)
+  texts = sorted(document.text for document in documents)
+  assert texts == sorted([f"content {i}" for i in range(10)] + ["nested"])
+
+
+def test_bulk_processor_glob(bulk_dir):
+  processor = TextBulkProcessor()
+  documents = processor.process(glob_pattern(path=str(bulk_dir), pattern="file0[0-4].txt"))
+  assert sorted(document.text for document in documents) == [f"content {i}" for i in range(5)]
+
+
+def test_bulk_processor_detects_encoding(tmpdir):
+  Path(tmpdir).joinpath("utf8.txt").write_text("héllo", encoding="utf-8")
+  Path(tmpdir).joinpath("bom.txt").write_bytes(codecs.BOM_UTF16_LE + "héllo".encode("utf-16-le"))
+  Path(tmpdir).joinpath("cp1252.txt").write_bytes("héllo €".encode("cp1252"))
+  documents = TextBulkProcessor().process(local_dir(path=tmpdir))
+  encodings = {Path(document.metadata["path"]).name: document.metadata["encoding"] for document in documents}
+  assert encodings == {"utf8.txt": "utf-8", "bom.txt": "utf-16", "cp1252.txt": "cp1252"}
+  assert sorted(document.text for document in documents) == ["héllo", "héllo", "héllo €"]
+
+
+def test_bulk_processor_unsupported_resource(tmpdir):
+  with pytest.raises(ValueError) as e:
+    TextBulkProcessor().process(local_file(path=tmpdir))
+  assert str(e.value) == "Unsupported resource type: local_file, supports ['local_dir', 'glob']"
+
+
+@pytest.mark.asyncio
+async def test_bulk_processor_async(bulk_dir):
+  documents = await TextBulkProcessor().aprocess(local_dir(path=bulk_dir), astream=True)
+  assert isinstance(documents, AsyncIterator)
+  assert len([document async for document in documents]) == 11
+
+
+class _DocProcessor(ResourceProcessor):
+  def __init__(self):
+    self.queue = []
+
+  def process(self, resource: IsResource) -> List[IsResource]:
+    self.queue.append(resource)
+    return []
+
+  async def aprocess(self, resource: IsResource) -> List[IsResource]:
+    self.queue.append(resource)
+    return []
+
+  @property
+  def supported_types(self) -> List[str]:
+    return [DOCUMENT]
+
+  @property
+  def service_name(self) -> str:
+    return "_test_doc_processor"
+
+
+def test_bulk_processor_in_queue_processor(bulk_dir):
+  docs_queue = _DocProcessor()
+  factory = DefaultFactory()
+  factory.add_resource_processor(TextBulkProcessor())
+  factory.add_resource_processor(docs_queue)
+  resource_queue = InMemoryResourceQueue()
+  resource_queue.push(local_dir(path=bulk_dir))
+  DefaultQueueProcessor(resource_queue, factory).process()
+  # the row of the csv file is loaded by the csv loader
+  assert len(docs_queue.queue) == 11
+  assert "greeting: hello\nname: world" in [document.text for document in docs_queue.queue]
+
+
+def test_bulk_processor_streams_large_files_in_chunks(bulk_dir):
+  large_text = "First sentence. Second sentence. Third sentence."
+  bulk_dir.joinpath("file05.txt").write_text(large_text, encoding="utf-8")
+  processor = TextBulkProcessor(batch_size=2, large_file_size=32, chunk_size=20)
+  documents = [
+    resource for resource in processor.process(local_dir(path=bulk_dir)) if resource.resource_type == DOCUMENT
+  ]
+  paths = [Path(document.metadata["path"]).name for document in documents]
+  assert sorted(set(paths)) == [f"file{i:02}.txt" for i in range(10)]
+  # the chunks of the large file are yielded together, in the order of the files
+  first = paths.index("file05.txt")
+  assert paths[first : first + 3] == ["file05.txt"] * 3
+  assert len(paths) == 12
+  chunks = [document for document in documents if "chunk" in document.metadata]
+  assert [chunk.metadata["chunk"] for chunk in chunks] == [0, 1, 2]
+  assert "".join(chunk.text for chunk in chunks) == large_text
+
+
+def test_bulk_processor_decodes_large_files_with_the_same_encodings(tmpdir):
+  text = "Prix: 5 €. Café crème. " * 4
+  Path(tmpdir).joinpath("cp1252.txt").write_bytes(text.encode("cp1252"))
+  Path(tmpdir).joinpath("small.txt").write_text("small", encoding="utf-8")
+  processor = TextBulkProcessor(large_file_size=16, chunk_size=64)
+  documents = list(processor.process(local_dir(path=tmpdir)))
+  chunks = [document for document in documents if Path(document.metadata["path"]).name == "cp1252.txt"]
+  assert len(chunks) > 1
+  assert "".join(chunk.text for chunk in chunks) == text
+  assert [document.text for document in documents if document not in chunks] == ["small"]
+
+
+def test_bulk_processor_skips_undecodable_large_file(tmpdir):
+  Path(tmpdir).joinpath("binary.txt").write_bytes(b"\x81\x8d" * 32)
+  Path(tmpdir).joinpath("small.txt").write_text("small", encoding="utf-8")
+  processor = TextBulkProcessor(encodings=["utf-8", "cp1252"], large_file_size=16)
+  assert [document.text for document in processor.process(local_dir(path=tmpdir))] == ["small"]
+
+
+def test_bulk_processor_service():
+  processor = get_resource_processor(TEXT_BULK, publisher="bodhiext", batch_size=8, large_file_size=1024)
+  assert isinstance(processor, TextBulkProcessor)
+  assert processor.batch_size == 8
+  assert processor.large_file_size == 1024
+  assert processor.supported_types == ["local_dir", "glob"]
@@ -0,0 +1,271 @@
+import asyncio
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from bodhiext.engine import DefaultSemanticEngine
+from bodhiext.engine._batching import EmbeddingBatcher
+from bodhiext.engine._fusion import reciprocal_rank_fusion
+from bodhiext.engine._packing import pack_contexts
+from bodhiext.resources import DefaultFactory, InMemoryResourceQueue, IngestProgress, track_progress
+from bodhiext.splitter import TextSplitter
+from bodhilib import Document, Node, Prompt, text_plain_file
+
+QUERY_NODE = Node(text="query", embedding=[0.1, 0.2])
+LOREM = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore"
+
+
+@pytest.fixture
+def vector_db():
+  return Mock()
+
+
+@pytest.fixture
+def llm():
+  llm = Mock()
+  llm.generate.return_value = Prompt("answer", role="ai")
+  return llm
+
+
+def _engine(vector_db, llm, **kwargs):
+  embedder = Mock()
+  embedder.batch_size = 32
+  embedder.embed.return_value = [QUERY_NODE]
+  return DefaultSemanticEngine(
+    InMemoryResourceQueue(), DefaultFactory(), TextSplitter(), embedder, vector_db, llm, "test_collection", **kwargs
+  )
+
+
+def test_engine_ann_passes_n_as_limit(vector_db, llm):
+  vector_db.query.return_value = [Node(text=f"node {i}") for i in range(3)]
+  engine = _engine(vector_db, llm)
+  result = engine.ann("query", n=2)
+  vector_db.query.assert_called_once_with("test_collection", QUERY_NODE, limit=2)
+  assert [node.text for node in result] == ["node 0", "node 1"]
+
+
+def test_engine_rag_renders_packed_contexts(vector_db, llm):
+  vector_db.query.return_value = [
+    Node(text="first chunk " + LOREM, metadata={"path": "a.txt"}),
+    Node(text=LOREM + " second chunk", metadata={"path": "a.txt"}),
+    Node(text="other document", metadata={"path": "b.txt"}),
+  ]
+  engine = _engine(vector_db, llm, context_tokens=21)
+  engine.rag("query", n=3)
+  prompt = llm.generate.call_args.args[0][0]
+  assert f"1. first chunk {LOREM} second chunk" in prompt.text
+  assert "2. other document" in prompt.text
+  assert LOREM not in prompt.text.replace(f"first chunk {LOREM} second chunk", "")
+
+
+def test_pack_contexts_honours_n():
+  nodes = [Node(text=f"node {i}", metadata={"path": f"{i}.txt"}) for i in range(5)]
+  assert [node.text for node in pack_contexts(nodes, n=3)] == ["node 0", "node 1", "node 2"]
+
+
+def test_pack_contexts_merges_overlapping_chunks_of_same_parent():
+  parent = Document(text=f"start {LOREM} end")
+  nodes = [
+    Node(text=f"{LOREM} end", parent=parent),
+    Node(text="unrelated", metadata={"path": "other.txt"}),
+    Node(text=f"start {LOREM}", parent=parent),
+  ]
+  result = pack_contexts(nodes)
+  assert [node.text for node in result] == [f"start {LOREM} end", "unrelated"]
+
+
+def test_pack_contexts_keeps_overlapping_chunks_of_different_parents():
+  nodes = [
+    Node(text=f"{LOREM} end", metadata={"path": "a.txt"}),
+    Node(text=f"start {LOREM}", metadata={"path": "b.txt"}),
+  ]
+  assert len(pack_contexts(nodes)) == 2
+
+
+def test_pack_contexts_drops_contained_chunk():
+  nodes = [
+    Node(text=f"start {LOREM} end", metadata={"path": "a.txt"}),
+    Node(text=LOREM, metadata={"path": "a.txt"}),
+  ]
+  assert [node.text for node in pack_contexts(nodes)] == [f"start {LOREM} end"]
+
+
+def test_pack_contexts_greedily_fills_token_budget_by_score():
+  nodes = [
+    Node(text="one two three", metadata={"path": "a.txt"}),
+    Node(text="one two three four five", metadata={"path": "b.txt"}),
+    Node(text="one", metadata={"path": "c.txt"}),
+    Node(text="one two", metadata={"path": "d.txt"}),
+  ]
+  result = pack_contexts(nodes, max_tokens=6)
+  assert [node.metadata["path"] for node in result] == ["a.txt", "c.txt", "d.txt"]
+
+
+def test_pack_contexts_uses_count_tokens():
+  nodes = [Node(text="abcdef", metadata={"path": "a.txt"}), Node(text="ab", metadata={"path": "b.txt"})]
+  result = pack_contexts(nodes, max_tokens=4, count_tokens=len)
+  assert [node.text for node in result] == ["ab"]
+
+
+def test_reciprocal_rank_fusion():
+  a, b, c = Node(id="a", text="a"), Node(id="b", text="b"), Node(id="c", text="c")
+  result = reciprocal_rank_fusion([[a, b, c], [c, b]], n=2)
+  assert [node.id for node in result] == ["c", "b"]
+
+
+def test_engine_hybrid_ann_fuses_lexical_and_vector_results(vector_db, llm):
+  engine = _engine(vector_db, llm, hybrid=True)
+  engine.bm25_index.add([Node(id="2", text="error E1042"), Node(id="3", text="worker E1042 logs")])
+  vector_db.query.return_value = [Node(id="1", text="similar"), Node(id="2", text="error E1042")]
+  result = engine.ann("E1042", n=3)
+  vector_db.query.assert_called_once_with("test_collection", QUERY_NODE, limit=3)
+  assert [node.id for node in result] == ["2", "1", "3"]
+
+
+def test_engine_hybrid_ann_runs_vector_search_on_calling_thread(vector_db, llm):
+  engine = _engine(vector_db, llm, hybrid=True)
+  threads = []
+  vector_db.query.side_effect = lambda *args, **kwargs: threads.append(threading.current_thread()) or []
+  engine.ann("query", n=3)
+  assert threads == [threading.current_thread()]
+
+
+def test_engine_close_shuts_down_executor(vector_db, llm):
+  engine = _engine(vector_db, llm, hybrid=True)
+  executor = engine._executor
+  engine.close()
+  assert engine._executor is None
+  with pytest.raises(RuntimeError):
+    executor.submit(print)
+  engine.close()
+
+
+def test_engine_ann_is_vector_only_by_default(vector_db, llm):
+  engine = _engine(vector_db, llm)
+  assert engine.bm25_index is None
+
+
+def test_engine_ann_reranks_wider_candidate_set(vector_db, llm):
+  candidates = [Node(id=str(i), text=f"node {i}") for i in range(6)]
+  vector_db.query.return_value = candidates
+  reranker = Mock()
+  reranker.rerank.return_value = [candidates[4], candidates[1]]
+  engine = _engine(vector_db, llm, reranker=reranker, rerank_factor=3)
+  result = engine.ann("query", n=2)
+  vector_db.query.assert_called_once_with("test_collection", QUERY_NODE, limit=6)
+  reranker.rerank.assert_called_once_with(Prompt("query"), candidates, 2)
+  assert [node.id for node in result] == ["4", "1"]
+
+
+def test_engine_rag_streams_llm_response(vector_db, llm):
+  vector_db.query.return_value = [Node(text="context")]
+  stream = iter([Prompt("Hello", role="ai"), Prompt(" world", role="ai")])
+  llm.generate.return_value = stream
+  engine = _engine(vector_db, llm)
+  assert engine.rag("query", stream=True) is stream
+  assert llm.generate.call_args.kwargs["stream"] is True
+
+
+def test_engine_run_ingest_records_progress(tmpdir, vector_db, llm):
+  engine = _engine(vector_db, llm)
+  engine.embedder.batch_size = 2
+  engine.embedder.embed.side_effect = lambda nodes: nodes
+  path = Path(tmpdir).joinpath("test.txt")
+  path.write_text(" ".join(f"word{i}" for i in range(600)))
+  engine.add_resource(text_plain_file(path))
+  with track_progress(IngestProgress()) as progress:
+    engine.run_ingest()
+  result = progress.to_dict()
+  assert (result["files"], result["documents"]) == (1, 1)
+  upserted = sum(len(call.args[1]) for call in vector_db.upsert.call_args_list)
+  assert result["nodes"] == result["embeddings"] == upserted
+  assert result["nodes"] > 1
+  assert result["errors"] == []
+
+
+def _embed(nodes):
+  for node in nodes:
+    node.embedding = [float(len(node.text))]
+  return nodes
+
+
+async def _aann(engine, query, n):
+  return [nodes async for nodes in engine.ann(query, astream=True, n=n)]
+
+
+@pytest.mark.asyncio
+async def test_engine_aann_coalesces_concurrent_queries_into_a_batch(vector_db, llm):
+  vector_db.aquery = AsyncMock(return_value=[Node(id="1", text="result")])
+  engine = _engine(vector_db, llm)
+  engine.embedder.embed.side_effect = _embed
+  results = await asyncio.gather(*[_aann(engine, "q" * i, 1) for i in range(1, 4)])
+  assert results == [[[Node(id="1", text="result")]]] * 3
+  engine.embedder.embed.assert_called_once()
+  assert [node.text for node in engine.embedder.embed.call_args.args[0]] == ["q", "qq", "qqq"]
+  assert sorted(call.args[1].embedding for call in vector_db.aquery.call_args_list) == [[1.0], [2.0], [3.0]]
+  assert all(call.kwargs == {"limit": 1} for call in vector_db.aquery.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_engine_aann_sends_full_batch_without_waiting(vector_db, llm):
+  vector_db.aquery = AsyncMock(return_value=[])
+  engine = _engine(vector_db, llm, batch_window=60)
+  engine.embedder.batch_size = 2
+  engine.embedder.embed.side_effect = _embed
+  await asyncio.wait_for(asyncio.gather(_aann(engine, "a", 1), _aann(engine, "b", 1)), timeout=5)
+  engine.embedder.embed.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_engine_aann_raises_embedder_error(vector_db, llm):
+  engine = _engine(vector_db, llm)
+  engine.embedder.embed.side_effect = ValueError("embedder failed")
+  with pytest.raises(ValueError, match="embedder failed"):
+    await _aann(engine, "query", 1)
+
+
+@pytest.mark.asyncio
+async def test_engine_aann_raises_error_for_missing_embeddings(vector_db, llm):
+  vector_db.aquery = AsyncMock(return_value=[])
+  engine = _engine(vector_db, llm)
+  engine.embedder.embed.side_effect = lambda nodes: _embed(nodes)[:1]
+  with pytest.raises(ValueError, match="Embedder returned 1 embeddings for a batch of 2 nodes"):
+    await asyncio.wait_for(asyncio.gather(_aann(engine, "a", 1), _aann(engine, "b", 1)), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_embedding_batcher_sends_pending_requests_of_previous_loop():
+  embedder = Mock()
+  embedder.batch_size = 2
+  embedder.embed.side_effect = _embed
+  batcher = EmbeddingBatcher(embedder, window=60)
+  other_loop = asyncio.new_event_loop()
+  thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+  thread.start()
+  try:
+    pending = asyncio.run_coroutine_threadsafe(batcher.embed(Node(text="a")), other_loop)
+    while not batcher._pending:
+      await asyncio.sleep(0.001)
+    results = await asyncio.wait_for(asyncio.gather(batcher.embed(Node(text="bb")), batcher.embed(Node(text="ccc"))), 5)
+    assert [node.embedding for node in results] == [[2.0], [3.0]]
+    assert pending.result(timeout=5).embedding == [1.0]
+  finally:
+    other_loop.call_soon_threadsafe(other_loop.stop)
+    thread.join()
+    other_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_aann_hybrid_and_rerank(vector_db, llm):
+  candidates = [Node(id="1", text="similar"), Node(id="2", text="error E1042")]
+  vector_db.aquery = AsyncMock(return_value=candidates)
+  reranker = Mock()
+  reranker.rerank.side_effect = lambda query, nodes, n: list(reversed(nodes))[:n]
+  engine = _engine(vector_db, llm, hybrid=True, reranker=reranker, rerank_factor=2)
+  engine.embedder.embed.side_effect = _embed
+  engine.bm25_index.add([Node(id="2", text="error E1042")])
+  [result] = await _aann(engine, "E1042", 1)
+  assert vector_db.aquery.call_args.kwargs == {"limit": 2}
+  assert [node.id for node in reranker.rerank.call_args.args[1]] == ["2", "1"]
+  assert [node.id for node in result] == ["1"]
@@ -1,5 +1,17 @@
 import pytest
-from bodhiext.resources import DefaultFactory, GlobProcessor, LocalDirProcessor, LocalFileProcessor, TextPlainProcessor
+from bodhiext.resources import (
+  CsvProcessor,
+  DefaultFactory,
+  GlobProcessor,
+  HtmlProcessor,
+  JsonlProcessor,
+  JsonProcessor,
+  LocalDirProcessor,
+  LocalFileProcessor,
+  MarkdownProcessor,
+  TextBulkProcessor,
+  TextPlainProcessor,
+)
 
 
 @pytest.fixture
@@ -8,16 +20,30 @@ def factory():
 
 
 @pytest.mark.parametrize(
-  ["supported_type", "service_name", "service_class"],
+  ["supported_type", "service_names", "service_class"],
   [
-    ("local_file", "local_file", LocalFileProcessor),
-    ("local_dir", "local_dir", LocalDirProcessor),
-    ("glob", "glob", GlobProcessor),
-    ("text/plain", "text_plain", TextPlainProcessor),
+    ("local_file", ["local_file"], LocalFileProcessor),
+    ("local_dir", ["local_dir", "text_bulk"], LocalDirProcessor),
+    ("glob", ["glob", "text_bulk"], GlobProcessor),
+    ("text/plain", ["text_plain"], TextPlainProcessor),
+    ("text/markdown", ["markdown"], MarkdownProcessor),
+    ("text/html", ["html"], HtmlProcessor),
+    ("application/json", ["json"], JsonProcessor),
+    ("application/jsonl", ["jsonl"], JsonlProcessor),
+    ("text/csv", ["csv"], CsvProcessor),
   ],
 )
-def test_factory_find(factory, supported_type, service_name, service_class):
+def test_factory_find(factory, supported_type, service_names, service_class):
   processor_service = factory.find(supported_type)
-  assert len(processor_service) == 1
-  assert processor_service[0].service_name == service_name
+  assert [processor.service_name for processor in processor_service] == service_names
   assert isinstance(processor_service[0], service_class)
+
+
+@pytest.mark.parametrize(["find_first"], [(True,), (False,)])
+def test_factory_prefers_added_processor(factory, find_first):
+  if find_first:
+    factory.find("local_dir")
+  bulk_processor = TextBulkProcessor()
+  factory.add_resource_processor(bulk_processor)
+  assert factory.find("local_dir")[0] is bulk_processor
+  assert factory.find("glob")[0] is bulk_processor
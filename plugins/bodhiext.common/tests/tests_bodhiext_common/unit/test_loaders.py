@@ -0,0 +1,153 @@
+import json
+from pathlib import Path
+from types import GeneratorType
+from typing import AsyncIterator
+
+import pytest
+from bodhiext.resources import (
+  CsvProcessor,
+  HtmlProcessor,
+  JsonlProcessor,
+  JsonProcessor,
+  LocalFileProcessor,
+  MarkdownProcessor,
+)
+from bodhiext.resources import _loaders
+from bodhilib import DOCUMENT, Resource, local_file
+
+MARKDOWN = """Intro line.
+
+# First heading
+First section text.
+
+```
+# not a heading
+```
+
+## Second heading ##
+Second section text.
+"""
+
+HTML = """<html><head><title>Skipped</title><style>p { color: red; }</style></head>
+<body>
+<p>Intro &amp; summary.</p>
+<h1>First <em>heading</em></h1>
+<p>First   section
+text.</p>
+<script>var skipped = 1;</script>
+<h2>Second heading</h2>
+<ul><li>one</li><li>two</li></ul>
+</body></html>
+"""
+
+
+def _resource(tmpdir, filename, content, resource_type):
+  path = Path(tmpdir).joinpath(filename)
+  path.write_text(content, encoding="utf-8")
+  return Resource(resource_type=resource_type, path=str(path))
+
+
+@pytest.mark.parametrize(
+  ["filename", "resource_type"],
+  [
+    ("test.md", "text/markdown"),
+    ("test.markdown", "text/markdown"),
+    ("test.html", "text/html"),
+    ("test.HTM", "text/html"),
+    ("test.json", "application/json"),
+    ("test.jsonl", "application/jsonl"),
+    ("test.csv", "text/csv"),
+    ("test.txt", "text/plain"),
+  ],
+)
+def test_local_file_processor_resource_types(tmpdir, filename, resource_type):
+  path = Path(tmpdir).joinpath(filename)
+  path.write_text("")
+  resources = LocalFileProcessor().process(local_file(path=path))
+  assert len(resources) == 1
+  assert resources[0].resource_type == resource_type
+  assert str(resources[0].metadata["path"]) == str(path)
+
+
+def test_markdown_processor_sections(tmpdir):
+  resource = _resource(tmpdir, "test.md", MARKDOWN, "text/markdown")
+  documents = MarkdownProcessor().process(resource)
+  assert [document.metadata["heading"] for document in documents] == [None, "First heading", "Second heading"]
+  assert [document.metadata["section"] for document in documents] == [0, 1, 2]
+  assert documents[0].text == "Intro line.\n\n"
+  assert "# not a heading" in documents[1].text
+  assert documents[2].text == "## Second heading ##\nSecond section text.\n"
+  assert "".join(document.text for document in documents) == MARKDOWN
+
+
+def test_html_processor_sections(tmpdir):
+  resource = _resource(tmpdir, "test.html", HTML, "text/html")
+  documents = HtmlProcessor().process(resource)
+  assert [(document.metadata["heading"], document.text) for document in documents] == [
+    (None, "Intro & summary."),
+    ("First heading", "First heading\nFirst section text."),
+    ("Second heading", "Second heading\none\ntwo"),
+  ]
+
+
+def test_html_processor_reads_in_chunks(tmpdir, monkeypatch):
+  monkeypatch.setattr(_loaders, "READ_SIZE", 7)
+  resource = _resource(tmpdir, "test.html", HTML, "text/html")
+  documents = HtmlProcessor().process(resource)
+  assert [document.text for document in documents][1] == "First heading\nFirst section text."
+
+
+@pytest.mark.parametrize(["read_size"], [(3,), (64 * 1024,)])
+def test_json_processor_streams_array(tmpdir, monkeypatch, read_size):
+  monkeypatch.setattr(_loaders, "READ_SIZE", read_size)
+  records = [{"text": "first", "id": 1}, {"text": "second [with] {braces}", "id": 22}, 12345, "last"]
+  resource = _resource(tmpdir, "test.json", f" \n{json.dumps(records, indent=2)}\n", "application/json")
+  documents = JsonProcessor(text_key="text").process(resource, stream=True)
+  assert isinstance(documents, GeneratorType)
+  documents = list(documents)
+  assert [document.text for document in documents] == ["first", "second [with] {braces}", "12345", '"last"']
+  assert [document.metadata["record"] for document in documents] == [0, 1, 2, 3]
+  assert all(document.resource_type == DOCUMENT for document in documents)
+
+
+def test_json_processor_object(tmpdir):
+  resource = _resource(tmpdir, "test.json", '{"title": "hello"}', "application/json")
+  documents = JsonProcessor().process(resource)
+  assert [document.text for document in documents] == ['{"title": "hello"}']
+
+
+def test_json_processor_truncated_array(tmpdir):
+  resource = _resource(tmpdir, "test.json", '[{"title": "hello"}, {"title"', "application/json")
+  documents = JsonProcessor().process(resource, stream=True)
+  assert next(documents).text == '{"title": "hello"}'
+  with pytest.raises(ValueError):
+    next(documents)
+
+
+def test_loader_unsupported_resource_type(tmpdir):
+  resource = _resource(tmpdir, "test.md", MARKDOWN, "text/markdown")
+  with pytest.raises(ValueError) as e:
+    CsvProcessor().process(resource)
+  assert str(e.value) == "Unsupported resource type: text/markdown, supports ['text/csv']"
+
+
+def test_jsonl_processor(tmpdir):
+  content = '{"text": "first"}\n\n{"text": "second", "id": 2}\n{"id": 3}\n'
+  resource = _resource(tmpdir, "test.jsonl", content, "application/jsonl")
+  documents = JsonlProcessor(text_key="text").process(resource)
+  assert [document.text for document in documents] == ["first", "second", '{"id": 3}']
+  assert [document.metadata["record"] for document in documents] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_csv_processor(tmpdir):
+  content = 'name,comment\nfoo,"hello, world"\nbar,"multi\nline"\n'
+  resource = _resource(tmpdir, "test.csv", content, "text/csv")
+  documents = await CsvProcessor().aprocess(resource, astream=True)
+  assert isinstance(documents, AsyncIterator)
+  documents = [document async for document in documents]
+  assert [document.text for document in documents] == [
+    "name: foo\ncomment: hello, world",
+    "name: bar\ncomment: multi\nline",
+  ]
+  assert [document.metadata["record"] for document in documents] == [0, 1]
@@ -1,7 +1,9 @@
 import tempfile
+from unittest.mock import patch
 
 import pytest
-from bodhiext.prompt_source import LocalPromptSource
+from bodhiext.prompt_source import LocalPromptSource, load_prompt_template_yaml
+from bodhilib import Filter
 
 from tests_bodhiext_common.conftest import TEST_DATA_DIR
 
@@ -153,3 +155,169 @@ def test_local_prompt_soruce_list_all():
   assert result[0].metadata["id"] == "1"
   assert result[1].metadata["id"] == "2"
   assert result[2].metadata["id"] == "3"
+
+
+@pytest.mark.parametrize(
+  ["filter", "expected_candidates", "expected_ids"],
+  [
+    ({"id": "2"}, {1}, ["2"]),
+    ({"format": "fstring"}, {0, 2}, ["1", "3"]),
+    ({"tags": {"$in": ["education", "funny"]}}, {0, 1, 2}, ["1", "2", "3"]),
+    ({"tags": {"$all": ["simple", "funny"]}}, {1}, ["2"]),
+    ({"format": "fstring", "tags": {"$in": ["funny"]}}, {2}, ["3"]),
+    ({"$or": [{"id": "1"}, {"tags": {"$all": ["funny"]}}]}, {0, 1, 2}, ["1", "2", "3"]),
+    ({"$and": [{"format": "jinja2"}, {"id": {"$gte": "2"}}]}, {1}, ["2"]),
+    ({"id": {"$gt": "1"}}, None, ["2", "3"]),
+    ({"$or": [{"id": "1"}, {"id": {"$gt": "2"}}]}, None, ["1", "3"]),
+    ({"tags": {"$nin": ["simple"]}}, None, ["3"]),
+  ],
+)
+def test_template_index_uses_indexes_for_equality_lookups(filter, expected_candidates, expected_ids):
+  sources = LocalPromptSource(dir=str(TEST_DATA_DIR / "prompt-sources"))
+  index = sources._get_index()
+  assert index.candidates(Filter.from_dict(filter).condition) == expected_candidates
+  assert [template.metadata["id"] for template in sources.find(filter)] == expected_ids
+
+
+@pytest.mark.parametrize(
+  "filter",
+  [
+    {"tags": {"$in": ["funny"]}},
+    {"tags": {"$all": ["funny"]}},
+    {"format": "fstring"},
+    {"id": {"$gt": "1"}},
+    {"$or": [{"id": "1"}, {"tags": {"$in": ["funny"]}}]},
+    {"$and": [{"id": "2"}, {"tags": {"$in": ["funny"]}}]},
+    {"$and": [{"tags": {"$in": ["funny"]}}, {"id": "2"}]},
+  ],
+)
+def test_template_index_raises_same_error_as_evaluating_all_templates(tmp_path, filter):
+  templates_yaml = tmp_path / "templates.yaml"
+  templates_yaml.write_text(
+    "templates:\n"
+    "- id: '1'\n  format: fstring\n  prompts:\n  - text: no tags\n"
+    "- id: '2'\n  format: fstring\n  tags: [funny]\n  prompts:\n  - text: with tags\n"
+    "- id: '3'\n  format: fstring\n  tags: funny\n  prompts:\n  - text: with a tag\n"
+  )
+  sources = LocalPromptSource(file=templates_yaml)
+  condition = Filter.from_dict(filter)
+  try:
+    expected = [template for template in sources.list_all() if condition.evaluate(template.metadata)]
+  except ValueError as e:
+    with pytest.raises(ValueError) as actual:
+      sources.find(filter)
+    assert str(actual.value) == str(e)
+  else:
+    assert sources.find(filter) == expected
+
+
+def test_local_prompt_source_find_by_id_skips_templates_without_id(tmp_path):
+  templates_yaml = tmp_path / "templates.yaml"
+  templates_yaml.write_text(
+    "templates:\n"
+    "- format: fstring\n  prompts:\n  - text: no id\n"
+    "- id: '7'\n  format: fstring\n  prompts:\n  - text: with id\n"
+  )
+  sources = LocalPromptSource(file=templates_yaml)
+  result = sources.find_by_id("7")
+  assert result is not None
+  assert result.prompts[0].text == "with id"
+  assert sources.find_by_id("8") is None
+
+
+def _write_templates(path, *ids):
+  templates = "".join(f"- id: '{id}'\n  format: fstring\n  prompts:\n  - text: template {id}\n" for id in ids)
+  path.write_text(f"templates:\n{templates}" if ids else "templates: []\n")
+
+
+def test_local_prompt_source_does_not_reload_empty_templates(tmp_path):
+  _write_templates(tmp_path / "empty.yaml")
+  sources = LocalPromptSource(file=tmp_path / "empty.yaml")
+  with patch("bodhiext.prompt_source._prompt_source.load_prompt_template_yaml", return_value=[]) as load:
+    assert sources.list_all() == []
+    assert sources.find({"id": "1"}) == []
+  load.assert_called_once()
+
+
+def test_local_prompt_source_loads_unchanged_files_from_cache(tmp_path):
+  _write_templates(tmp_path / "one.yaml", "1", "2")
+  cache_dir = tmp_path / "cache"
+  first = LocalPromptSource(file=tmp_path / "one.yaml", cache_dir=cache_dir)
+  assert [t.metadata["id"] for t in first.list_all()] == ["1", "2"]
+  with patch("bodhiext.prompt_source._cache._parse_templates") as parse:
+    second = LocalPromptSource(file=tmp_path / "one.yaml", cache_dir=cache_dir)
+    assert [t.metadata["id"] for t in second.list_all()] == ["1", "2"]
+    assert second.find_by_id("2").prompts[0].text == "template 2"
+  parse.assert_not_called()
+  _write_templates(tmp_path / "one.yaml", "3")
+  third = LocalPromptSource(file=tmp_path / "one.yaml", cache_dir=cache_dir)
+  assert [t.metadata["id"] for t in third.list_all()] == ["3"]
+
+
+def test_local_prompt_source_watch_reloads_changed_files(tmp_path):
+  templates_dir = tmp_path / "templates"
+  templates_dir.mkdir()
+  _write_templates(templates_dir / "a.yaml", "1")
+  _write_templates(templates_dir / "b.yaml", "2")
+  sources = LocalPromptSource(dir=templates_dir, watch_interval=0)
+  unchanged = sources.find_by_id("1")
+  assert sorted(t.metadata["id"] for t in sources.list_all()) == ["1", "2"]
+
+  _write_templates(templates_dir / "b.yaml", "2", "22")
+  _write_templates(templates_dir / "c.yaml", "3")
+  assert sorted(t.metadata["id"] for t in sources.list_all()) == ["1", "2", "22", "3"]
+  assert sources.find_by_id("1") is unchanged
+  assert sources.find_by_id("22") is not None
+
+  (templates_dir / "c.yaml").unlink()
+  assert sources.find_by_id("3") is None
+  assert sources.reload() is False
+
+
+def test_local_prompt_source_watch_keeps_default_pkg_templates():
+  sources = LocalPromptSource(watch_interval=0)
+  templates = sources.list_all()
+  index = sources._get_index()
+  with patch("bodhiext.prompt_source._prompt_source.load_prompt_template_yaml") as load:
+    assert sources.reload() is False
+    assert sources.list_all() is templates
+    assert sources._get_index() is index
+  load.assert_not_called()
+
+
+@pytest.fixture
+def many_files(tmp_path):
+  for i in range(5):
+    _write_templates(tmp_path / f"templates-{i}.yaml", f"{i}-a", f"{i}-b")
+  files = sorted(tmp_path.glob("*.yaml"))
+  return files
+
+
+def test_local_prompt_source_find_stream_parses_files_lazily(many_files):
+  sources = LocalPromptSource(files=many_files)
+  with patch(
+    "bodhiext.prompt_source._prompt_source.load_prompt_template_yaml", wraps=load_prompt_template_yaml
+  ) as load:
+    result = sources.find({"$or": [{"id": "1-b"}, {"id": "3-a"}]}, stream=True)
+    assert load.call_count == 0
+    assert next(result).metadata["id"] == "1-b"
+    assert load.call_count == 2
+    assert [t.metadata["id"] for t in result] == ["3-a"]
+    assert load.call_count == 5
+    # consumed fully, the templates are loaded for the later calls
+    assert len(sources.list_all()) == 10
+    assert load.call_count == 5
+
+
+def test_local_prompt_source_list_all_stream_parses_files_lazily(many_files):
+  sources = LocalPromptSource(files=many_files)
+  with patch(
+    "bodhiext.prompt_source._prompt_source.load_prompt_template_yaml", wraps=load_prompt_template_yaml
+  ) as load:
+    result = sources.list_all(stream=True)
+    first = [next(result) for _ in range(3)]
+    assert [t.metadata["id"] for t in first] == ["0-a", "0-b", "1-a"]
+    assert load.call_count == 2
+    # partially consumed, the parsed files are reused
+    assert len(sources.list_all()) == 10
+    assert load.call_count == 5
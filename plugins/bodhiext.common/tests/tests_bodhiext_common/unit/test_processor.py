@@ -1,6 +1,8 @@
+import codecs
 import os
 import tempfile
 from pathlib import Path
+from types import GeneratorType
 from typing import AsyncIterator, Iterator, List
 
 import pytest
@@ -596,6 +598,80 @@ async def test_processor_async_glob_pattern(
   assert paths == expected
 
 
+@pytest.mark.parametrize(
+  ["exclude_hidden", "files"],
+  [
+    (True, ["test1.txt", "test2.csv", "tmpdir2/test4.txt"]),
+    (
+      False,
+      [
+        ".hidden/.test7.txt",
+        ".hidden/test6.txt",
+        ".test3.txt",
+        "test1.txt",
+        "test2.csv",
+        "tmpdir2/.test5.txt",
+        "tmpdir2/test4.txt",
+      ],
+    ),
+  ],
+)
+def test_processor_local_dir_hidden_dir(tmp_test_dir, local_dir_processor: ResourceProcessor, exclude_hidden, files):
+  os.mkdir(f"{tmp_test_dir}/.hidden")
+  _tmpfile(f"{tmp_test_dir}/.hidden", "test6.txt", "hidden world!")
+  _tmpfile(f"{tmp_test_dir}/.hidden", ".test7.txt", "hidden world!")
+  resource = local_dir(path=tmp_test_dir, recursive=True, exclude_hidden=exclude_hidden)
+  resources = local_dir_processor.process(resource)
+  paths = sorted([resource.metadata["path"] for resource in resources])
+  assert paths == [f"{tmp_test_dir}/{f}" for f in files]
+
+
+@pytest.mark.parametrize(["processor"], [("local_dir_processor",), ("glob_processor",)])
+def test_processor_stream_yields_lazily(tmp_test_dir, all_processors, processor):
+  resources = {
+    "local_dir_processor": local_dir(path=tmp_test_dir, recursive=True),
+    "glob_processor": glob_pattern(str(tmp_test_dir), "*.txt", recursive=True),
+  }
+  resources_iter = all_processors[processor].process(resources[processor], stream=True)
+  assert isinstance(resources_iter, GeneratorType)
+  first = next(resources_iter)
+  assert first.resource_type == LOCAL_FILE
+
+
+def test_processor_glob_pattern_with_subdir(tmp_test_dir, glob_processor: ResourceProcessor):
+  resource = glob_pattern(str(tmp_test_dir), "tmpdir2/*.txt", recursive=True, exclude_hidden=True)
+  resources = glob_processor.process(resource)
+  paths = [resource.metadata["path"] for resource in resources]
+  assert paths == [f"{tmp_test_dir}/tmpdir2/test4.txt"]
+
+
+@pytest.mark.parametrize(
+  ["pattern", "recursive", "files"],
+  [
+    ("tmpdir2/*.txt", False, ["tmpdir2/test4.txt"]),
+    ("*/*.txt", False, ["tmpdir2/test4.txt"]),
+    ("tmpdir2/deep/*.txt", False, ["tmpdir2/deep/test8.txt"]),
+    ("tmpdir2/*.txt", True, ["tmpdir2/test4.txt", "tmpdir3/tmpdir2/test9.txt"]),
+    ("**/*.txt", False, ["test1.txt", "tmpdir2/deep/test8.txt", "tmpdir2/test4.txt", "tmpdir3/tmpdir2/test9.txt"]),
+    ("**/*.txt", True, ["test1.txt", "tmpdir2/deep/test8.txt", "tmpdir2/test4.txt", "tmpdir3/tmpdir2/test9.txt"]),
+    ("tmpdir2/**", False, ["tmpdir2/deep/test8.txt", "tmpdir2/test4.txt"]),
+    ("tmpdir2/**/test*.txt", False, ["tmpdir2/deep/test8.txt", "tmpdir2/test4.txt"]),
+    ("*.txt", False, ["test1.txt"]),
+  ],
+)
+def test_processor_glob_pattern_with_separator(
+  tmp_test_dir, glob_processor: ResourceProcessor, pattern, recursive, files
+):
+  os.makedirs(f"{tmp_test_dir}/tmpdir2/deep")
+  os.makedirs(f"{tmp_test_dir}/tmpdir3/tmpdir2")
+  _tmpfile(f"{tmp_test_dir}/tmpdir2/deep", "test8.txt", "deep world!")
+  _tmpfile(f"{tmp_test_dir}/tmpdir3/tmpdir2", "test9.txt", "nested world!")
+  resource = glob_pattern(str(tmp_test_dir), pattern, recursive=recursive, exclude_hidden=True)
+  resources = glob_processor.process(resource)
+  paths = sorted([resource.metadata["path"] for resource in resources])
+  assert paths == [f"{tmp_test_dir}/{f}" for f in files]
+
+
 @pytest.mark.parametrize(
   ["stream"],
   [(True,), (False,)],
@@ -660,19 +736,72 @@ async def test_processor_async_text_plain(tmp_test_dir, text_plain_processor: Re
   assert resources[0].metadata["path"] == str(Path(tmp_test_dir).joinpath("test1.txt"))
 
 
+@pytest.mark.parametrize(
+  ["stream"],
+  [(True,), (False,)],
+)
+def test_processor_text_plain_large_file_chunks(tmp_test_dir, stream):
+  text = "First sentence here. Second one? Third one!\nFourth line without break " + "ünïcode " * 8
+  _tmpfile(tmp_test_dir, "large.txt", text)
+  processor = TextPlainProcessor(large_file_size=16, chunk_size=24)
+  resources = processor.process(text_plain_file(path=Path(tmp_test_dir).joinpath("large.txt")), stream=stream)
+  if stream:
+    assert isinstance(resources, GeneratorType)
+  resources = list(resources)
+  assert len(resources) > 1
+  assert "".join([r.text for r in resources]) == text
+  assert resources[0].text == "First sentence here."
+  assert resources[1].text == " Second one? Third one!\n"
+  assert [r.metadata["chunk"] for r in resources] == list(range(len(resources)))
+  assert resources[1].metadata["offset"] == len(resources[0].text.encode("utf-8"))
+  assert all(len(r.text.encode("utf-8")) <= 24 for r in resources)
+
+
+@pytest.mark.parametrize(
+  ["encoding", "bom"],
+  [
+    ("utf-8", b""),
+    ("utf-8", codecs.BOM_UTF8),
+    ("utf-16-le", codecs.BOM_UTF16_LE),
+    ("utf-16-be", codecs.BOM_UTF16_BE),
+    ("utf-32-le", codecs.BOM_UTF32_LE),
+  ],
+)
+def test_processor_text_plain_same_text_for_small_and_large_file(tmp_test_dir, encoding, bom):
+  text = "Héllo wörld. Ünïcode line?\r\nLast line 😀 without break"
+  path = Path(tmp_test_dir).joinpath("encoded.txt")
+  path.write_bytes(bom + text.encode(encoding))
+  small = TextPlainProcessor().process(text_plain_file(path=path))
+  large = TextPlainProcessor(large_file_size=0, chunk_size=32).process(text_plain_file(path=path))
+  assert small[0].text == text
+  assert len(large) > 1
+  assert "".join([r.text for r in large]) == text
+  assert large[0].metadata["offset"] == len(bom)
+  assert large[1].metadata["offset"] == len(bom) + len(large[0].text.encode(encoding))
+
+
+def test_processor_text_plain_small_file_not_chunked(tmp_test_dir):
+  processor = TextPlainProcessor(large_file_size=1024, chunk_size=4)
+  resources = processor.process(text_plain_file(path=Path(tmp_test_dir).joinpath("test1.txt")))
+  assert len(resources) == 1
+  assert "chunk" not in resources[0].metadata
+
+
 def test_processor_text_plain_unsupported_ext(tmp_test_dir, local_file_processor: ResourceProcessor):
-  _tmpfile(tmp_test_dir, "test1.csv", "hello,world")
+  _tmpfile(tmp_test_dir, "test1.pdf", "hello world")
   with pytest.raises(ValueError) as e:
-    _ = local_file_processor.process(local_file(path=Path(tmp_test_dir).joinpath("test1.csv")))
-  assert str(e.value) == "Unsupported file extension: .csv, supports ['.txt']"
+    _ = local_file_processor.process(local_file(path=Path(tmp_test_dir).joinpath("test1.pdf")))
+  exts = "['.txt', '.md', '.markdown', '.html', '.htm', '.json', '.jsonl', '.csv']"
+  assert str(e.value) == f"Unsupported file extension: .pdf, supports {exts}"
 
 
 @pytest.mark.asyncio
 async def test_processor_async_text_plain_unsupported_ext(tmp_test_dir, local_file_processor: ResourceProcessor):
-  _tmpfile(tmp_test_dir, "test1.csv", "hello,world")
+  _tmpfile(tmp_test_dir, "test1.pdf", "hello world")
   with pytest.raises(ValueError) as e:
-    _ = await local_file_processor.aprocess(local_file(path=Path(tmp_test_dir).joinpath("test1.csv")))
-  assert str(e.value) == "Unsupported file extension: .csv, supports ['.txt']"
+    _ = await local_file_processor.aprocess(local_file(path=Path(tmp_test_dir).joinpath("test1.pdf")))
+  exts = "['.txt', '.md', '.markdown', '.html', '.htm', '.json', '.jsonl', '.csv']"
+  assert str(e.value) == f"Unsupported file extension: .pdf, supports {exts}"
 
 
 @pytest.mark.rs
@@ -2,8 +2,15 @@ from pathlib import Path
 from typing import List
 
 import pytest
-from bodhiext.resources import DefaultFactory, DefaultQueueProcessor, InMemoryResourceQueue
-from bodhilib import DOCUMENT, IsResource, ResourceProcessor, text_plain_file
+from bodhiext.resources import (
+  DefaultFactory,
+  DefaultQueueProcessor,
+  InMemoryResourceQueue,
+  IngestProgress,
+  TextPlainProcessor,
+  track_progress,
+)
+from bodhilib import DOCUMENT, IsResource, ResourceProcessor, local_dir, text_plain_file
 
 
 class _DocProcessor(ResourceProcessor):
@@ -59,6 +66,39 @@ def test_queue_processor_processes_to_doc(tmpdir, queue_processor, resource_queu
   assert document.metadata["resource_type"] == DOCUMENT
 
 
+
+def test_queue_processor_streams_large_file_documents(tmpdir, resource_queue, docs_queue):
+  factory = DefaultFactory()
+  factory.add_resource_processor(docs_queue)
+  factory.add_resource_processor(TextPlainProcessor(large_file_size=8, chunk_size=20))
+  queue_processor = DefaultQueueProcessor(resource_queue, factory)
+  _tmpfile(tmpdir, "test.txt", "First sentence. Second sentence. Third.")
+  resource_queue.push(text_plain_file(Path(tmpdir).joinpath("test.txt")))
+  queue_processor.process()
+  assert [doc.text for doc in docs_queue.queue] == ["First sentence.", " Second sentence.", " Third."]
+  assert resource_queue.pop(block=False) is None
+
+
+def test_queue_processor_tracks_progress(tmpdir, queue_processor, resource_queue):
+  _tmpfile(tmpdir, "one.txt", "one")
+  _tmpfile(tmpdir, "two.txt", "two")
+  resource_queue.push(local_dir(str(tmpdir)))
+  resource_queue.push(text_plain_file(Path(tmpdir).joinpath("missing.txt")))
+  with track_progress(IngestProgress()) as progress:
+    queue_processor.process()
+  result = progress.to_dict()
+  assert result["files"] == 2
+  assert len(result["errors"]) == 1
+  assert "missing.txt" in result["errors"][0]
+  assert progress.finished_at is not None
+
+
+def test_queue_processor_raises_errors_if_not_tracking_progress(tmpdir, queue_processor, resource_queue):
+  resource_queue.push(text_plain_file(Path(tmpdir).joinpath("missing.txt")))
+  with pytest.raises(ValueError, match="File does not exist"):
+    queue_processor.process()
+
+
 def _tmpfile(tmpdir, filename, content):
   tmpfilepath = f"{tmpdir}/{filename}"
   tmpfile = open(tmpfilepath, "w")
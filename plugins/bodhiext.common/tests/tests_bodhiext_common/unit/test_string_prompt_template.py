@@ -1,6 +1,7 @@
 # prompt template
 
 from bodhiext.prompt_template import StringPromptTemplate
+from bodhiext.prompt_template._string_prompt_template import _compile_jinja2
 from bodhilib import (
   Prompt,
 )
@@ -36,3 +37,13 @@ def test_prompt_template_defaults_override():
     Prompt("simple template", role="system", source="output"), metadata={"format": "jinja2"}
   )
   assert template.format == "jinja2"
+
+
+def test_prompt_template_jinja2_compiled_once():
+  _compile_jinja2.cache_clear()
+  text = "{% for day in days %}{{ day }} {% endfor %}"
+  for days in [["Monday"], ["Monday", "Tuesday"]]:
+    template = StringPromptTemplate(Prompt(text), metadata={"format": "jinja2"})
+    assert template.to_prompts(days=days)[0].text == "".join(f"{day} " for day in days)
+  cache_info = _compile_jinja2.cache_info()
+  assert (cache_info.misses, cache_info.hits) == (1, 1)
@@ -1,4 +1,5 @@
 import os
+import re
 from pathlib import Path
 
 import pytest
@@ -82,6 +83,24 @@ async def test_text_splitter_async(text_splitter):
   assert splits[1].text == "7 8. This is 6 words sentence 6. "
 
 
+@pytest.mark.asyncio
+async def test_text_splitter_async_consumes_documents_lazily(text_splitter):
+  consumed = []
+
+  def _documents():
+    for i in range(3):
+      consumed.append(i)
+      yield Document(text=_generate_sentence(8))
+
+  split_async = text_splitter.split(_documents(), astream=True)
+  first = await split_async.__anext__()
+  assert first.text == "This is 8 words sentence 6 7 8. "
+  assert consumed == [0]
+  rest = [s async for s in split_async]
+  assert len(rest) == 2
+  assert consumed == [0, 1, 2]
+
+
 def test_preserves_original_text():
   zero_overlap_splitter = TextSplitter(max_len=10, min_len=6, overlap=0)
   text = _generate_sentence(64)
@@ -98,5 +117,51 @@ def test_zero_overlap_splitter_on_essay():
   assert "".join([s.text for s in splits]) == text
 
 
+class WordPieceTokenizer:
+  # tokenizes words in pieces of at most 4 characters, and punctuations, as a fast tokenizer with offsets
+  pattern = re.compile(r"\w{1,4}|[^\w\s]")
+
+  def __init__(self):
+    self.calls = 0
+
+  def __call__(self, texts, add_special_tokens, return_offsets_mapping):
+    assert add_special_tokens is False and return_offsets_mapping is True
+    self.calls += 1
+    return {"offset_mapping": [[m.span() for m in self.pattern.finditer(text)] for text in texts]}
+
+  def num_special_tokens_to_add(self):
+    return 2
+
+
+def test_token_splitter_fits_max_len_tokens():
+  tokenizer = WordPieceTokenizer()
+  token_splitter = TextSplitter(max_len=12, min_len=4, overlap=0, tokenizer=tokenizer)
+  text = "Tokenization counts word pieces. Short one. Another sentence here."
+  splits = token_splitter.split([Document(text=text)])
+  assert [s.text for s in splits] == ["Tokenization counts word pieces.", "Short one. Another sentence here."]
+  for split in splits:
+    assert len(tokenizer([split.text], False, True)["offset_mapping"][0]) <= 10
+
+
+def test_token_splitter_splits_long_sentence_at_word_boundary_with_overlap():
+  token_splitter = TextSplitter(max_len=7, min_len=2, overlap=1, tokenizer=WordPieceTokenizer())
+  splits = token_splitter.split([Document(text="one two three four five six seven eight nine")])
+  assert [s.text for s in splits] == ["one two three four", "four five six seven", "eight nine"]
+
+
+def test_token_splitter_splits_long_word_at_token():
+  token_splitter = TextSplitter(max_len=5, min_len=1, overlap=0, tokenizer=WordPieceTokenizer())
+  splits = token_splitter.split([Document(text="abcdefghijklmnopqrst")])
+  assert [s.text for s in splits] == ["abcdefghijkl", "mnopqrst"]
+
+
+def test_token_splitter_tokenizes_documents_in_batches():
+  tokenizer = WordPieceTokenizer()
+  token_splitter = TextSplitter(max_len=12, min_len=4, overlap=0, tokenizer=tokenizer)
+  splits = token_splitter.split([Document(text=f"Document {i}.") for i in range(40)])
+  assert [s.text for s in splits] == [f"Document {i}." for i in range(40)]
+  assert tokenizer.calls == 2
+
+
 def _generate_sentence(i: int):
   return f"This is {i} words sentence " + " ".join([str(i) for i in range(6, i + 1)]) + ". "
@@ -1,6 +1,7 @@
 """:mod:`bodhiext.qdrant` module defines classes and methods for Qdrant Vector Database related operations."""
+import asyncio
 import uuid
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple, Union
 
 from bodhilib import (
   Distance,
@@ -22,6 +23,15 @@ from qdrant_client.http.models import Filter, PointStruct, ScoredPoint, VectorPa
 
 from ._version import __version__
 
+try:
+  # the async client is available from qdrant-client 1.6
+  from qdrant_client import AsyncQdrantClient
+except ImportError:  # pragma: no cover
+  AsyncQdrantClient = None  # type: ignore
+
+# background tasks closing an async client from inside its own running loop, referenced until done
+_closing_tasks: Set["asyncio.Task[Any]"] = set()
+
 _qdrant_distance_mapping = {
   Distance.COSINE.value: QdrantDistance.COSINE,
   Distance.DOT_PRODUCT.value: QdrantDistance.DOT,
@@ -54,6 +64,9 @@ class Qdrant(VectorDB):
     Raises:
         :class:`~bodhilib.VectorDBError`: Wraps any connection error raised by the underlying database and raises.
     """
+    self.aclient: Optional[Any] = None
+    self._aloop: Optional[asyncio.AbstractEventLoop] = None
+    self._args: Optional[Dict[str, Any]] = None
     if client:
       self.client = client
       return
@@ -73,6 +86,8 @@ class Qdrant(VectorDB):
         **kwargs,
       }
       args = {key: value for key, value in args.items() if value is not None}
+      # a second client on a local store opens a separate in-memory store, or fails on the locked storage folder
+      self._args = args if _is_remote(args) else None
       self.client = QdrantClient(**args)
     except (ValueError, RuntimeError) as e:
       raise VectorDBError(e) from e
@@ -91,6 +106,9 @@ class Qdrant(VectorDB):
     """
     try:
       self.client.close()
+      aclient, self.aclient = self.aclient, None
+      if aclient is not None and self._aloop is not None:
+        _run_on_loop(aclient.close(), self._aloop)
       return True
     except (RuntimeError, ValueError) as e:
       raise VectorDBError(e) from e
@@ -157,21 +175,68 @@ class Qdrant(VectorDB):
     filter: Optional[Union[Dict[str, Any], BodhiFilter]] = None,
     **kwargs: Dict[str, Any],
   ) -> List[Node]:
-    # TODO: support MongoDBFilter object
-    parsed_embedding = to_embedding(embedding)
-    if parsed_embedding is None:
-      raise VectorDBError(ValueError("Embedding is not present"))
+    parsed_embedding, query_filter = _search_args(embedding, filter)
     try:
-      if filter:
-        qdrant_filter = _mongodb_to_qdrant_filter(filter)
-        query_filter = Filter(**qdrant_filter)
-      else:
-        query_filter = None
       results = self.client.search(collection_name, parsed_embedding, query_filter=query_filter, **kwargs)
       return _to_nodes(results)
     except (ValueError, RuntimeError) as e:
       raise VectorDBError(e) from e
 
+  async def aquery(
+    self,
+    collection_name: str,
+    embedding: Union[Embedding, Node, SupportsEmbedding],
+    filter: Optional[Union[Dict[str, Any], BodhiFilter]] = None,
+    **kwargs: Dict[str, Any],
+  ) -> List[Node]:
+    """Searches using the async qdrant client, for connections to a remote server by `url`, `host` or `location`.
+
+    Falls back to running :meth:`query` in the default executor for the local `:memory:` and `path` stores, if the
+    qdrant client was passed in, or if the installed qdrant-client has no async client.
+    """
+    if self._args is None or AsyncQdrantClient is None:
+      return await super().aquery(collection_name, embedding, filter, **kwargs)
+    parsed_embedding, query_filter = _search_args(embedding, filter)
+    try:
+      aclient = self._get_aclient()
+      results = await aclient.search(collection_name, parsed_embedding, query_filter=query_filter, **kwargs)
+      return _to_nodes(results)
+    except (ValueError, RuntimeError) as e:
+      raise VectorDBError(e) from e
+
+  def _get_aclient(self) -> Any:
+    if self.aclient is None:
+      self.aclient = AsyncQdrantClient(**self._args)  # type: ignore
+      self._aloop = asyncio.get_running_loop()
+    return self.aclient
+
+
+def _is_remote(args: Dict[str, Any]) -> bool:
+  location = args.get("location")
+  return "url" in args or "host" in args or (location is not None and location != ":memory:")
+
+
+def _run_on_loop(coro: Coroutine[Any, Any, Any], loop: asyncio.AbstractEventLoop) -> None:
+  """Runs the coroutine on the loop the async client was created on, its connections are bound to that loop."""
+  if loop.is_closed():
+    # the connections were dropped along with the loop
+    coro.close()
+    return
+  if not loop.is_running():
+    loop.run_until_complete(coro)
+    return
+  try:
+    running = asyncio.get_running_loop()
+  except RuntimeError:
+    running = None
+  if running is loop:
+    # cannot block the loop we are called from, close in the background
+    task = loop.create_task(coro)
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+  else:
+    asyncio.run_coroutine_threadsafe(coro, loop).result()
+
 
 def qdrant_service_builder(
   *,
@@ -283,6 +348,19 @@ def _mongodb_to_qdrant_filter(mongo_filter: Optional[Union[Dict[str, Any], Bodhi
   return qdrant_filter
 
 
+def _search_args(
+  embedding: Union[Embedding, Node, SupportsEmbedding], filter: Optional[Union[Dict[str, Any], BodhiFilter]]
+) -> Tuple[Embedding, Optional[Filter]]:
+  # TODO: support MongoDBFilter object
+  parsed_embedding = to_embedding(embedding)
+  if parsed_embedding is None:
+    raise VectorDBError(ValueError("Embedding is not present"))
+  try:
+    return parsed_embedding, Filter(**_mongodb_to_qdrant_filter(filter)) if filter else None
+  except (ValueError, RuntimeError) as e:
+    raise VectorDBError(e) from e
+
+
 def _to_nodes(results: List[ScoredPoint]) -> List[Node]:
   nodes: List[Node] = []
   for result in results:
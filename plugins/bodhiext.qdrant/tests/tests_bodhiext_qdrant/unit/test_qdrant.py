@@ -1,4 +1,5 @@
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 import pydantic
 
 import pytest
@@ -212,3 +213,74 @@ def _mock_collection(name):
     collection = Mock(spec=CollectionDescription)
     collection.configure_mock(name=name)
     return collection
+
+
+@pytest.mark.asyncio
+@patch("bodhiext.qdrant._qdrant.AsyncQdrantClient")
+@patch("bodhiext.qdrant._qdrant.QdrantClient")
+async def test_qdrant_aquery_calls_async_client(_, mock_aclient_class):
+  mock_aclient = mock_aclient_class.return_value
+  stub_result = [ScoredPoint(id="1", version=1, score=0.1, payload={"text": "test node"}, vector=[1.0, 2.0, 3.0])]
+  mock_aclient.search = AsyncMock(return_value=stub_result)
+  qdrant = Qdrant(host="localhost", port=6333)
+  result = await qdrant.aquery("test_collection", [1.0, 2.0, 3.0], {"filename": "foo.txt"}, limit=2)
+  assert result == [Node(id="1", text="test node", embedding=[1.0, 2.0, 3.0])]
+  mock_aclient_class.assert_called_once_with(host="localhost", port=6333, grpc_port=6334, prefer_grpc=False)
+  mock_aclient.search.assert_called_once_with(
+    "test_collection",
+    [1.0, 2.0, 3.0],
+    query_filter=Filter(**{"must": [{"key": "filename", "match": {"text": "foo.txt"}}]}),
+    limit=2,
+  )
+
+
+@pytest.mark.asyncio
+@patch("qdrant_client.QdrantClient")
+async def test_qdrant_aquery_runs_query_in_executor_for_passed_client(mock_client_class):
+  mock_client = mock_client_class.return_value
+  mock_client.search.return_value = [ScoredPoint(id="1", version=1, score=0.1, payload={"text": "test node"})]
+  qdrant = Qdrant(client=mock_client)
+  result = await qdrant.aquery("test_collection", [1.0, 2.0, 3.0], limit=2)
+  assert result == [Node(id="1", text="test node")]
+  mock_client.search.assert_called_once_with("test_collection", [1.0, 2.0, 3.0], query_filter=None, limit=2)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("args", [{"location": ":memory:"}, {"path": "/tmp/qdrant"}])
+@patch("bodhiext.qdrant._qdrant.AsyncQdrantClient")
+@patch("bodhiext.qdrant._qdrant.QdrantClient")
+async def test_qdrant_aquery_runs_query_in_executor_for_local_store(mock_client_class, mock_aclient_class, args):
+  mock_client = mock_client_class.return_value
+  mock_client.search.return_value = [ScoredPoint(id="1", version=1, score=0.1, payload={"text": "test node"})]
+  qdrant = Qdrant(**args)
+  result = await qdrant.aquery("test_collection", [1.0, 2.0, 3.0], limit=2)
+  assert result == [Node(id="1", text="test node")]
+  mock_aclient_class.assert_not_called()
+  mock_client.search.assert_called_once_with("test_collection", [1.0, 2.0, 3.0], query_filter=None, limit=2)
+
+
+@pytest.mark.asyncio
+@patch("bodhiext.qdrant._qdrant.AsyncQdrantClient")
+@patch("bodhiext.qdrant._qdrant.QdrantClient")
+async def test_qdrant_aquery_raises_vector_db_error_when_async_client_fails(_, mock_aclient_class):
+  mock_aclient_class.side_effect = ValueError("invalid connection")
+  qdrant = Qdrant(url="http://localhost:6333")
+  with pytest.raises(VectorDBError) as e:
+    await qdrant.aquery("test_collection", [1.0, 2.0, 3.0])
+  assert str(e.value) == "invalid connection"
+
+
+@pytest.mark.asyncio
+@patch("bodhiext.qdrant._qdrant.AsyncQdrantClient")
+@patch("bodhiext.qdrant._qdrant.QdrantClient")
+async def test_qdrant_close_closes_async_client(mock_client_class, mock_aclient_class):
+  mock_aclient = mock_aclient_class.return_value
+  mock_aclient.search = AsyncMock(return_value=[])
+  mock_aclient.close = AsyncMock()
+  qdrant = Qdrant(host="localhost")
+  await qdrant.aquery("test_collection", [1.0, 2.0, 3.0])
+  assert qdrant.close() is True
+  await asyncio.sleep(0)
+  mock_client_class.return_value.close.assert_called_once_with()
+  mock_aclient.close.assert_awaited_once_with()
+  assert qdrant.aclient is None
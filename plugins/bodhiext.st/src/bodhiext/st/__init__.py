@@ -1,9 +1,14 @@
 """SentenceTransformers Bodhilib plugin LLM service package."""
 import inspect
 
+from ._model_info import model_dimension as model_dimension
+from ._onnx import OnnxEncoder as OnnxEncoder
+from ._onnx import export_onnx as export_onnx
 from ._st_embedder import SentenceTransformerEmbedder as SentenceTransformerEmbedder
 from ._st_embedder import bodhilib_list_services as bodhilib_list_services
 from ._st_embedder import sentence_transformer_builder as sentence_transformer_builder
+from ._st_reranker import CrossEncoderReranker as CrossEncoderReranker
+from ._st_reranker import cross_encoder_builder as cross_encoder_builder
 from ._version import __version__ as __version__
 
 __all__ = [name for name, obj in globals().items() if not (name.startswith("_") or inspect.ismodule(obj))]
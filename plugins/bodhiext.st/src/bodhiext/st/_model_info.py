@@ -0,0 +1,95 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from bodhilib.logging import logger
+
+HUB_ORGANIZATION = "sentence-transformers"
+# dimension of the embeddings of the commonly used sentence-transformer models
+KNOWN_DIMENSIONS = {
+  "all-MiniLM-L6-v2": 384,
+  "all-MiniLM-L12-v2": 384,
+  "all-mpnet-base-v2": 768,
+  "all-distilroberta-v1": 768,
+  "multi-qa-MiniLM-L6-cos-v1": 384,
+  "multi-qa-mpnet-base-cos-v1": 768,
+  "multi-qa-mpnet-base-dot-v1": 768,
+  "multi-qa-distilbert-cos-v1": 768,
+  "paraphrase-MiniLM-L3-v2": 384,
+  "paraphrase-MiniLM-L6-v2": 384,
+  "paraphrase-albert-small-v2": 768,
+  "paraphrase-multilingual-MiniLM-L12-v2": 384,
+  "paraphrase-multilingual-mpnet-base-v2": 768,
+  "paraphrase-mpnet-base-v2": 768,
+  "distiluse-base-multilingual-cased-v1": 512,
+  "distiluse-base-multilingual-cased-v2": 512,
+  "msmarco-distilbert-base-v4": 768,
+}
+
+
+def model_dimension(model: str) -> Optional[int]:
+  """Returns the dimension of the embeddings of a sentence-transformer model, without loading the model.
+
+  The dimension is looked up in the known models, or read from the model configuration, if the model is a local
+  directory or is available in the sentence-transformers cache.
+
+  Args:
+      model: name of the model on the huggingface hub, or path of the model directory
+
+  Returns:
+      Optional[int]: dimension of the embeddings, or None if it is not known without loading the model
+  """
+  name = model[len(HUB_ORGANIZATION) + 1 :] if model.startswith(f"{HUB_ORGANIZATION}/") else model
+  if name in KNOWN_DIMENSIONS:
+    return KNOWN_DIMENSIONS[name]
+  model_dir = _model_dir(model)
+  if model_dir is None:
+    return None
+  try:
+    return _read_dimension(model_dir)
+  except (OSError, ValueError, KeyError) as e:
+    logger.debug(f"Unable to read the dimension from the model config, {model_dir=}, error={e}")
+    return None
+
+
+def _model_dir(model: str) -> Optional[Path]:
+  if os.path.isdir(model):
+    return Path(model)
+  # models without an organization are from the sentence-transformers one
+  name = model if "/" in model else f"{HUB_ORGANIZATION}/{model}"
+  cache_home = os.getenv("XDG_CACHE_HOME", "~/.cache")
+  # the huggingface hub cache, used by sentence-transformers>=2.3
+  hf_home = os.getenv("HF_HOME", os.path.join(cache_home, "huggingface"))
+  hub_cache = os.getenv("HF_HUB_CACHE", os.path.join(hf_home, "hub"))
+  repo_dir = Path(os.path.expanduser(hub_cache)) / f"models--{name.replace('/', '--')}"
+  ref = repo_dir / "refs" / "main"
+  if ref.is_file():
+    snapshot_dir = repo_dir / "snapshots" / ref.read_text().strip()
+    if snapshot_dir.is_dir():
+      return snapshot_dir
+  # the sentence-transformers cache, used by sentence-transformers<2.3
+  st_cache = os.getenv("SENTENCE_TRANSFORMERS_HOME")
+  if st_cache is None:
+    st_cache = os.path.join(os.getenv("TORCH_HOME", os.path.join(cache_home, "torch")), "sentence_transformers")
+  model_dir = Path(os.path.expanduser(st_cache)) / name.replace("/", "_")
+  return model_dir if model_dir.is_dir() else None
+
+
+def _read_dimension(model_dir: Path) -> Optional[int]:
+  # the last module changing the dimension decides the dimension of the embeddings
+  dimension = None
+  for module in _read_json(model_dir / "modules.json"):
+    module_type = module["type"]
+    if module_type.endswith(".Pooling"):
+      config = _read_json(model_dir / module["path"] / "config.json")
+      modes = sum(1 for key, value in config.items() if key.startswith("pooling_mode_") and value)
+      dimension = config["word_embedding_dimension"] * modes
+    elif module_type.endswith(".Dense"):
+      dimension = _read_json(model_dir / module["path"] / "config.json")["out_features"]
+  return dimension
+
+
+def _read_json(path: Path) -> Any:
+  with open(path, "r", encoding="utf-8") as f:
+    return json.load(f)
@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, cast
+
+import numpy as np
+import sentence_transformers as sentence_transformers
+from bodhilib.logging import logger
+
+ONNX_CACHE_DIR = Path.home() / ".cache" / "bodhiext" / "onnx"
+ONNX_OPSET = 14
+POOLING_MODES = {"pooling_mode_cls_token": "cls", "pooling_mode_max_tokens": "max", "pooling_mode_mean_tokens": "mean"}
+
+
+class OnnxEncoder:
+  def __init__(self, model: str, onnx_path: Optional[str] = None, quantize: bool = False) -> None:
+    """Encodes the texts using an onnx export of a sentence-transformer model, running on onnxruntime.
+
+    The model is exported to `onnx_path` on first use, and int8 quantized if `quantize` is True. The
+    tokenization, pooling and normalization follow the sentence-transformer pipeline of the model, so the
+    embeddings match the ones of the pytorch model. The tokenizer and the pipeline config are saved next to
+    the onnx model, and later loads do not load the pytorch model.
+
+    Args:
+        model: the sentence-transformer model to encode with
+        onnx_path: path of the onnx model, exported from the sentence-transformer model if the file does
+            not exist. Defaults to a file under `~/.cache/bodhiext/onnx`.
+        quantize: if True, the exported model weights are dynamically quantized to int8. Defaults to False.
+    """
+    try:
+      import onnxruntime
+    except ImportError as e:
+      raise ImportError(
+        "onnxruntime is required for the onnx backend, install it using `pip install bodhiext.st[onnx]`"
+      ) from e
+    if onnx_path is None:
+      suffix = "-int8" if quantize else ""
+      onnx_path = str(ONNX_CACHE_DIR / f"{model.replace('/', '--')}{suffix}.onnx")
+    config_path, tokenizer_path = _sidecar_paths(onnx_path)
+    if os.path.exists(onnx_path) and os.path.exists(config_path) and os.path.exists(tokenizer_path):
+      # the exported model is self-contained, skips loading the pytorch model
+      from transformers import AutoTokenizer
+
+      config = json.loads(Path(config_path).read_text())
+      self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+    else:
+      client = sentence_transformers.SentenceTransformer(model, device="cpu")
+      if os.path.exists(onnx_path):
+        config = _save_pipeline(client, onnx_path)
+      else:
+        config = export_onnx(client, onnx_path, quantize=quantize)
+      self.tokenizer = client.tokenizer
+    self.onnx_path = onnx_path
+    self.max_seq_length: int = config["max_seq_length"]
+    self.dimension: int = config["dimension"]
+    self.pooling_mode: str = config["pooling_mode"]
+    self.normalize: bool = config["normalize"]
+    self.session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    self.input_names = [input.name for input in self.session.get_inputs()]
+
+  def encode(
+    self, sentences: List[str], batch_size: int = 32, normalize_embeddings: bool = False, **kwargs: Dict[str, Any]
+  ) -> np.ndarray:
+    """Encodes the sentences in batches, returning the embeddings in the order of the sentences."""
+    # batching the sentences of similar length reduces the padding, as done by sentence-transformers
+    order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+    embeddings = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+    for start in range(0, len(sentences), batch_size):
+      indices = order[start : start + batch_size]
+      features = self.tokenizer(
+        [sentences[i] for i in indices],
+        padding=True,
+        truncation=True,
+        max_length=self.max_seq_length,
+        return_tensors="np",
+      )
+      inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+      token_embeddings = self.session.run(None, inputs)[0]
+      batch = _pool(token_embeddings, features["attention_mask"], self.pooling_mode)
+      embeddings[indices] = _normalize(batch) if self.normalize or normalize_embeddings else batch
+    return embeddings
+
+  def get_sentence_embedding_dimension(self) -> Optional[int]:
+    """Dimension of the embeddings of the model."""
+    return self.dimension
+
+
+def export_onnx(
+  client: sentence_transformers.SentenceTransformer, onnx_path: str, quantize: bool = False
+) -> Dict[str, Any]:
+  """Exports the transformer of a sentence-transformer model to onnx.
+
+  The tokenizer and the pipeline config are saved next to the onnx model, see :func:`_sidecar_paths`.
+
+  Args:
+      client: the sentence-transformer model to export
+      onnx_path: path of the exported onnx model
+      quantize: if True, the model weights are dynamically quantized to int8. Defaults to False.
+
+  Returns:
+      the pipeline config of the model, with the pooling mode, normalization, dimension and max sequence length
+
+  Raises:
+      ValueError: if the model is not a transformer followed by a supported pooling and optional normalization
+  """
+  import torch
+
+  # validates the model before the export
+  _pipeline_config(client)
+  Path(onnx_path).parent.mkdir(parents=True, exist_ok=True)
+  transformer = client[0].auto_model
+  features = dict(client.tokenizer(["warmup"], return_tensors="pt"))
+  dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in [*features.keys(), "token_embeddings"]}
+  logger.info(f"Exporting model to onnx, path={onnx_path}, {quantize=}")
+  with tempfile.TemporaryDirectory() as tmpdir:
+    export_path = os.path.join(tmpdir, "model.onnx") if quantize else onnx_path
+    with torch.no_grad():
+      torch.onnx.export(
+        transformer,
+        (features,),
+        export_path,
+        input_names=list(features.keys()),
+        output_names=["token_embeddings"],
+        dynamic_axes=dynamic_axes,
+        opset_version=ONNX_OPSET,
+      )
+    if quantize:
+      from onnxruntime.quantization import QuantType, quantize_dynamic
+
+      quantize_dynamic(export_path, onnx_path, weight_type=QuantType.QInt8)
+  return _save_pipeline(client, onnx_path)
+
+
+def _sidecar_paths(onnx_path: str) -> List[str]:
+  # pipeline config and tokenizer directory saved next to the onnx model
+  return [f"{onnx_path}.json", f"{onnx_path}.tokenizer"]
+
+
+def _save_pipeline(client: sentence_transformers.SentenceTransformer, onnx_path: str) -> Dict[str, Any]:
+  config = _pipeline_config(client)
+  config_path, tokenizer_path = _sidecar_paths(onnx_path)
+  client.tokenizer.save_pretrained(tokenizer_path)
+  Path(config_path).write_text(json.dumps(config))
+  return config
+
+
+def _pipeline_config(client: sentence_transformers.SentenceTransformer) -> Dict[str, Any]:
+  return {
+    "pooling_mode": _pooling_mode(client),
+    "normalize": any(isinstance(module, sentence_transformers.models.Normalize) for module in client),
+    "dimension": client.get_sentence_embedding_dimension(),
+    "max_seq_length": client.max_seq_length,
+  }
+
+
+def _pooling_mode(client: sentence_transformers.SentenceTransformer) -> str:
+  # the onnx model exports the transformer only, the pooling and normalization are done in numpy,
+  # so any other module (e.g. Dense) would be silently dropped from the pipeline
+  modules = list(client)
+  names = [module.__class__.__name__ for module in modules]
+  if (
+    len(modules) < 2
+    or not isinstance(modules[0], sentence_transformers.models.Transformer)
+    or not isinstance(modules[1], sentence_transformers.models.Pooling)
+    or not all(isinstance(module, sentence_transformers.models.Normalize) for module in modules[2:])
+  ):
+    raise ValueError(
+      f"Unsupported modules for the onnx backend: {names}, supports Transformer, Pooling and optional Normalize"
+    )
+  config = modules[1].get_config_dict()
+  enabled = [key for key, value in config.items() if key.startswith("pooling_mode_") and value]
+  if len(enabled) != 1 or enabled[0] not in POOLING_MODES:
+    raise ValueError(f"Unsupported pooling for the onnx backend: {enabled}, supports one of {list(POOLING_MODES)}")
+  return POOLING_MODES[enabled[0]]
+
+
+def _pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, mode: str) -> np.ndarray:
+  if mode == "cls":
+    return cast(np.ndarray, token_embeddings[:, 0])
+  mask = attention_mask[..., np.newaxis].astype(token_embeddings.dtype)
+  if mode == "max":
+    return cast(np.ndarray, np.where(mask > 0, token_embeddings, -1e9).max(axis=1))
+  summed = (token_embeddings * mask).sum(axis=1)
+  return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+  norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+  return cast(np.ndarray, embeddings / np.clip(norms, 1e-12, None))
@@ -1,29 +1,96 @@
 """:mod:`bodhiext.st` module defines classes and methods for embedder using sentence-transformer."""
 from __future__ import annotations
 
+import threading
 import typing
 from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Union
 
+import numpy as np
 import sentence_transformers as sentence_transformers
 from bodhiext.common import AsyncListIterator
 from bodhilib import Embedder, Embedding, Node, SerializedInput, Service, service_provider, to_node_list
 from bodhilib.logging import logger
 
+from ._model_info import model_dimension
+from ._onnx import OnnxEncoder, _normalize
+from ._st_reranker import cross_encoder_builder
 from ._version import __version__
 
+Encoder = Union[sentence_transformers.SentenceTransformer, OnnxEncoder]
+Precision = Literal["float32", "float16", "int8"]
+
 
 class SentenceTransformerEmbedder(Embedder):
   """Embedder using sentence-transformer library."""
 
   def __init__(
     self,
-    client: Optional[sentence_transformers.SentenceTransformer] = None,
+    client: Optional[Encoder] = None,
     model: Optional[str] = None,
+    load_in_background: bool = False,
+    warmup: bool = False,
+    pool_size: Optional[int] = None,
+    backend: Literal["torch", "onnx"] = "torch",
+    onnx_path: Optional[str] = None,
+    quantize: bool = False,
+    batch_size: int = 32,
+    normalize: bool = False,
+    precision: Precision = "float32",
     **kwargs: Dict[str, Any],
   ) -> None:
+    """Initializes the embedder.
+
+    The model is loaded lazily on the first call to :meth:`embed` or :attr:`dimension`, or eagerly by calling
+    :meth:`warmup`.
+
+    Args:
+        client: the sentence-transformer client to use, if not supplied, the client is created for the `model`
+        model: the model to load, defaults to "all-MiniLM-L6-v2"
+        load_in_background: if True, starts loading the model in a background thread on construction,
+            the calls needing the model block until it is loaded. Defaults to False.
+        warmup: if True, encodes a dummy batch once the background loading completes,
+            so the first request does not pay for the kernel initialization. Defaults to False.
+        pool_size: number of worker processes encoding on the cpu. If set, the texts are encoded on a
+            multi-process pool started on first use, and stopped on :meth:`close`.
+            Defaults to None, encoding in the calling process.
+        backend: "torch" to encode using the sentence-transformer model, or "onnx" to encode using an onnx
+            export of the model on onnxruntime, requires the `onnx` extra. Defaults to "torch".
+        onnx_path: path of the onnx model for the onnx backend, exported from the model if the file does not
+            exist. Defaults to a file under `~/.cache/bodhiext/onnx`.
+        quantize: if True, the onnx backend uses an int8 quantized export of the model. Defaults to False.
+        batch_size: number of texts encoded together by the model, also reported as the embedder batch size.
+            Defaults to 32.
+        normalize: if True, the embeddings are normalized to unit length, so they can be compared using the dot
+            product. Defaults to False.
+        precision: precision of the embedding values, "float32", "float16" or "int8". The "int8" embeddings are
+            the normalized embeddings scaled to [-127, 127], and require `normalize`. Defaults to "float32".
+        **kwargs: pass through arguments for the embedder
+    """
+    assert pool_size is None or pool_size > 0, f"{pool_size=} should be greater than 0"
+    if backend not in ["torch", "onnx"]:
+      raise ValueError(f"Unknown backend: {backend=}, supported backends: ['torch', 'onnx']")
+    if backend == "onnx" and pool_size is not None:
+      raise ValueError("pool_size is not supported with the onnx backend")
+    assert batch_size > 0, f"{batch_size=} should be greater than 0"
+    if precision not in typing.get_args(Precision):
+      raise ValueError(f"Unknown precision: {precision=}, supported precisions: {list(typing.get_args(Precision))}")
+    if precision == "int8" and not normalize:
+      raise ValueError("precision='int8' requires normalize=True")
     kwargs = {k: v for k, v in kwargs.items() if v is not None}
     self.kwargs = kwargs
-    self.client: Optional[sentence_transformers.SentenceTransformer] = None
+    self.pool_size = pool_size
+    self.backend = backend
+    self.onnx_path = onnx_path
+    self.quantize = quantize
+    self.normalize = normalize
+    self.precision = precision
+    self._batch_size = batch_size
+    self._dimension: Optional[int] = None
+    self.client: Optional[Encoder] = None
+    self._pool: Optional[Dict[str, Any]] = None
+    self._lock = threading.Lock()
+    self._loader: Optional[threading.Thread] = None
+    self._load_error: Optional[Exception] = None
     if client:
       self.client = client
       return
@@ -32,6 +99,11 @@ class SentenceTransformerEmbedder(Embedder):
       self.model = "all-MiniLM-L6-v2"
     else:
       self.model = model
+    if load_in_background:
+      self._loader = threading.Thread(
+        target=self._background_load, args=(warmup,), name=f"st-loader-{self.model}", daemon=True
+      )
+      self._loader.start()
 
   @typing.overload
   def embed(self, inputs: SerializedInput) -> List[Node]:
@@ -56,9 +128,7 @@ class SentenceTransformerEmbedder(Embedder):
         List[:class:`~bodhilib.Embedding`]: list of embeddings
     """
     nodes = to_node_list(inputs)
-    if self.client is None:
-      self.client = sentence_transformers.SentenceTransformer(self.model)
-    embeddings: List[Embedding] = self.client.encode([node.text for node in nodes]).tolist()
+    embeddings = self._encode(self._get_client(), [node.text for node in nodes])
     for node, embedding in zip(nodes, embeddings):
       node.embedding = embedding
     if astream is None or astream is False:
@@ -69,12 +139,18 @@ class SentenceTransformerEmbedder(Embedder):
   def dimension(self) -> int:
     """Dimension of the embeddings.
 
+    If the model is not loaded yet, the dimension is looked up in the known models, or read from the model
+    configuration in the local cache, without loading the model.
+
     Returns:
         int: dimension of the embeddings
     """
     if self.client is None:
-      self.client = sentence_transformers.SentenceTransformer(self.model)
-    dimension = self.client.get_sentence_embedding_dimension()
+      if self._dimension is None:
+        self._dimension = model_dimension(self.model)
+      if self._dimension is not None:
+        return self._dimension
+    dimension = self._get_client().get_sentence_embedding_dimension()
     if dimension is None:
       raise ValueError("Dimension of the model is None.")
     if isinstance(dimension, int):
@@ -83,15 +159,120 @@ class SentenceTransformerEmbedder(Embedder):
 
   @property
   def batch_size(self) -> int:
-    return 32
+    return self._batch_size
+
+  @property
+  def tokenizer(self) -> Any:
+    """Tokenizer of the model, to split the texts by tokens using :class:`~bodhiext.splitter.TextSplitter`."""
+    return self._get_client().tokenizer
+
+  @property
+  def max_seq_length(self) -> int:
+    """Maximum number of tokens of a text encoded by the model, the longer texts are truncated."""
+    max_seq_length: int = self._get_client().max_seq_length
+    return max_seq_length
+
+  def warmup(self) -> None:
+    """Loads the model and encodes a dummy batch to initialize the inference kernels.
+
+    Starts the multi-process pool as well, if the embedder is configured with a `pool_size`.
+    """
+    client = self._get_client()
+    _warmup(client)
+    if self.pool_size is not None:
+      self._get_pool(client)
+
+  def close(self) -> None:
+    """Stops the multi-process pool, if started."""
+    with self._lock:
+      pool, self._pool = self._pool, None
+    if pool is not None:
+      sentence_transformers.SentenceTransformer.stop_multi_process_pool(pool)
+
+  def _encode(self, client: Encoder, texts: List[str]) -> List[Embedding]:
+    if not texts:
+      return []
+    if self.pool_size is None:
+      embeddings = client.encode(texts, batch_size=self._batch_size, normalize_embeddings=self.normalize)
+    else:
+      embeddings = self._encode_multi_process(typing.cast(sentence_transformers.SentenceTransformer, client), texts)
+    return _to_precision(embeddings, self.precision)
+
+  def _encode_multi_process(self, client: sentence_transformers.SentenceTransformer, texts: List[str]) -> np.ndarray:
+    # the pool encodes the texts in chunks, sorting by length keeps texts of similar length in the same chunk,
+    # so the chunks are padded less. The embeddings are put back in the order of the texts.
+    order = np.argsort([len(text) for text in texts], kind="stable")
+    pool = self._get_pool(client)
+    encoded = np.asarray(client.encode_multi_process([texts[i] for i in order], pool, batch_size=self._batch_size))
+    embeddings = np.empty_like(encoded)
+    embeddings[order] = encoded
+    return _normalize(embeddings) if self.normalize else embeddings
+
+  def _get_pool(self, client: sentence_transformers.SentenceTransformer) -> Dict[str, Any]:
+    assert self.pool_size is not None
+    with self._lock:
+      if self._pool is None:
+        self._pool = client.start_multi_process_pool(target_devices=["cpu"] * self.pool_size)
+      return self._pool
+
+  def _get_client(self) -> Encoder:
+    loader = self._loader
+    if loader is not None:
+      loader.join()
+      self._loader = None
+      if self._load_error is not None:
+        error, self._load_error = self._load_error, None
+        raise error
+    return self._load_client()
+
+  def _load_client(self) -> Encoder:
+    if self.client is not None:
+      return self.client
+    with self._lock:
+      if self.client is None and self.backend == "onnx":
+        self.client = OnnxEncoder(self.model, onnx_path=self.onnx_path, quantize=self.quantize)
+      elif self.client is None:
+        self.client = sentence_transformers.SentenceTransformer(self.model)
+      return self.client
+
+  def _background_load(self, warmup: bool) -> None:
+    try:
+      client = self._load_client()
+      if warmup:
+        _warmup(client)
+    except Exception as e:
+      logger.warning(f"Failed to load model in background, model={self.model}, error={e}")
+      self._load_error = e
+
+
+def _warmup(client: Encoder) -> None:
+  client.encode(["warmup"])
+
+
+def _to_precision(embeddings: np.ndarray, precision: Precision) -> List[Embedding]:
+  if precision == "float16":
+    embeddings = np.asarray(embeddings, dtype=np.float16)
+  elif precision == "int8":
+    embeddings = np.clip(np.rint(np.asarray(embeddings) * 127), -127, 127).astype(np.int8)
+  result: List[Embedding] = embeddings.tolist()
+  return result
 
 
 def sentence_transformer_builder(
   *,
   service_name: Optional[str] = None,
   service_type: Optional[str] = "embedder",
-  client: Optional[sentence_transformers.SentenceTransformer] = None,
+  client: Optional[Encoder] = None,
   model: Optional[str] = None,
+  load_in_background: bool = False,
+  warmup: bool = False,
+  pool_size: Optional[int] = None,
+  backend: Literal["torch", "onnx"] = "torch",
+  onnx_path: Optional[str] = None,
+  quantize: bool = False,
+  batch_size: int = 32,
+  normalize: bool = False,
+  precision: Precision = "float32",
   **kwargs: Dict[str, Any],
 ) -> SentenceTransformerEmbedder:
   """Returns an instance of sentence transformer builder.
@@ -101,13 +282,35 @@ def sentence_transformer_builder(
       service_type: service of the implementation, should be "embedder"
       client: the client to use for embedding, if not supplied, a new client is created
       model: the LLM model to use for embedding, if not supplied, a default is used
-      **kwargs: pass through arguments for the embedder, e.g. dimension etc.
+      load_in_background: if True, loads the model in a background thread, defaults to False
+      warmup: if True, encodes a dummy batch once the model is loaded in background, defaults to False
+      pool_size: number of worker processes encoding on the cpu, defaults to None encoding in the calling process
+      backend: "torch" or "onnx", defaults to "torch"
+      onnx_path: path of the onnx model for the onnx backend
+      quantize: if True, the onnx backend uses an int8 quantized model, defaults to False
+      batch_size: number of texts encoded together by the model, defaults to 32
+      normalize: if True, the embeddings are normalized to unit length, defaults to False
+      precision: precision of the embedding values, "float32", "float16" or "int8", defaults to "float32"
+      **kwargs: pass through arguments for the embedder
   """
   if service_name != "sentence_transformers":
     raise ValueError(f"Unknown service: {service_name=}")
   if service_type != "embedder":
     raise ValueError(f"Service type not supported: {service_type=}, supported service type: 'embedder'")
-  return SentenceTransformerEmbedder(client=client, model=model, **kwargs)
+  return SentenceTransformerEmbedder(
+    client=client,
+    model=model,
+    load_in_background=load_in_background,
+    warmup=warmup,
+    pool_size=pool_size,
+    backend=backend,
+    onnx_path=onnx_path,
+    quantize=quantize,
+    batch_size=batch_size,
+    normalize=normalize,
+    precision=precision,
+    **kwargs,
+  )
 
 
 @service_provider
@@ -120,5 +323,12 @@ def bodhilib_list_services() -> List[Service]:
       publisher="bodhiext",
       service_builder=sentence_transformer_builder,
       version=__version__,
-    )
+    ),
+    Service(
+      service_name="cross_encoder",
+      service_type="reranker",
+      publisher="bodhiext",
+      service_builder=cross_encoder_builder,
+      version=__version__,
+    ),
   ]
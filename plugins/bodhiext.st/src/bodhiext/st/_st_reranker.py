@@ -0,0 +1,122 @@
+""":mod:`bodhiext.st` module defines classes and methods for reranker using sentence-transformer cross-encoder."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import sentence_transformers as sentence_transformers
+from bodhilib import Node, Reranker, TextLike, to_prompt
+from bodhilib.logging import logger
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker(Reranker):
+  """Reranker scoring the query and node pairs using a sentence-transformer cross-encoder."""
+
+  def __init__(
+    self,
+    client: Optional[sentence_transformers.CrossEncoder] = None,
+    model: Optional[str] = None,
+    batch_size: int = 32,
+    cache_size: int = 4096,
+    **kwargs: Dict[str, Any],
+  ) -> None:
+    """Initializes the reranker.
+
+    The model is loaded lazily on the first call to :meth:`score`.
+
+    Args:
+        client: the cross-encoder client to use, if not supplied, the client is created for the `model`
+        model: the model to load, defaults to "cross-encoder/ms-marco-MiniLM-L-6-v2"
+        batch_size: number of pairs scored together by the model. Defaults to 32.
+        cache_size: number of the most recently scored pairs cached, so the candidates repeated across the
+            queries are not scored again. 0 disables the cache. Defaults to 4096.
+        **kwargs: pass through arguments for the cross-encoder
+    """
+    assert batch_size > 0, f"{batch_size=} should be greater than 0"
+    assert cache_size >= 0, f"{cache_size=} should not be negative"
+    self.kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    self.batch_size = batch_size
+    self.cache_size = cache_size
+    self.client = client
+    self._cache: OrderedDict[Tuple[str, str], float] = OrderedDict()
+    self._lock = threading.Lock()
+    if model is None:
+      if client is None:
+        logger.info(f"No model passed to CrossEncoder. Using default model '{DEFAULT_CROSS_ENCODER}'")
+      self.model = DEFAULT_CROSS_ENCODER
+    else:
+      self.model = model
+
+  def score(self, query: TextLike, nodes: List[Node]) -> List[float]:
+    """Scores the relevance of the nodes to the query using the cross-encoder.
+
+    The pairs missing from the cache are scored in batches, sorted by length so the pairs of similar length are
+    padded together.
+
+    Args:
+        query (:data:`~bodhilib.TextLike`): the query
+        nodes (List[:class:`~bodhilib.Node`]): the candidate nodes
+
+    Returns:
+        List[float]: relevance score of each node, in the order of the nodes
+    """
+    query_text = to_prompt(query).text
+    pairs = [(query_text, node.text) for node in nodes]
+    with self._lock:
+      scores = {pair: self._cache[pair] for pair in pairs if pair in self._cache}
+      for pair in scores:
+        self._cache.move_to_end(pair)
+    missing = sorted({pair for pair in pairs if pair not in scores}, key=lambda pair: len(pair[1]))
+    if missing:
+      predicted = self._get_client().predict(missing, batch_size=self.batch_size, show_progress_bar=False)
+      new_scores = dict(zip(missing, (float(value) for value in predicted)))
+      scores.update(new_scores)
+      self._store(new_scores)
+    return [scores[pair] for pair in pairs]
+
+  def _store(self, scores: Dict[Tuple[str, str], float]) -> None:
+    if self.cache_size == 0:
+      return
+    with self._lock:
+      self._cache.update(scores)
+      while len(self._cache) > self.cache_size:
+        self._cache.popitem(last=False)
+
+  def _get_client(self) -> sentence_transformers.CrossEncoder:
+    if self.client is not None:
+      return self.client
+    with self._lock:
+      if self.client is None:
+        self.client = sentence_transformers.CrossEncoder(self.model, **self.kwargs)
+      return self.client
+
+
+def cross_encoder_builder(
+  *,
+  service_name: Optional[str] = None,
+  service_type: Optional[str] = "reranker",
+  client: Optional[sentence_transformers.CrossEncoder] = None,
+  model: Optional[str] = None,
+  batch_size: int = 32,
+  cache_size: int = 4096,
+  **kwargs: Dict[str, Any],
+) -> CrossEncoderReranker:
+  """Returns an instance of the cross-encoder reranker.
+
+  Args:
+      service_name: service name to wrap, should be "cross_encoder"
+      service_type: service of the implementation, should be "reranker"
+      client: the cross-encoder client to use, if not supplied, a new client is created
+      model: the cross-encoder model to use, if not supplied, a default is used
+      batch_size: number of pairs scored together by the model, defaults to 32
+      cache_size: number of the most recently scored pairs cached, defaults to 4096
+      **kwargs: pass through arguments for the cross-encoder
+  """
+  if service_name != "cross_encoder":
+    raise ValueError(f"Unknown service: {service_name=}")
+  if service_type != "reranker":
+    raise ValueError(f"Service type not supported: {service_type=}, supported service type: 'reranker'")
+  return CrossEncoderReranker(client=client, model=model, batch_size=batch_size, cache_size=cache_size, **kwargs)
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from bodhiext.st import SentenceTransformerEmbedder, sentence_transformer_builder
 from bodhilib import Embedder
@@ -29,3 +30,19 @@ async def test_sentence_transformer_async_embeddings(embedder: Embedder):
 @pytest.mark.live
 def test_sentence_transformer_dimension(embedder):
   assert embedder.dimension == 384
+
+
+@pytest.mark.live
+@pytest.mark.parametrize(["quantize", "min_similarity"], [(False, 0.9999), (True, 0.98)])
+def test_sentence_transformer_onnx_matches_torch(tmp_path, embedder, quantize, min_similarity):
+  texts = ["foo", "the quick brown fox jumps over the lazy dog", "sentence transformers on onnxruntime " * 20]
+  onnx_embedder = sentence_transformer_builder(
+    service_name="sentence_transformers", backend="onnx", onnx_path=str(tmp_path / "model.onnx"), quantize=quantize
+  )
+  expected = np.array([node.embedding for node in embedder.embed(texts)])
+  actual = np.array([node.embedding for node in onnx_embedder.embed(texts)])
+  similarity = (expected * actual).sum(axis=1) / (np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1))
+  assert similarity.min() >= min_similarity
+  if not quantize:
+    np.testing.assert_allclose(actual, expected, atol=1e-4)
+  assert onnx_embedder.dimension == 384
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from bodhiext.st import model_dimension
+
+
+def write_model(model_dir, modules):
+  model_dir.mkdir(parents=True)
+  entries = []
+  for idx, (module_type, config) in enumerate(modules):
+    path = f"{idx}_{module_type}"
+    entries.append({"idx": idx, "name": str(idx), "path": path, "type": f"sentence_transformers.models.{module_type}"})
+    model_dir.joinpath(path).mkdir()
+    model_dir.joinpath(path, "config.json").write_text(json.dumps(config))
+  model_dir.joinpath("modules.json").write_text(json.dumps(entries))
+
+
+@pytest.mark.parametrize(
+  ["model", "expected"],
+  [("all-MiniLM-L6-v2", 384), ("sentence-transformers/all-mpnet-base-v2", 768), ("unknown-model", None)],
+)
+def test_model_dimension_known_models(monkeypatch, tmp_path, model, expected):
+  monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+  monkeypatch.setenv("SENTENCE_TRANSFORMERS_HOME", str(tmp_path / "st"))
+  assert model_dimension(model) == expected
+
+
+@pytest.mark.parametrize(
+  ["modules", "expected"],
+  [
+    ([("Transformer", {}), ("Pooling", {"word_embedding_dimension": 256, "pooling_mode_mean_tokens": True})], 256),
+    (
+      [
+        ("Transformer", {}),
+        (
+          "Pooling",
+          {"word_embedding_dimension": 256, "pooling_mode_mean_tokens": True, "pooling_mode_max_tokens": True},
+        ),
+      ],
+      512,
+    ),
+    (
+      [
+        ("Transformer", {}),
+        ("Pooling", {"word_embedding_dimension": 256, "pooling_mode_cls_token": True}),
+        ("Dense", {"in_features": 256, "out_features": 128}),
+        ("Normalize", {}),
+      ],
+      128,
+    ),
+  ],
+)
+def test_model_dimension_reads_local_model_config(tmp_path, modules, expected):
+  write_model(tmp_path / "model", modules)
+  assert model_dimension(str(tmp_path / "model")) == expected
+
+
+def test_model_dimension_reads_hub_cache(monkeypatch, tmp_path):
+  repo_dir = tmp_path / "models--acme--embedder"
+  repo_dir.joinpath("refs").mkdir(parents=True)
+  repo_dir.joinpath("refs", "main").write_text("abc123")
+  pooling = {"word_embedding_dimension": 64, "pooling_mode_mean_tokens": True}
+  write_model(repo_dir / "snapshots" / "abc123", [("Pooling", pooling)])
+  monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path))
+  assert model_dimension("acme/embedder") == 64
+
+
+def test_model_dimension_reads_sentence_transformers_cache(monkeypatch, tmp_path):
+  write_model(tmp_path / "st" / "sentence-transformers_custom-model", [("Dense", {"out_features": 32})])
+  monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+  monkeypatch.setenv("SENTENCE_TRANSFORMERS_HOME", str(tmp_path / "st"))
+  assert model_dimension("custom-model") == 32
@@ -0,0 +1,118 @@
+import json
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+import sentence_transformers
+from bodhiext.st import OnnxEncoder, sentence_transformer_builder
+from bodhiext.st._onnx import _normalize, _pool, _pooling_mode
+
+
+@pytest.fixture
+def token_embeddings():
+  return np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]], [[5.0, 6.0], [7.0, 8.0], [9.0, 10.0]]])
+
+
+@pytest.fixture
+def attention_mask():
+  return np.array([[1, 1, 0], [1, 1, 1]])
+
+
+@pytest.mark.parametrize(
+  ["mode", "expected"],
+  [
+    ("cls", [[1.0, 2.0], [5.0, 6.0]]),
+    ("mean", [[2.0, 3.0], [7.0, 8.0]]),
+    ("max", [[3.0, 4.0], [9.0, 10.0]]),
+  ],
+)
+def test_pool_skips_padding(token_embeddings, attention_mask, mode, expected):
+  np.testing.assert_allclose(_pool(token_embeddings, attention_mask, mode), expected)
+
+
+def test_normalize():
+  np.testing.assert_allclose(_normalize(np.array([[3.0, 4.0], [0.0, 0.0]])), [[0.6, 0.8], [0.0, 0.0]])
+
+
+def _pooling(mode="pooling_mode_mean_tokens"):
+  pooling = MagicMock(spec=sentence_transformers.models.Pooling)
+  pooling.get_config_dict.return_value = {"word_embedding_dimension": 384, mode: True}
+  return pooling
+
+
+def test_pooling_mode():
+  transformer = MagicMock(spec=sentence_transformers.models.Transformer)
+  normalize = MagicMock(spec=sentence_transformers.models.Normalize)
+  assert _pooling_mode([transformer, _pooling(), normalize]) == "mean"
+  assert _pooling_mode([transformer, _pooling("pooling_mode_cls_token")]) == "cls"
+
+
+@pytest.mark.parametrize(
+  ["modules", "error_message"],
+  [
+    (
+      ["Transformer", "Pooling", "Dense"],
+      "Unsupported modules for the onnx backend: ['Transformer', 'Pooling', 'Dense'], "
+      "supports Transformer, Pooling and optional Normalize",
+    ),
+    (
+      ["Transformer"],
+      "Unsupported modules for the onnx backend: ['Transformer'], supports Transformer, Pooling and optional Normalize",
+    ),
+  ],
+)
+def test_pooling_mode_raises_error_for_unsupported_modules(modules, error_message):
+  client = [
+    _pooling() if name == "Pooling" else MagicMock(spec=getattr(sentence_transformers.models, name)) for name in modules
+  ]
+  with pytest.raises(ValueError) as e:
+    _pooling_mode(client)
+  assert str(e.value) == error_message
+
+
+def test_pooling_mode_raises_error_for_unsupported_pooling():
+  transformer = MagicMock(spec=sentence_transformers.models.Transformer)
+  with pytest.raises(ValueError) as e:
+    _pooling_mode([transformer, _pooling("pooling_mode_weightedmean_tokens")])
+  assert str(e.value).startswith("Unsupported pooling for the onnx backend: ['pooling_mode_weightedmean_tokens']")
+
+
+@patch("transformers.AutoTokenizer.from_pretrained")
+@patch("bodhiext.st._onnx.sentence_transformers.SentenceTransformer")
+def test_onnx_encoder_skips_pytorch_model_for_exported_model(mock_st, mock_tokenizer, tmp_path):
+  onnx_path = tmp_path / "model.onnx"
+  onnx_path.write_bytes(b"onnx")
+  (tmp_path / "model.onnx.tokenizer").mkdir()
+  config = {"pooling_mode": "mean", "normalize": True, "dimension": 384, "max_seq_length": 256}
+  (tmp_path / "model.onnx.json").write_text(json.dumps(config))
+  with patch.dict(sys.modules, {"onnxruntime": MagicMock()}):
+    encoder = OnnxEncoder("test-model", onnx_path=str(onnx_path))
+  mock_st.assert_not_called()
+  mock_tokenizer.assert_called_once_with(str(tmp_path / "model.onnx.tokenizer"))
+  assert encoder.pooling_mode == "mean"
+  assert encoder.normalize is True
+  assert (encoder.dimension, encoder.max_seq_length) == (384, 256)
+
+
+@patch("bodhiext.st._st_embedder.OnnxEncoder")
+def test_embedder_uses_onnx_encoder(mock_class):
+  mock_class.return_value.get_sentence_embedding_dimension.return_value = 384
+  embedder = sentence_transformer_builder(
+    service_name="sentence_transformers", model="test-model", backend="onnx", onnx_path="model.onnx", quantize=True
+  )
+  assert embedder.dimension == 384
+  mock_class.assert_called_once_with("test-model", onnx_path="model.onnx", quantize=True)
+
+
+@pytest.mark.parametrize(
+  ["args", "error_message"],
+  [
+    ({"backend": "tensorflow"}, "Unknown backend: backend='tensorflow', supported backends: ['torch', 'onnx']"),
+    ({"backend": "onnx", "pool_size": 2}, "pool_size is not supported with the onnx backend"),
+  ],
+)
+def test_embedder_raises_error_for_invalid_backend(args, error_message):
+  with pytest.raises(ValueError) as e:
+    sentence_transformer_builder(service_name="sentence_transformers", **args)
+  assert str(e.value) == error_message
@@ -1,5 +1,6 @@
-from unittest.mock import patch
+from unittest.mock import call, patch
 
+import numpy as np
 import pytest
 from bodhiext.st import sentence_transformer_builder
 from bodhilib import Node
@@ -38,7 +39,7 @@ def test_embedder_calls_sentence_transformer(mock_class, pass_as_client):
   embedder = sentence_transformer_builder(**args)
   result = embedder.embed(["foo", "bar"])
 
-  mock_instance.encode.assert_called_once_with(["foo", "bar"])
+  mock_instance.encode.assert_called_once_with(["foo", "bar"], batch_size=32, normalize_embeddings=False)
   assert list(result) == [Node(text="foo", embedding=[1, 2, 3]), Node(text="bar", embedding=[4, 5, 6])]
 
 
@@ -51,5 +52,121 @@ def test_embedder_dimension_raises_error(mock_class, dimension, error_message):
   mock_instance = mock_class.return_value
   mock_instance.get_sentence_embedding_dimension.return_value = dimension
   with pytest.raises(ValueError) as e:
-    _ = sentence_transformer_builder(service_name="sentence_transformers", service_type="embedder").dimension
+    _ = sentence_transformer_builder(
+      service_name="sentence_transformers", service_type="embedder", model="test-model"
+    ).dimension
   assert str(e.value) == error_message
+
+
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_loads_model_in_background(mock_class):
+  mock_instance = mock_class.return_value
+  mock_instance.encode.return_value = EmbeddingList([[1, 2, 3]])
+  embedder = sentence_transformer_builder(
+    service_name="sentence_transformers", model="test-model", load_in_background=True, warmup=True
+  )
+  result = embedder.embed(["foo"])
+
+  mock_class.assert_called_once_with("test-model")
+  assert mock_instance.encode.call_args_list == [
+    call(["warmup"]),
+    call(["foo"], batch_size=32, normalize_embeddings=False),
+  ]
+  assert list(result) == [Node(text="foo", embedding=[1, 2, 3])]
+
+
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_raises_background_load_error(mock_class):
+  mock_class.side_effect = [OSError("model not found"), mock_class.return_value]
+  embedder = sentence_transformer_builder(service_name="sentence_transformers", load_in_background=True)
+  with pytest.raises(OSError) as e:
+    embedder.embed(["foo"])
+  assert str(e.value) == "model not found"
+  mock_class.return_value.encode.return_value = EmbeddingList([[1, 2, 3]])
+  assert list(embedder.embed(["foo"])) == [Node(text="foo", embedding=[1, 2, 3])]
+
+
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_warmup(mock_class):
+  mock_instance = mock_class.return_value
+  embedder = sentence_transformer_builder(service_name="sentence_transformers")
+  mock_class.assert_not_called()
+  embedder.warmup()
+  mock_class.assert_called_once_with("all-MiniLM-L6-v2")
+  mock_instance.encode.assert_called_once_with(["warmup"])
+
+
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_encodes_on_process_pool_in_order(mock_class):
+  mock_instance = mock_class.return_value
+  mock_instance.encode_multi_process.side_effect = lambda texts, pool, **kwargs: [[len(t)] for t in texts]
+  embedder = sentence_transformer_builder(service_name="sentence_transformers", pool_size=2)
+  result = embedder.embed(["three", "a", "fifteen letters"])
+  result_again = embedder.embed(["bb"])
+  embedder.close()
+
+  mock_instance.start_multi_process_pool.assert_called_once_with(target_devices=["cpu", "cpu"])
+  pool = mock_instance.start_multi_process_pool.return_value
+  assert mock_instance.encode_multi_process.call_args_list[0] == call(
+    ["a", "three", "fifteen letters"], pool, batch_size=32
+  )
+  mock_class.stop_multi_process_pool.assert_called_once_with(pool)
+  mock_instance.encode.assert_not_called()
+  assert [node.embedding for node in result] == [[5], [1], [15]]
+  assert [node.embedding for node in result_again] == [[2]]
+
+
+@pytest.mark.parametrize(
+  ["precision", "expected"],
+  [
+    ("float32", [[0.6, 0.8], [-1.0, 0.0]]),
+    ("float16", [[0.60009765625, 0.7998046875], [-1.0, 0.0]]),
+    ("int8", [[76, 102], [-127, 0]]),
+  ],
+)
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_encode_options(mock_class, precision, expected):
+  mock_instance = mock_class.return_value
+  mock_instance.encode.return_value = np.array([[0.6, 0.8], [-1.0, 0.0]])
+  embedder = sentence_transformer_builder(
+    service_name="sentence_transformers", batch_size=8, normalize=True, precision=precision
+  )
+  result = embedder.embed(["foo", "bar"])
+
+  assert embedder.batch_size == 8
+  mock_instance.encode.assert_called_once_with(["foo", "bar"], batch_size=8, normalize_embeddings=True)
+  np.testing.assert_allclose([node.embedding for node in result], expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize(
+  ["args", "error_message"],
+  [
+    (
+      {"precision": "int4"},
+      "Unknown precision: precision='int4', supported precisions: ['float32', 'float16', 'int8']",
+    ),
+    ({"precision": "int8"}, "precision='int8' requires normalize=True"),
+  ],
+)
+def test_embedder_raises_error_for_invalid_precision(args, error_message):
+  with pytest.raises(ValueError) as e:
+    sentence_transformer_builder(service_name="sentence_transformers", **args)
+  assert str(e.value) == error_message
+
+
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_dimension_without_loading_model(mock_class):
+  embedder = sentence_transformer_builder(
+    service_name="sentence_transformers", model="sentence-transformers/all-mpnet-base-v2"
+  )
+  assert embedder.dimension == 768
+  mock_class.assert_not_called()
+
+
+@patch("sentence_transformers.SentenceTransformer")
+def test_embedder_exposes_tokenizer(mock_class):
+  mock_instance = mock_class.return_value
+  mock_instance.max_seq_length = 256
+  embedder = sentence_transformer_builder(service_name="sentence_transformers")
+  assert embedder.tokenizer is mock_instance.tokenizer
+  assert embedder.max_seq_length == 256
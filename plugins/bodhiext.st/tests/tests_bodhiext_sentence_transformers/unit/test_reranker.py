@@ -0,0 +1,71 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from bodhiext.st import CrossEncoderReranker, cross_encoder_builder
+from bodhilib import Node
+
+
+@pytest.mark.parametrize(
+  ["service_name", "service_type", "error_message"],
+  [
+    ("invalid_service", "reranker", "Unknown service: service_name='invalid_service'"),
+    (
+      "cross_encoder",
+      "invalid_type",
+      "Service type not supported: service_type='invalid_type', supported service type: 'reranker'",
+    ),
+  ],
+)
+def test_cross_encoder_builder_raises_error_if_invalid_args(service_name, service_type, error_message):
+  with pytest.raises(ValueError) as e:
+    cross_encoder_builder(service_name=service_name, service_type=service_type)
+  assert str(e.value) == error_message
+
+
+def _predict(pairs, batch_size, show_progress_bar):
+  return [float(len(text)) for _, text in pairs]
+
+
+def test_reranker_scores_pairs_in_batches_sorted_by_length():
+  client = Mock()
+  client.predict.side_effect = _predict
+  reranker = CrossEncoderReranker(client=client, batch_size=8)
+  nodes = [Node(text="ccc"), Node(text="a"), Node(text="bb")]
+  assert reranker.score("query", nodes) == [3.0, 1.0, 2.0]
+  client.predict.assert_called_once_with(
+    [("query", "a"), ("query", "bb"), ("query", "ccc")], batch_size=8, show_progress_bar=False
+  )
+
+
+def test_reranker_rerank_returns_top_n():
+  client = Mock()
+  client.predict.side_effect = _predict
+  reranker = cross_encoder_builder(service_name="cross_encoder", service_type="reranker", client=client)
+  result = reranker.rerank("query", [Node(text="bb"), Node(text="a"), Node(text="ccc")], n=2)
+  assert [node.text for node in result] == ["ccc", "bb"]
+
+
+def test_reranker_caches_pair_scores():
+  client = Mock()
+  client.predict.side_effect = _predict
+  reranker = CrossEncoderReranker(client=client)
+  reranker.score("query", [Node(text="a"), Node(text="bb")])
+  assert reranker.score("query", [Node(text="bb"), Node(text="ccc")]) == [2.0, 3.0]
+  assert client.predict.call_args.args[0] == [("query", "ccc")]
+
+
+def test_reranker_evicts_least_recently_used_pairs():
+  client = Mock()
+  client.predict.side_effect = _predict
+  reranker = CrossEncoderReranker(client=client, cache_size=2)
+  reranker.score("query", [Node(text="a"), Node(text="bb"), Node(text="ccc")])
+  assert list(reranker._cache) == [("query", "bb"), ("query", "ccc")]
+
+
+@patch("sentence_transformers.CrossEncoder")
+def test_reranker_loads_model_lazily(mock_class):
+  mock_class.return_value.predict.side_effect = _predict
+  reranker = CrossEncoderReranker(model="cross-encoder/test")
+  mock_class.assert_not_called()
+  reranker.score("query", [Node(text="a")])
+  mock_class.assert_called_once_with("cross-encoder/test")
@@ -1,95 +1,160 @@
 import asyncio
+import json
 import logging
+import os
+import time
 from contextlib import asynccontextmanager
-from threading import Lock
+from typing import Any, AsyncIterator, Dict
 
 from bodhiext.engine import DefaultSemanticEngine
-from bodhilib import (
-  get_embedder,
-  get_llm,
-  get_resource_factory,
-  get_resource_queue,
-  get_splitter,
-  get_vector_db,
-  local_file,
-)
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing_extensions import Annotated
 
+from .components import build_search_engine
+from .jobs import JOBS_DIR, IngestJob, IngestWorker, JobStore
+
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 load_dotenv(dotenv_path=".env.test")
-service_lock = Lock()
-search_engine = None
-
-
-def get_search_engine() -> DefaultSemanticEngine:
-  global search_engine
-  with service_lock:
-    if search_engine is None:
-      llm = get_llm(service_name="openai_chat", model="gpt-3.5-turbo")
-      resource_queue = get_resource_queue(service_name="in_memory")
-      embedder = get_embedder(service_name="sentence_transformers")
-      splitter = get_splitter(service_name="text_splitter", max_len=256, min_len=128, overlap=16)
-      vector_db = get_vector_db(service_name="qdrant", host="localhost", port=6333)
-      factory = get_resource_factory(service_name="resource_factory")
-      search_engine = DefaultSemanticEngine(
-        resource_queue=resource_queue,
-        factory=factory,
-        splitter=splitter,
-        embedder=embedder,
-        vector_db=vector_db,
-        llm=llm,
-        collection_name="bodhiapp",
-      )
+# "embedded" runs the ingest worker in each app process, "external" leaves the jobs to `python -m bodhiapp.worker`
+INGEST_WORKER = os.getenv("BODHIAPP_INGEST_WORKER", "embedded")
+JOB_POLL_INTERVAL = 0.5
+# seconds /ingest_and_run waits for the job, before returning the job id to poll instead
+JOB_WAIT_TIMEOUT = float(os.getenv("BODHIAPP_JOB_WAIT_TIMEOUT", "300"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # built once per worker process at startup, the requests share the engine without locking
+  app.state.search_engine = await build_search_engine()
+  app.state.job_store = JobStore(JOBS_DIR)
+  worker = None
+  if INGEST_WORKER == "embedded":
+    # the jobs are claimed through the shared job store, so each job runs once across the app processes
+    worker = IngestWorker(app.state.search_engine, app.state.job_store)
+    worker.start()
+  yield
+  if worker is not None:
+    worker.stop(timeout=5)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def get_search_engine(request: Request) -> DefaultSemanticEngine:
+  search_engine: DefaultSemanticEngine = request.app.state.search_engine
   return search_engine
 
 
-# @asynccontextmanager
-# async def start_ingest(app: FastAPI):
-#   search_engine = get_search_engine()
-#   thread = threading.Thread(target=search_engine.ingest)
-#   thread.daemon = True
-#   thread.start()
-#   yield
+def get_job_store(request: Request) -> JobStore:
+  job_store: JobStore = request.app.state.job_store
+  return job_store
 
 
-@asynccontextmanager
-async def start_aingest(app: FastAPI):
-  search_engine = get_search_engine()
-  asyncio.create_task(search_engine.aingest())
-  yield
+def _validate_path(path: str) -> None:
+  if not os.path.exists(path):
+    raise HTTPException(status_code=400, detail=f"path does not exist: {path}")
 
 
-# app = FastAPI(lifespan=start_ingest)
-app = FastAPI(lifespan=start_aingest)
+async def _submit(jobs: JobStore, path: str) -> IngestJob:
+  # the job store reads and writes the job files, kept off the event loop
+  await run_in_threadpool(_validate_path, path)
+  job: IngestJob = await run_in_threadpool(jobs.submit, path)
+  return job
+
+
+async def _wait(jobs: JobStore, job: IngestJob, timeout: float) -> IngestJob:
+  # returns the job as last saved, not done if it did not finish within the timeout
+  deadline = time.monotonic() + timeout
+  while not job.done and time.monotonic() < deadline:
+    await asyncio.sleep(JOB_POLL_INTERVAL)
+    job = await run_in_threadpool(jobs.get, job.id) or job
+  return job
 
 
 @app.post("/ingest_and_run")
-async def ingest_and_run(path: str, service: Annotated[DefaultSemanticEngine, Depends(get_search_engine)]):
-  service.add_resource(local_file(path))
-  service.run_ingest()
-  return {"message": "ingested"}
+async def ingest_and_run(path: str, jobs: Annotated[JobStore, Depends(get_job_store)]):
+  job = await _wait(jobs, await _submit(jobs, path), JOB_WAIT_TIMEOUT)
+  if not job.done:
+    # e.g. no ingest worker is running, the job is polled using its id
+    return JSONResponse(status_code=202, content={"message": "pending", "job_id": job.id, "job": job.to_dict()})
+  return {"message": "ingested", "job": job.to_dict()}
 
 
 @app.post("/ingest")
-async def ingest(path: str, service: Annotated[DefaultSemanticEngine, Depends(get_search_engine)]):
-  service.add_resource(local_file(path))
-  return {"message": "queued"}
+async def ingest(path: str, jobs: Annotated[JobStore, Depends(get_job_store)]):
+  job = await _submit(jobs, path)
+  return {"message": "queued", "job_id": job.id}
 
 
 @app.post("/aingest")
-async def aingest(path: str, service: Annotated[DefaultSemanticEngine, Depends(get_search_engine)]):
-  service.add_resource(local_file(path))
-  return {"message": "aingested"}
+async def aingest(path: str, jobs: Annotated[JobStore, Depends(get_job_store)]):
+  job = await _submit(jobs, path)
+  return {"message": "aingested", "job_id": job.id}
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(path: str, jobs: Annotated[JobStore, Depends(get_job_store)]):
+  job = await _submit(jobs, path)
+  return job.to_dict()
+
+
+@app.get("/jobs")
+async def list_jobs(jobs: Annotated[JobStore, Depends(get_job_store)]):
+  all_jobs = await run_in_threadpool(jobs.list_jobs)
+  return {"jobs": [job.to_dict() for job in all_jobs]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, jobs: Annotated[JobStore, Depends(get_job_store)]):
+  job = await run_in_threadpool(jobs.get, job_id)
+  if job is None:
+    raise HTTPException(status_code=404, detail=f"job not found: {job_id}")
+  return job.to_dict()
 
 
 @app.post("/rag")
 async def rag(query: str, service: Annotated[DefaultSemanticEngine, Depends(get_search_engine)]):
-  result = service.rag(query)
+  result = await run_in_threadpool(service.rag, query)
   return {"message": "rag", "result": result}
 
 
+@app.post("/rag/stream")
+async def rag_stream(query: str, service: Annotated[DefaultSemanticEngine, Depends(get_search_engine)]):
+  # proxies like nginx buffer the responses by default, which would hold back the events
+  headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+  return StreamingResponse(_rag_events(service, query), media_type="text/event-stream", headers=headers)
+
+
+async def _rag_events(service: DefaultSemanticEngine, query: str) -> AsyncIterator[str]:
+  # retrieval and the blocking reads of the llm stream run on the threadpool, keeping the event loop free
+  start = time.perf_counter()
+  try:
+    stream = await run_in_threadpool(service.rag, query, stream=True)
+    first_token_time = None
+    text = []
+    async for chunk in iterate_in_threadpool(stream):
+      if first_token_time is None:
+        first_token_time = time.perf_counter() - start
+        logger.info(f"rag time to first token: {first_token_time:.3f}s")
+        yield _sse("metrics", {"time_to_first_token": first_token_time})
+      text.append(chunk.text)
+      yield _sse("token", {"text": chunk.text})
+  except Exception as e:
+    logger.exception("rag stream failed")
+    yield _sse("error", {"message": str(e)})
+    return
+  total_time = time.perf_counter() - start
+  yield _sse("done", {"text": "".join(text), "time_to_first_token": first_token_time, "total_time": total_time})
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+  return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @app.post("/reset")
 async def reset(service: Annotated[DefaultSemanticEngine, Depends(get_search_engine)]):
   service.delete_collection()
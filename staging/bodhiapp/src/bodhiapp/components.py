@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import os
+from typing import Callable, TypeVar
+
+from bodhiext.engine import DefaultSemanticEngine
+from bodhiext.qdrant import Qdrant
+from bodhiext.st import SentenceTransformerEmbedder
+from bodhilib import (
+  LLM,
+  get_embedder,
+  get_llm,
+  get_resource_factory,
+  get_resource_queue,
+  get_splitter,
+  get_vector_db,
+)
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+COLLECTION_NAME = "bodhiapp"
+QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
+QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+
+
+async def build_search_engine() -> DefaultSemanticEngine:
+  """Builds the search engine, loading the independent components concurrently on the default executor.
+
+  The embedder model is loaded and warmed up, and the connection to qdrant is checked, so the first request does not
+  pay for the startup.
+  """
+  llm, embedder, vector_db = await asyncio.gather(
+    _in_thread(_load_llm),
+    _in_thread(_load_embedder),
+    _in_thread(_connect_vector_db),
+  )
+  return DefaultSemanticEngine(
+    resource_queue=get_resource_queue(service_name="in_memory"),
+    factory=get_resource_factory(service_name="resource_factory"),
+    splitter=get_splitter(service_name="text_splitter", max_len=256, min_len=128, overlap=16),
+    embedder=embedder,
+    vector_db=vector_db,
+    llm=llm,
+    collection_name=COLLECTION_NAME,
+  )
+
+
+def _load_llm() -> LLM:
+  return get_llm(service_name="openai_chat", model="gpt-3.5-turbo")
+
+
+def _load_embedder() -> SentenceTransformerEmbedder:
+  embedder = get_embedder(service_name="sentence_transformers", oftype=SentenceTransformerEmbedder)
+  embedder.warmup()
+  logger.info("embedder model loaded")
+  return embedder
+
+
+def _connect_vector_db() -> Qdrant:
+  vector_db = get_vector_db(service_name="qdrant", oftype=Qdrant, host=QDRANT_HOST, port=QDRANT_PORT)
+  vector_db.client.get_collections()
+  logger.info(f"connected to qdrant at {QDRANT_HOST}:{QDRANT_PORT}")
+  return vector_db
+
+
+async def _in_thread(func: Callable[[], T]) -> T:
+  return await asyncio.get_running_loop().run_in_executor(None, func)
@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
+
+from bodhiext.engine import DefaultSemanticEngine
+from bodhiext.resources import IngestProgress, track_progress
+from bodhilib import local_dir, local_file
+
+logger = logging.getLogger(__name__)
+JobStatus = Literal["queued", "running", "completed", "failed"]
+FINISHED: List[JobStatus] = ["completed", "failed"]
+JOBS_DIR = os.getenv("BODHIAPP_JOBS_DIR", ".bodhiapp/jobs")
+
+
+class IngestJob:
+  def __init__(
+    self,
+    path: str,
+    job_id: Optional[str] = None,
+    status: JobStatus = "queued",
+    error: Optional[str] = None,
+    submitted_at: Optional[float] = None,
+    progress: Optional[Dict[str, Any]] = None,
+    attempts: int = 0,
+  ) -> None:
+    """Ingestion of a file or a directory, tracking its status and progress."""
+    self.id = job_id or uuid.uuid4().hex
+    self.path = path
+    self.status = status
+    self.error = error
+    self.submitted_at = submitted_at or time.time()
+    # the progress as last saved, the worker running the job records into the live `IngestProgress`
+    self.progress = progress or IngestProgress().to_dict()
+    self.attempts = attempts
+
+  @property
+  def done(self) -> bool:
+    return self.status in FINISHED
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      "job_id": self.id,
+      "path": self.path,
+      "status": self.status,
+      "error": self.error,
+      "submitted_at": self.submitted_at,
+      "progress": self.progress,
+      "attempts": self.attempts,
+    }
+
+  @classmethod
+  def from_dict(cls, data: Dict[str, Any]) -> "IngestJob":
+    return cls(
+      data["path"],
+      job_id=data["job_id"],
+      status=data["status"],
+      error=data.get("error"),
+      submitted_at=data["submitted_at"],
+      progress=data.get("progress"),
+      attempts=data.get("attempts", 0),
+    )
+
+
+class JobStore:
+  def __init__(self, jobs_dir: str, max_jobs: int = 1000) -> None:
+    """Stores the ingestion jobs as json files in `jobs_dir`, shared by all the app and ingest worker processes.
+
+    A job is run by the worker creating its lock file first, so each job runs once even with many workers. The
+    worker touches the lock file while running the job, and a lock file not touched for a while is of a worker
+    that died, see :meth:`release_stale`. The `max_jobs` most recent jobs are retained for the status lookup.
+    """
+    self.jobs_dir = Path(jobs_dir)
+    self.jobs_dir.mkdir(parents=True, exist_ok=True)
+    self.max_jobs = max_jobs
+
+  def submit(self, path: str) -> IngestJob:
+    job = IngestJob(path)
+    self.save(job)
+    self._evict()
+    return job
+
+  def save(self, job: IngestJob) -> None:
+    # written to a temporary file and renamed, so a concurrent reader never sees a partial job
+    tmp_file = self.jobs_dir / f"{job.id}.{os.getpid()}.tmp"
+    tmp_file.write_text(json.dumps(job.to_dict()), encoding="utf-8")
+    os.replace(tmp_file, self._job_file(job.id))
+
+  def get(self, job_id: str) -> Optional[IngestJob]:
+    try:
+      data = json.loads(self._job_file(job_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+      return None
+    return IngestJob.from_dict(data)
+
+  def list_jobs(self) -> List[IngestJob]:
+    """Returns the jobs in the order of submission."""
+    jobs = [self.get(job_file.stem) for job_file in self.jobs_dir.glob("*.json")]
+    return sorted((job for job in jobs if job is not None), key=lambda job: job.submitted_at)
+
+  def claim(self, job_id: str) -> bool:
+    """Returns True if the caller acquired the lock to run the job, False if another worker holds it."""
+    try:
+      os.close(os.open(self._lock_file(job_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+      return False
+    return True
+
+  def heartbeat(self, job_id: str) -> None:
+    """Marks the lock of the job as held by a live worker."""
+    try:
+      os.utime(self._lock_file(job_id))
+    except FileNotFoundError:
+      logger.warning(f"lock of the running job was released as stale, job_id={job_id}")
+
+  def release_stale(self, job_id: str, timeout: float) -> bool:
+    """Releases the lock of the job if not touched for `timeout` seconds.
+
+    Returns True if the caller released the lock, and should requeue or fail the job of the dead worker.
+    """
+    lock_file = self._lock_file(job_id)
+    try:
+      if lock_file.stat().st_mtime > time.time() - timeout:
+        return False
+      # renamed first, so only one of the workers finding the stale lock releases it
+      released = self.jobs_dir / f"{job_id}.{os.getpid()}.{uuid.uuid4().hex}.stale"
+      os.rename(lock_file, released)
+    except FileNotFoundError:
+      return False
+    if released.stat().st_mtime > time.time() - timeout:
+      # the job was claimed again after the stale check, restores the lock of the new worker
+      try:
+        os.link(released, lock_file)
+      except FileExistsError:
+        pass
+      released.unlink()
+      return False
+    released.unlink()
+    return True
+
+  def _evict(self) -> None:
+    jobs = self.list_jobs()
+    finished = [job for job in jobs if job.done]
+    for job in finished[: max(0, len(jobs) - self.max_jobs)]:
+      for job_file in (self._job_file(job.id), self._lock_file(job.id)):
+        job_file.unlink(missing_ok=True)
+
+  def _job_file(self, job_id: str) -> Path:
+    return self.jobs_dir / f"{job_id}.json"
+
+  def _lock_file(self, job_id: str) -> Path:
+    return self.jobs_dir / f"{job_id}.lock"
+
+
+class IngestWorker:
+  def __init__(
+    self,
+    engine: DefaultSemanticEngine,
+    store: JobStore,
+    poll_interval: float = 0.5,
+    stale_timeout: float = 60.0,
+    max_attempts: int = 3,
+  ) -> None:
+    """Runs the queued jobs of the store, one job at a time, in the order of submission.
+
+    A job pushes its resource to the engine's queue when it starts, and drains the queue, so the progress of the
+    job counts only its own files. The progress is saved to the store every `poll_interval` seconds while running.
+
+    A job whose worker has not sent a heartbeat for `stale_timeout` seconds, e.g. the worker process was killed,
+    is queued again, and failed after `max_attempts` runs.
+    """
+    assert stale_timeout > poll_interval, f"{stale_timeout=} should be greater than {poll_interval=}"
+    self.engine = engine
+    self.store = store
+    self.poll_interval = poll_interval
+    self.stale_timeout = stale_timeout
+    self.max_attempts = max_attempts
+    self._stopped = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+
+  def start(self) -> None:
+    """Runs the worker on a background thread of this process."""
+    if self._thread is None:
+      self._stopped.clear()
+      self._thread = threading.Thread(target=self.run, name="ingest-worker", daemon=True)
+      self._thread.start()
+
+  def stop(self, timeout: Optional[float] = None) -> None:
+    """Stops the worker after the current job, the queued jobs are left for the other workers."""
+    self._stopped.set()
+    thread, self._thread = self._thread, None
+    if thread is not None:
+      thread.join(timeout)
+
+  def run(self) -> None:
+    """Runs the queued jobs until stopped."""
+    while not self._stopped.is_set():
+      jobs = self.store.list_jobs()
+      for job in jobs:
+        if not job.done:
+          self._release_stale(job)
+      queued = [job for job in jobs if job.status == "queued"]
+      job = next((job for job in queued if self.store.claim(job.id)), None)
+      if job is None:
+        self._stopped.wait(self.poll_interval)
+        continue
+      self._run_job(job)
+
+  def _release_stale(self, job: IngestJob) -> None:
+    if not self.store.release_stale(job.id, self.stale_timeout):
+      return
+    # reloaded, as the job may have finished since listed
+    current = self.store.get(job.id)
+    if current is None or current.done:
+      return
+    job = current
+    if job.attempts < self.max_attempts:
+      logger.warning(f"requeuing the job of a dead ingest worker, job_id={job.id}, attempts={job.attempts}")
+      job.status = "queued"
+    else:
+      job.status = "failed"
+      job.error = f"ingest worker stopped responding, after {job.attempts} attempts"
+    self.store.save(job)
+
+  def _run_job(self, job: IngestJob) -> None:
+    progress = IngestProgress()
+    job.status = "running"
+    job.attempts += 1
+    self.store.save(job)
+    runner = threading.Thread(target=self._ingest, args=(job, progress), name=f"ingest-{job.id}", daemon=True)
+    runner.start()
+    runner.join(self.poll_interval)
+    while runner.is_alive():
+      self.store.heartbeat(job.id)
+      job.progress = progress.to_dict()
+      self.store.save(job)
+      runner.join(self.poll_interval)
+    # saved once the runner has set the final status, with the progress of all the files
+    job.progress = progress.to_dict()
+    self.store.save(job)
+
+  def _ingest(self, job: IngestJob, progress: IngestProgress) -> None:
+    try:
+      resource = local_dir(job.path, recursive=True) if os.path.isdir(job.path) else local_file(job.path)
+      with track_progress(progress):
+        self.engine.add_resource(resource)
+        self.engine.run_ingest()
+      job.status = "completed"
+    except Exception as e:
+      logger.exception(f"ingest job failed, job_id={job.id}")
+      job.status = "failed"
+      job.error = str(e)
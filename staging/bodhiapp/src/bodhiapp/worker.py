@@ -0,0 +1,26 @@
+""":mod:`bodhiapp.worker` runs the ingest jobs out-of-process, shared by all the app workers.
+
+Start the app with `BODHIAPP_INGEST_WORKER=external`, so the app workers only submit the jobs, and run this module
+with the same `BODHIAPP_JOBS_DIR`::
+
+    python -m bodhiapp.worker
+"""
+import asyncio
+import logging
+
+from .components import build_search_engine
+from .jobs import JOBS_DIR, IngestWorker, JobStore
+
+
+def main() -> None:
+  logging.basicConfig(level=logging.INFO)
+  engine = asyncio.run(build_search_engine())
+  worker = IngestWorker(engine, JobStore(JOBS_DIR))
+  try:
+    worker.run()
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == "__main__":
+  main()